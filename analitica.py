@@ -0,0 +1,304 @@
+# analitica.py
+"""
+Analítica vectorizada sobre la matriz de recetas (NumPy).
+
+La receta aplanada (menu_bom) de todos los menús se carga como una matriz densa M
+(menús x ingredientes, M[i, j] = cantidad del ingrediente j por unidad del
+menú i) y las líneas de pedido como arreglos. Así el consumo, la
+disponibilidad y las proyecciones de stock son una sola operación matricial
+en vez de bucles anidados sobre menu.ingredientes.
+
+Uso (informe de reposición):
+    python analitica.py reposicion.csv --entrega 2 --revision 7
+"""
+import argparse
+import csv
+from datetime import date, datetime, time, timedelta
+import numpy as np
+from sqlalchemy import select, func
+from instantanea import sesion_reportes
+from models import MenuORM, IngredienteORM, MenuBOM
+from archivado import tablas_pedidos
+from dialecto import clave_fecha
+
+
+class MatrizRecetas:
+    def __init__(self, menu_ids, ing_ids, nombres_ing, filas):
+        """
+        menu_ids, ing_ids: ids ordenados de menús e ingredientes
+        filas: iterable de (menu_id, ingrediente_id, cantidad)
+        """
+        self.menu_ids = np.asarray(menu_ids, dtype=np.int64)
+        self.ing_ids = np.asarray(ing_ids, dtype=np.int64)
+        self.nombres_ing = list(nombres_ing)
+        self.M = np.zeros((len(self.menu_ids), len(self.ing_ids)))
+        filas = list(filas)
+        if filas:
+            arr = np.array(filas, dtype=float)
+            self.M[self.indices_menus(arr[:, 0]), self.indices_ingredientes(arr[:, 1])] = arr[:, 2]
+
+    @classmethod
+    def cargar(cls):
+        """Lee menús, ingredientes y recetas aplanadas (incluyen las sub-recetas)."""
+        with sesion_reportes() as session:
+            menu_ids = session.scalars(select(MenuORM.id).order_by(MenuORM.id)).all()
+            ings = session.execute(
+                select(IngredienteORM.id, IngredienteORM.nombre).order_by(IngredienteORM.id)
+            ).all()
+            filas = session.execute(
+                select(MenuBOM.menu_id, MenuBOM.ingrediente_id, MenuBOM.cantidad)
+            ).all()
+        return cls(menu_ids, [i for i, _ in ings], [n for _, n in ings], filas)
+
+    # ----------------- ÍNDICES -----------------
+    def indices_menus(self, ids) -> np.ndarray:
+        """ids de menú -> filas de M (ids ordenados: búsqueda binaria vectorizada)."""
+        return np.searchsorted(self.menu_ids, np.asarray(ids, dtype=np.int64))
+
+    def indices_ingredientes(self, ids) -> np.ndarray:
+        return np.searchsorted(self.ing_ids, np.asarray(ids, dtype=np.int64))
+
+    # ----------------- OPERACIONES -----------------
+    def unidades_por_menu(self, menu_ids, cantidades) -> np.ndarray:
+        """Suma las cantidades por menú (vector de largo n_menus)."""
+        return np.bincount(
+            self.indices_menus(menu_ids), weights=np.asarray(cantidades, dtype=float),
+            minlength=len(self.menu_ids)
+        )
+
+    def consumo(self, menu_ids, cantidades) -> np.ndarray:
+        """Ingredientes consumidos por un conjunto de líneas (vector por ingrediente)."""
+        return self.unidades_por_menu(menu_ids, cantidades) @ self.M
+
+    def disponibilidad(self, stock: np.ndarray) -> np.ndarray:
+        """
+        Unidades que se pueden preparar de cada menú con el stock dado.
+        Menús sin ingredientes quedan en +inf.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            posibles = np.where(self.M > 0, np.maximum(stock, 0) / self.M, np.inf)
+        return np.floor(posibles.min(axis=1, initial=np.inf))
+
+    def proyectar_stock(self, stock: np.ndarray, plan: dict[int, float]) -> np.ndarray:
+        """Stock que quedaría tras vender `plan` = {menu_id: unidades} (qué pasaría si...)."""
+        if not plan:
+            return stock.copy()
+        return stock - self.consumo(list(plan.keys()), list(plan.values()))
+
+
+# ============================================================
+#                    CARGA DE ARREGLOS
+# ============================================================
+
+def vector_stock(matriz: MatrizRecetas) -> np.ndarray:
+    """Stock actual alineado con matriz.ing_ids."""
+    with sesion_reportes() as session:
+        rows = session.execute(select(IngredienteORM.id, IngredienteORM.stock)).all()
+    stock = np.zeros(len(matriz.ing_ids))
+    if rows:
+        arr = np.array(rows, dtype=float)
+        idx = matriz.indices_ingredientes(arr[:, 0])
+        ok = (idx < len(matriz.ing_ids)) & (matriz.ing_ids[np.minimum(idx, len(matriz.ing_ids) - 1)] == arr[:, 0])
+        stock[idx[ok]] = arr[ok, 1]
+    return stock
+
+
+def cargar_lineas(desde: date | None = None, hasta: date | None = None):
+    """
+    Líneas de pedido como arreglos (menu_ids, cantidades, fechas[datetime64[s]]),
+    opcionalmente filtradas por rango de fechas (inclusive).
+    """
+    P, PM = tablas_pedidos(desde, hasta)
+    stmt = select(PM.menu_id, PM.cantidad, P.fecha).join(P, PM.pedido_id == P.id)
+    if desde is not None:
+        stmt = stmt.where(P.fecha >= datetime.combine(desde, time.min))
+    if hasta is not None:
+        stmt = stmt.where(P.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+    with sesion_reportes() as session:
+        rows = session.execute(stmt).all()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0), np.empty(0, "datetime64[s]")
+    menu_ids, cantidades, fechas = zip(*rows)
+    return (
+        np.array(menu_ids, dtype=np.int64),
+        np.array(cantidades, dtype=float),
+        np.array(fechas, dtype="datetime64[s]"),
+    )
+
+
+def unidades_vendidas(desde: date | None = None, hasta: date | None = None):
+    """(menu_ids, unidades) sumadas en SQL: una fila por menú, no por línea."""
+    P, PM = tablas_pedidos(desde, hasta)
+    stmt = select(PM.menu_id, func.sum(PM.cantidad)).group_by(PM.menu_id)
+    if desde is not None or hasta is not None:
+        stmt = stmt.join(P, PM.pedido_id == P.id)
+    if desde is not None:
+        stmt = stmt.where(P.fecha >= datetime.combine(desde, time.min))
+    if hasta is not None:
+        stmt = stmt.where(P.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+    with sesion_reportes() as session:
+        rows = session.execute(stmt).all()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0)
+    arr = np.array(rows, dtype=float)
+    return arr[:, 0].astype(np.int64), arr[:, 1]
+
+
+def consumo_ingredientes(desde: date | None = None, hasta: date | None = None) -> dict[str, float]:
+    """{nombre_ingrediente: cantidad usada} en los pedidos del rango (solo los > 0)."""
+    matriz = MatrizRecetas.cargar()
+    menu_ids, cantidades = unidades_vendidas(desde, hasta)
+    if len(menu_ids) == 0:
+        return {}
+    # líneas de menús ya eliminados no aportan
+    idx = matriz.indices_menus(menu_ids)
+    validas = (idx < len(matriz.menu_ids)) & (matriz.menu_ids[np.minimum(idx, len(matriz.menu_ids) - 1)] == menu_ids)
+    total = matriz.consumo(menu_ids[validas], cantidades[validas])
+    return {
+        matriz.nombres_ing[j]: float(total[j])
+        for j in np.flatnonzero(total > 0)
+    }
+
+
+# ============================================================
+#              PRONÓSTICO DE CONSUMO Y REPOSICIÓN
+# ============================================================
+
+def _dia_semana(dias: np.ndarray) -> np.ndarray:
+    """Lunes=0 ... domingo=6 para un arreglo datetime64[D] (1970-01-01 fue jueves)."""
+    return (dias.astype(np.int64) + 3) % 7
+
+
+def consumo_diario(desde: date, hasta: date, matriz: MatrizRecetas | None = None):
+    """
+    Consumo por día e ingrediente en [desde, hasta] (inclusive).
+    Retorna (dias[datetime64[D]], C) con C de forma (n_dias, n_ingredientes);
+    los días sin pedidos quedan en cero.
+    """
+    matriz = matriz or MatrizRecetas.cargar()
+    dias = np.arange(np.datetime64(desde, "D"), np.datetime64(hasta, "D") + 1)
+    P, PM = tablas_pedidos(desde, hasta)
+    dia = clave_fecha(P.fecha, "dia")
+    with sesion_reportes() as session:
+        rows = session.execute(
+            select(dia, PM.menu_id, func.sum(PM.cantidad))
+            .join(P, PM.pedido_id == P.id)
+            .where(
+                P.fecha >= datetime.combine(desde, time.min),
+                P.fecha < datetime.combine(hasta + timedelta(days=1), time.min),
+            )
+            .group_by(dia, PM.menu_id)
+        ).all()
+    U = np.zeros((len(dias), len(matriz.menu_ids)))
+    if rows and len(matriz.menu_ids):
+        fechas, menu_ids, cantidades = zip(*rows)
+        di = (np.array(fechas, dtype="datetime64[D]") - dias[0]).astype(np.int64)
+        menu_ids = np.array(menu_ids, dtype=np.int64)
+        mi = matriz.indices_menus(menu_ids)
+        # menús ya eliminados no aportan
+        ok = (mi < len(matriz.menu_ids)) & (matriz.menu_ids[np.minimum(mi, len(matriz.menu_ids) - 1)] == menu_ids)
+        np.add.at(U, (di[ok], mi[ok]), np.array(cantidades, dtype=float)[ok])
+    return dias, U @ matriz.M
+
+
+def pronosticar(dias: np.ndarray, C: np.ndarray, horizonte: int) -> np.ndarray:
+    """
+    Pronóstico (horizonte x n_ingredientes) para los días siguientes a dias[-1].
+    Cada día futuro toma el promedio de los mismos días de la semana del
+    historial (media móvil estacional); con menos de una semana de historial
+    se usa el promedio simple.
+    """
+    futuros = dias[-1] + np.arange(1, horizonte + 1)
+    if len(dias) < 7:
+        return np.repeat(C.mean(axis=0, keepdims=True), horizonte, axis=0)
+    dsem = _dia_semana(dias)
+    perfil = np.zeros((7, C.shape[1]))
+    np.add.at(perfil, dsem, C)
+    perfil /= np.bincount(dsem, minlength=7)[:, None]
+    return perfil[_dia_semana(futuros)]
+
+
+def reposicion(dias_entrega: int = 2, dias_revision: int = 7, semanas: int = 8,
+               z_servicio: float = 1.65, hasta: date | None = None) -> list[dict]:
+    """
+    Días de cobertura y cantidad sugerida de compra por ingrediente.
+
+    dias_entrega: días que tarda el proveedor; dias_revision: cada cuántos días
+    se hace el pedido; semanas: historial usado (termina ayer, días completos);
+    z_servicio: factor del stock de seguridad (1.65 ~ 95%).
+    Ordenado por días de cobertura (los más urgentes primero).
+    """
+    if dias_entrega < 0 or dias_revision < 1 or semanas < 1:
+        raise ValueError("Parámetros de reposición no válidos.")
+    hasta = hasta or date.today() - timedelta(days=1)
+    desde = hasta - timedelta(days=7 * semanas - 1)
+    matriz = MatrizRecetas.cargar()
+    dias, C = consumo_diario(desde, hasta, matriz)
+
+    with sesion_reportes() as session:
+        filas = session.execute(
+            select(IngredienteORM.id, IngredienteORM.unidad, IngredienteORM.stock)
+            .order_by(IngredienteORM.id)
+        ).all()
+    unidades = [u for _, u, _ in filas]
+    stock = np.array([s for _, _, s in filas], dtype=float)
+
+    # un año de pronóstico basta para medir la cobertura
+    pron = pronosticar(dias, C, 365)
+    acumulado = np.cumsum(pron, axis=0)
+    cobertura = (acumulado <= stock).sum(axis=0).astype(float)
+    cobertura[acumulado[-1] == 0] = np.inf
+
+    seguridad = z_servicio * C.std(axis=0) * np.sqrt(max(dias_entrega, 1))
+    punto_reorden = acumulado[dias_entrega - 1] + seguridad if dias_entrega else seguridad
+    necesidad = acumulado[dias_entrega + dias_revision - 1] + seguridad
+    sugerido = np.ceil(np.maximum(necesidad - stock, 0))
+    consumo_medio = C.mean(axis=0)
+
+    salida = [
+        {
+            "ingrediente": matriz.nombres_ing[j],
+            "unidad": unidades[j],
+            "stock": float(stock[j]),
+            "consumo_diario": round(float(consumo_medio[j]), 2),
+            "dias_cobertura": float(cobertura[j]),
+            "punto_reorden": round(float(punto_reorden[j]), 2),
+            "sugerido": float(sugerido[j]),
+            "reponer": bool(stock[j] <= punto_reorden[j] and consumo_medio[j] > 0),
+        }
+        for j in range(len(matriz.ing_ids))
+    ]
+    salida.sort(key=lambda r: r["dias_cobertura"])
+    return salida
+
+
+def exportar_reposicion_csv(ruta: str, **params) -> str:
+    """Escribe el informe de reposición en CSV (parámetros como reposicion)."""
+    filas = reposicion(**params)
+    campos = ["ingrediente", "unidad", "stock", "consumo_diario",
+              "dias_cobertura", "punto_reorden", "sugerido", "reponer"]
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=campos)
+        w.writeheader()
+        for fila in filas:
+            fila = dict(fila)
+            if fila["dias_cobertura"] == np.inf:
+                fila["dias_cobertura"] = ""
+            fila["reponer"] = "sí" if fila["reponer"] else "no"
+            w.writerow(fila)
+    return ruta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Informe de reposición de ingredientes (CSV).")
+    parser.add_argument("salida")
+    parser.add_argument("--entrega", type=int, default=2, help="días de entrega del proveedor")
+    parser.add_argument("--revision", type=int, default=7, help="días entre pedidos al proveedor")
+    parser.add_argument("--semanas", type=int, default=8, help="semanas de historial")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    ruta = exportar_reposicion_csv(
+        args.salida, dias_entrega=args.entrega, dias_revision=args.revision,
+        semanas=args.semanas, hasta=args.hasta
+    )
+    print(f"Informe de reposición guardado en {ruta}")
@@ -0,0 +1,145 @@
+# archivado.py
+"""
+Archivado de pedidos antiguos en un archivo SQLite por año.
+
+Los pedidos (y sus líneas) con fecha anterior al corte se mueven de
+restaurante.db a <ARCHIVO_DIR>/pedidos_<año>.db, que cada conexión adjunta
+como "archivo_<año>" al salir del pool (ver database.adjuntar_archivos). Los contadores de
+ventas y demanda se quedan en la BD principal, así los gráficos por ventana
+no necesitan leer los archivos.
+
+Los informes y la reimpresión usan tablas_pedidos(desde, hasta): devuelve
+Pedido/PedidoMenu tal cual si el rango no toca años archivados, o entidades
+sobre un UNION ALL de la BD principal y los archivos del rango.
+
+SQLite adjunta a lo más 10 bases por conexión (valor de compilación usual).
+
+Uso:
+    python archivado.py 2024-01-01
+"""
+import argparse
+import os
+from datetime import date, datetime, time
+from sqlalchemy import MetaData, Table, Column, Index, select, union_all, func
+from sqlalchemy.orm import aliased
+import config
+from database import engine, anios_archivados, destino_archivo, DIALECTO
+from models import Pedido, PedidoMenu
+
+
+# ============================================================
+#               TABLAS DE UN ARCHIVO ANUAL
+# ============================================================
+
+_metadatas: dict[int, MetaData] = {}
+
+
+def _alias(anio: int) -> str:
+    return f"archivo_{anio}"
+
+
+def _tablas_archivo(anio: int) -> tuple[Table, Table]:
+    """Copias de pedidos/pedido_menus en el esquema adjunto (sin claves foráneas)."""
+    if anio not in _metadatas:
+        meta = MetaData(schema=_alias(anio))
+        for tabla in (Pedido.__table__, PedidoMenu.__table__):
+            Table(
+                tabla.name, meta,
+                *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in tabla.columns]
+            )
+        Index("ix_archivo_pedidos_fecha", meta.tables[f"{_alias(anio)}.pedidos"].c.fecha)
+        Index("ix_archivo_pedido_menus_pedido", meta.tables[f"{_alias(anio)}.pedido_menus"].c.pedido_id)
+        _metadatas[anio] = meta
+    meta = _metadatas[anio]
+    return meta.tables[f"{_alias(anio)}.pedidos"], meta.tables[f"{_alias(anio)}.pedido_menus"]
+
+
+# ============================================================
+#                CONSULTAS SOBRE PRINCIPAL + ARCHIVOS
+# ============================================================
+
+def anios_en_rango(desde: date | None = None, hasta: date | None = None) -> list[int]:
+    return [
+        a for a in anios_archivados()
+        if (desde is None or a >= desde.year) and (hasta is None or a <= hasta.year)
+    ]
+
+
+def tablas_pedidos(desde: date | None = None, hasta: date | None = None):
+    """
+    (P, PM) para consultar pedidos y líneas del rango [desde, hasta].
+    Sin archivos en el rango son Pedido y PedidoMenu; si no, alias ORM sobre
+    la unión de la BD principal con los archivos de esos años.
+    """
+    anios = anios_en_rango(desde, hasta)
+    if not anios:
+        return Pedido, PedidoMenu
+    tablas = [_tablas_archivo(a) for a in anios]
+    pedidos = union_all(
+        select(*Pedido.__table__.columns), *[select(*p.columns) for p, _ in tablas]
+    ).subquery("pedidos_todos")
+    lineas = union_all(
+        select(*PedidoMenu.__table__.columns), *[select(*pm.columns) for _, pm in tablas]
+    ).subquery("pedido_menus_todos")
+    return aliased(Pedido, pedidos), aliased(PedidoMenu, lineas)
+
+
+# ============================================================
+#                        ARCHIVADO
+# ============================================================
+
+def archivar(corte: date) -> dict[int, int]:
+    """
+    Mueve los pedidos con fecha < corte (y sus líneas) a su archivo anual.
+    Cada año se mueve en su propia transacción; repetirlo tras una caída no
+    duplica filas (INSERT OR IGNORE por id). Retorna {año: pedidos movidos}.
+    """
+    if DIALECTO != "sqlite":
+        raise ValueError("El archivado por año usa ATTACH de SQLite; en un servidor usar particiones.")
+    os.makedirs(config.ARCHIVO_DIR, exist_ok=True)
+    limite = datetime.combine(corte, time.min)
+    movidos = {}
+    with engine.connect() as conn:
+        anios = [
+            int(a) for a in conn.scalars(
+                select(func.strftime("%Y", Pedido.fecha)).where(Pedido.fecha < limite).distinct()
+            )
+        ]
+        conn.rollback()
+        adjuntas = {fila[1] for fila in conn.exec_driver_sql("PRAGMA database_list")}
+        for anio in anios:
+            # ATTACH no puede ir dentro de una transacción: va antes de mover filas
+            if _alias(anio) not in adjuntas:
+                conn.exec_driver_sql(f"ATTACH DATABASE ? AS {_alias(anio)}", (destino_archivo(anio),))
+            ped_a, lin_a = _tablas_archivo(anio)
+            _metadatas[anio].create_all(conn)
+            conn.commit()
+
+            ids = select(Pedido.id).where(
+                func.strftime("%Y", Pedido.fecha) == str(anio), Pedido.fecha < limite
+            )
+            conn.execute(
+                ped_a.insert().prefix_with("OR IGNORE").from_select(
+                    [c.name for c in Pedido.__table__.columns],
+                    select(*Pedido.__table__.columns).where(Pedido.id.in_(ids))
+                )
+            )
+            conn.execute(
+                lin_a.insert().prefix_with("OR IGNORE").from_select(
+                    [c.name for c in PedidoMenu.__table__.columns],
+                    select(*PedidoMenu.__table__.columns).where(PedidoMenu.pedido_id.in_(ids))
+                )
+            )
+            conn.execute(PedidoMenu.__table__.delete().where(PedidoMenu.pedido_id.in_(ids)))
+            movidos[anio] = conn.execute(Pedido.__table__.delete().where(Pedido.id.in_(ids))).rowcount
+            conn.commit()
+    # las demás conexiones adjuntan los archivos nuevos al salir del pool
+    return movidos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archiva los pedidos anteriores a una fecha.")
+    parser.add_argument("corte", type=date.fromisoformat)
+    args = parser.parse_args()
+    for anio, n in archivar(args.corte).items():
+        print(f"{anio}: {n} pedidos archivados en {config.ARCHIVO_DIR}/pedidos_{anio}.db")
@@ -0,0 +1,115 @@
+# benchmarks/bench_analitica.py
+"""
+Consumo de ingredientes sobre muchas líneas de pedido: bucles anidados por
+línea e ingrediente (el cálculo anterior) contra MatrizRecetas.
+
+Corre sobre la BD en memoria (memoria.py), sembrada al inicio; no toca
+restaurante.db.
+
+Uso:
+    python benchmarks/bench_analitica.py --lineas 1000000 --menus 60 --ingredientes 150
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+os.environ["RESTAURANTE_BD_URL"] = "memoria"
+os.environ.setdefault("RESTAURANTE_REPORTES_INSTANTANEA", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import insert, select
+import memoria
+from database import get_session
+from models import Cliente, IngredienteORM, MenuORM, MenuIngrediente, Pedido, PedidoMenu
+from crud.menu_crud import reconstruir_bom_completo
+from analitica import MatrizRecetas, vector_stock, unidades_vendidas, consumo_ingredientes
+
+POR_PEDIDO = 4  # líneas por pedido
+
+
+def sembrar(lineas: int, menus: int, ingredientes: int):
+    rnd = random.Random(1)
+    memoria.reiniciar("")
+    inicio = datetime(2023, 1, 1)
+    with get_session() as session:
+        session.execute(insert(Cliente), [{"id": 1, "nombre": "Bench", "correo": "bench@correo.cl"}])
+        session.execute(insert(IngredienteORM), [
+            {"id": i, "nombre": f"ing{i}", "unidad": "u", "stock": rnd.uniform(0, 1e5)}
+            for i in range(1, ingredientes + 1)
+        ])
+        session.execute(insert(MenuORM), [
+            {"id": m, "nombre": f"Menú {m}", "precio": 1000 + m} for m in range(1, menus + 1)
+        ])
+        session.execute(insert(MenuIngrediente), [
+            {"menu_id": m, "ingrediente_id": i, "cantidad": rnd.uniform(0.1, 3)}
+            for m in range(1, menus + 1)
+            for i in rnd.sample(range(1, ingredientes + 1), rnd.randint(2, 8))
+        ])
+        n_pedidos = lineas // POR_PEDIDO
+        session.execute(insert(Pedido), [
+            {"id": p, "cliente_id": 1, "fecha": inicio + timedelta(minutes=p), "total": 0}
+            for p in range(1, n_pedidos + 1)
+        ])
+        session.execute(insert(PedidoMenu), [
+            {"pedido_id": p, "menu_id": m, "cantidad": rnd.randint(1, 3), "precio_unitario": 1000}
+            for p in range(1, n_pedidos + 1)
+            for m in rnd.sample(range(1, menus + 1), POR_PEDIDO)
+        ])
+        session.commit()
+    reconstruir_bom_completo()
+
+
+def con_bucles() -> dict[str, float]:
+    """El cálculo anterior: por cada línea, recorrer los ingredientes de su menú."""
+    with get_session() as session:
+        recetas = {}
+        for menu in session.scalars(select(MenuORM)):
+            recetas[menu.id] = [(mi.ingrediente.nombre, mi.cantidad) for mi in menu.ingredientes]
+        lineas = session.execute(select(PedidoMenu.menu_id, PedidoMenu.cantidad)).all()
+    contador = Counter()
+    for menu_id, cantidad in lineas:
+        for nombre, cant in recetas[menu_id]:
+            contador[nombre] += cant * cantidad
+    return dict(contador)
+
+
+def _medir(funcion, repeticiones: int):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t)
+    return mejor, resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la matriz de recetas.")
+    parser.add_argument("--lineas", type=int, default=1_000_000)
+    parser.add_argument("--menus", type=int, default=60)
+    parser.add_argument("--ingredientes", type=int, default=150)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    sembrar(args.lineas, args.menus, args.ingredientes)
+    print(f"siembra ({args.lineas} líneas)      {time.perf_counter() - t:8.2f} s")
+
+    t_bucles, esperado = _medir(con_bucles, args.repeticiones)
+    t_matriz, obtenido = _medir(consumo_ingredientes, args.repeticiones)
+    assert esperado.keys() == obtenido.keys()
+    assert all(np.isclose(esperado[k], obtenido[k]) for k in esperado)
+    print(f"consumo con bucles              {t_bucles:8.3f} s")
+    print(f"consumo con MatrizRecetas       {t_matriz:8.3f} s  ({t_bucles / t_matriz:.1f}x)")
+
+    matriz = MatrizRecetas.cargar()
+    stock = vector_stock(matriz)
+    menu_ids, unidades = unidades_vendidas()
+    t_disp, _ = _medir(lambda: matriz.disponibilidad(stock), args.repeticiones)
+    t_proy, _ = _medir(lambda: matriz.proyectar_stock(stock, dict(zip(menu_ids, unidades))), args.repeticiones)
+    print(f"disponibilidad (todos los menús) {t_disp * 1e3:7.3f} ms")
+    print(f"proyectar_stock                 {t_proy * 1e3:8.3f} ms")
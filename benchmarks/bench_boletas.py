@@ -0,0 +1,57 @@
+# benchmarks/bench_boletas.py
+"""
+Boletas por segundo: BoletaRapida (canvas directo) contra la Boleta de
+Platypus, y la boleta ESC/POS en texto. Todo en memoria, sin disco.
+
+Uso:
+    python benchmarks/bench_boletas.py --boletas 200 --lineas 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf.boleta import Boleta
+from pdf.boleta_rapida import BoletaRapida
+from pdf.escpos import BoletaEscPos
+
+
+def _items(lineas: int, rnd: random.Random):
+    items = []
+    for i in range(lineas):
+        cant = rnd.randint(1, 4)
+        precio = rnd.randrange(900, 12000, 100)
+        items.append((f"Menú de prueba {i}", cant, precio, cant * precio))
+    return items
+
+
+def medir(boletas: int, lineas: int) -> dict[str, float]:
+    """Boletas por segundo de cada backend."""
+    rnd = random.Random(1)
+    lotes = [_items(lineas, rnd) for _ in range(boletas)]
+    backends = {
+        "Boleta (Platypus)": lambda items: Boleta(items).generar_pdf(BytesIO()),
+        "BoletaRapida": lambda items: BoletaRapida(items).generar_bytes(),
+        "BoletaEscPos": lambda items: BoletaEscPos(items).generar_bytes(),
+    }
+    resultados = {}
+    for nombre, generar in backends.items():
+        generar(lotes[0])  # calentamiento (fuentes, cachés)
+        t = time.perf_counter()
+        for items in lotes:
+            generar(items)
+        resultados[nombre] = boletas / (time.perf_counter() - t)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de generación de boletas.")
+    parser.add_argument("--boletas", type=int, default=200)
+    parser.add_argument("--lineas", type=int, default=8)
+    args = parser.parse_args()
+    for nombre, por_segundo in medir(args.boletas, args.lineas).items():
+        print(f"{nombre:<20} {por_segundo:10.1f} boletas/s")
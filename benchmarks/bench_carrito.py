@@ -0,0 +1,59 @@
+# benchmarks/bench_carrito.py
+"""
+Tiempo de las operaciones del carrito con muchas líneas: agregar, recalcular
+totales y armar el detalle de la boleta.
+
+Uso:
+    python benchmarks/bench_carrito.py --lineas 2000 --ingredientes 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carrito import Carrito, totales
+
+
+def medir(lineas: int, ingredientes: int, repeticiones: int = 5):
+    rnd = random.Random(1)
+    stock = {i: (f"ing{i}", 1e9) for i in range(ingredientes)}
+    recetas = {
+        m: {i: rnd.uniform(0.1, 5) for i in rnd.sample(range(ingredientes), min(5, ingredientes))}
+        for m in range(lineas)
+    }
+    resultados = {}
+    for _ in range(repeticiones):
+        c = Carrito()
+        for m, receta in recetas.items():
+            c.cargar_receta(m, receta, {i: stock[i] for i in receta})
+        t = time.perf_counter()
+        for m in recetas:
+            c.agregar(m, f"Menú {m}", rnd.uniform(500, 9000), rnd.randint(1, 3))
+        agregar = time.perf_counter() - t
+
+        t = time.perf_counter()
+        for _ in range(100):
+            c.subtotal, c.iva, c.total
+        totales_carrito = (time.perf_counter() - t) / 100
+
+        t = time.perf_counter()
+        totales(c.detalle_boleta())
+        detalle = time.perf_counter() - t
+
+        for nombre, v in (("agregar (por línea)", agregar / lineas),
+                          ("subtotal+iva+total", totales_carrito),
+                          ("detalle+totales boleta", detalle)):
+            resultados[nombre] = min(resultados.get(nombre, v), v)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del carrito con muchas líneas.")
+    parser.add_argument("--lineas", type=int, default=2000)
+    parser.add_argument("--ingredientes", type=int, default=200)
+    args = parser.parse_args()
+    for nombre, segundos in medir(args.lineas, args.ingredientes).items():
+        print(f"{nombre:<26} {segundos * 1e6:10.1f} µs")
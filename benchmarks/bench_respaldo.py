@@ -0,0 +1,147 @@
+# benchmarks/bench_respaldo.py
+"""
+Respaldo en línea (respaldo.py) sobre una BD SQLite de prueba: duración del
+respaldo (copia por pasos + integrity_check + gzip), de la verificación, y
+latencia de crear_pedido antes y durante el respaldo mientras otro hilo
+confirma un pedido cada `--intervalo` ms.
+
+Crea la BD en un directorio temporal que se borra al terminar; no toca
+restaurante.db.
+
+Uso:
+    python benchmarks/bench_respaldo.py --pedidos 200000 --intervalo 10
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+DIRECTORIO = tempfile.mkdtemp(prefix="bench_respaldo_")
+os.environ["RESTAURANTE_BD_URL"] = "sqlite:///" + os.path.join(DIRECTORIO, "bench.db")
+os.environ["RESTAURANTE_REPORTES_INSTANTANEA"] = "0"
+os.environ["RESTAURANTE_ARCHIVO_DIR"] = os.path.join(DIRECTORIO, "archivo")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from database import get_session, engine
+from main import init_db
+from models import Cliente, IngredienteORM, MenuORM, MenuIngrediente, Pedido, PedidoMenu
+from crud.menu_crud import reconstruir_bom_completo
+from crud.pedido_crud import crear_pedido
+from crud.estadistica_crud import reconstruir_contadores
+from respaldo import respaldar, verificar_respaldo, ruta_bd
+
+POR_PEDIDO = 4  # líneas por pedido
+MENUS = 60
+INGREDIENTES = 150
+
+
+def sembrar(pedidos: int):
+    rnd = random.Random(1)
+    init_db()
+    inicio = datetime(2023, 1, 1)
+    with get_session() as session:
+        session.execute(insert(Cliente), [{"id": 1, "nombre": "Bench", "correo": "bench@correo.cl"}])
+        session.execute(insert(IngredienteORM), [
+            {"id": i, "nombre": f"ing{i}", "unidad": "u", "stock": 1e9}
+            for i in range(1, INGREDIENTES + 1)
+        ])
+        session.execute(insert(MenuORM), [
+            {"id": m, "nombre": f"Menú {m}", "precio": 1000 + m} for m in range(1, MENUS + 1)
+        ])
+        session.execute(insert(MenuIngrediente), [
+            {"menu_id": m, "ingrediente_id": i, "cantidad": rnd.uniform(0.1, 3)}
+            for m in range(1, MENUS + 1)
+            for i in rnd.sample(range(1, INGREDIENTES + 1), rnd.randint(2, 8))
+        ])
+        for desde in range(1, pedidos + 1, 50_000):
+            hasta = min(desde + 50_000, pedidos + 1)
+            session.execute(insert(Pedido), [
+                {"id": p, "cliente_id": 1, "fecha": inicio + timedelta(minutes=p), "total": 4000,
+                 "descripcion": f"Pedido de prueba {p}"}
+                for p in range(desde, hasta)
+            ])
+            session.execute(insert(PedidoMenu), [
+                {"pedido_id": p, "menu_id": m, "cantidad": rnd.randint(1, 3), "precio_unitario": 1000}
+                for p in range(desde, hasta)
+                for m in rnd.sample(range(1, MENUS + 1), POR_PEDIDO)
+            ])
+        session.commit()
+    reconstruir_bom_completo()
+    reconstruir_contadores()
+
+
+class Caja(threading.Thread):
+    """Confirma un pedido cada `intervalo` segundos y anota cuánto tarda cada uno."""
+
+    def __init__(self, intervalo: float):
+        super().__init__(name="caja", daemon=True)
+        self.intervalo = intervalo
+        self.latencias: list[float] = []
+        self.parar = threading.Event()
+        self._rnd = random.Random(2)
+
+    def run(self):
+        while not self.parar.is_set():
+            items = {m: 1 for m in self._rnd.sample(range(1, MENUS + 1), 2)}
+            t = time.perf_counter()
+            crear_pedido(1, items)
+            self.latencias.append(time.perf_counter() - t)
+            self.parar.wait(self.intervalo)
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    orden = sorted(valores)
+    return orden[min(len(orden) - 1, int(p * len(orden)))]
+
+
+def _resumen(nombre: str, latencias: list[float]):
+    print(f"crear_pedido {nombre:<8} n={len(latencias):5d}  "
+          f"p50={_percentil(latencias, 0.5) * 1e3:7.2f} ms  "
+          f"p99={_percentil(latencias, 0.99) * 1e3:7.2f} ms  "
+          f"máx={max(latencias) * 1e3:7.2f} ms")
+
+
+def medir(pedidos: int, intervalo: float, segundos_base: float):
+    t = time.perf_counter()
+    sembrar(pedidos)
+    print(f"siembra ({pedidos} pedidos)        {time.perf_counter() - t:8.2f} s")
+    print(f"tamaño de la BD                   {os.path.getsize(ruta_bd()) / 2**20:8.1f} MB")
+
+    caja = Caja(intervalo)
+    caja.start()
+    time.sleep(segundos_base)
+    base = list(caja.latencias)
+
+    t = time.perf_counter()
+    destino = respaldar(os.path.join(DIRECTORIO, "respaldos"))
+    duracion = time.perf_counter() - t
+    durante = caja.latencias[len(base):]
+    caja.parar.set()
+    caja.join()
+
+    print(f"respaldo (copia+verif.+gzip)      {duracion:8.2f} s  "
+          f"({os.path.getsize(destino) / 2**20:.1f} MB comprimido)")
+    t = time.perf_counter()
+    resultado = verificar_respaldo(destino)
+    print(f"verificar_respaldo                {time.perf_counter() - t:8.2f} s  ({resultado})")
+    _resumen("antes", base)
+    _resumen("durante", durante)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del respaldo en línea.")
+    parser.add_argument("--pedidos", type=int, default=200_000)
+    parser.add_argument("--intervalo", type=float, default=10, help="ms entre pedidos")
+    parser.add_argument("--base", type=float, default=3, help="segundos midiendo sin respaldo")
+    args = parser.parse_args()
+    try:
+        medir(args.pedidos, args.intervalo / 1000, args.base)
+    finally:
+        engine.dispose()
+        shutil.rmtree(DIRECTORIO, ignore_errors=True)
@@ -0,0 +1,205 @@
+# carrito.py
+"""
+Modelo en memoria del carrito de la pestaña Compra.
+
+Los montos se manejan como enteros en pesos (CLP no usa decimales), así el
+subtotal, el IVA y el total nunca dependen de volver a leer textos formateados.
+El Treeview solo dibuja lo que hay aquí.
+"""
+
+import math
+import uuid
+
+IVA_PORCENTAJE = 19
+
+
+def a_pesos(valor) -> int:
+    """Convierte un precio (float de la BD) a pesos enteros, redondeando."""
+    return int(round(float(valor)))
+
+
+def calcular_iva(subtotal: int) -> int:
+    """IVA en pesos enteros, redondeando la mitad hacia arriba."""
+    return (subtotal * IVA_PORCENTAJE + 50) // 100
+
+
+def totales(items) -> tuple[int, int, int]:
+    """
+    (subtotal, iva, total) en pesos enteros para items
+    [(nombre, cantidad, precio_unitario, subtotal)]. La usan el carrito y
+    todas las boletas, así lo impreso coincide con lo que se cobró.
+    """
+    subtotal = sum(a_pesos(item[3]) for item in items)
+    iva = calcular_iva(subtotal)
+    return subtotal, iva, subtotal + iva
+
+
+def formatear_pesos(monto: int) -> str:
+    """1800 -> '$1.800'"""
+    return f"${monto:,}".replace(",", ".")
+
+
+class LineaCarrito:
+    __slots__ = ("menu_id", "nombre", "precio", "cantidad")
+
+    def __init__(self, menu_id: int, nombre: str, precio: int, cantidad: int = 0):
+        self.menu_id = menu_id
+        self.nombre = nombre
+        self.precio = precio
+        self.cantidad = cantidad
+
+    @property
+    def subtotal(self) -> int:
+        return self.precio * self.cantidad
+
+    def __repr__(self):
+        return f"<LineaCarrito {self.menu_id} {self.nombre} x{self.cantidad}>"
+
+
+class Carrito:
+    """
+    Líneas indexadas por id de menú (búsqueda O(1)) más un caché de recetas y
+    stock para validar cuántas unidades se pueden agregar sin ir a la BD.
+    """
+
+    def __init__(self):
+        # identifica las reservas de stock de este carrito
+        self.token = uuid.uuid4().hex
+        self._lineas: dict[int, LineaCarrito] = {}
+        self._recetas: dict[int, dict[int, float]] = {}
+        self._stock: dict[int, float] = {}
+        self._nombres_ing: dict[int, str] = {}
+        # ingredientes ya comprometidos por las líneas del carrito
+        self._consumo: dict[int, float] = {}
+
+    # ----------------- CACHÉ DE RECETAS -----------------
+    def tiene_receta(self, menu_id: int) -> bool:
+        return menu_id in self._recetas
+
+    def receta(self, menu_id: int) -> dict[int, float]:
+        return self._recetas[menu_id]
+
+    def cargar_receta(self, menu_id: int, receta: dict[int, float], stock: dict[int, tuple[str, float]]):
+        """
+        receta: {id_ingrediente: cantidad por unidad}
+        stock:  {id_ingrediente: (nombre, stock)}
+        """
+        self._recetas[menu_id] = dict(receta)
+        for ing_id, (nombre, cantidad) in stock.items():
+            self._nombres_ing[ing_id] = nombre
+            self._stock[ing_id] = cantidad
+
+    def invalidar_recetas(self):
+        """Olvida recetas y stock cacheados (p. ej. después de un pedido)."""
+        self._recetas.clear()
+        self._stock.clear()
+        self._nombres_ing.clear()
+
+    # ----------------- STOCK -----------------
+    def maximo_agregable(self, menu_id: int) -> int | float:
+        """
+        Unidades adicionales de un menú que caben en el stock cacheado,
+        descontando lo que ya ocupan las demás líneas del carrito.
+        Un menú sin receta no consume stock: math.inf.
+        """
+        maximo = math.inf
+        for ing_id, req in self._recetas[menu_id].items():
+            libre = self._stock.get(ing_id, 0.0) - self._consumo.get(ing_id, 0.0)
+            maximo = min(maximo, int(libre // req) if libre > 0 else 0)
+        return maximo
+
+    def _validar_stock(self, menu_id: int, cantidad: int, nombre: str):
+        receta = self._recetas[menu_id]
+        for ing_id, req in receta.items():
+            if self._stock.get(ing_id, 0.0) <= 0:
+                raise ValueError(f"No hay stock de {self._nombres_ing.get(ing_id, ing_id)}")
+        if self.maximo_agregable(menu_id) < cantidad:
+            linea = self._lineas.get(menu_id)
+            en_carrito = linea.cantidad if linea else 0
+            raise ValueError(
+                f"No puedes agregar más unidades de '{nombre}'.\n"
+                f"Máximo permitido: {en_carrito + self.maximo_agregable(menu_id)}"
+            )
+
+    def _sumar_consumo(self, menu_id: int, cantidad: int):
+        for ing_id, req in self._recetas.get(menu_id, {}).items():
+            self._consumo[ing_id] = self._consumo.get(ing_id, 0.0) + req * cantidad
+
+    # ----------------- LÍNEAS -----------------
+    def agregar(self, menu_id: int, nombre: str, precio, cantidad: int = 1) -> LineaCarrito:
+        """
+        Agrega unidades de un menú. Requiere su receta cargada.
+        Lanza ValueError si el stock cacheado no alcanza.
+        """
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser positiva.")
+        if menu_id not in self._recetas:
+            raise ValueError("Receta del menú no cargada.")
+        self._validar_stock(menu_id, cantidad, nombre)
+
+        linea = self._lineas.get(menu_id)
+        if linea is None:
+            linea = LineaCarrito(menu_id, nombre, a_pesos(precio))
+            self._lineas[menu_id] = linea
+        linea.cantidad += cantidad
+        self._sumar_consumo(menu_id, cantidad)
+        return linea
+
+    def reducir(self, menu_id: int, cantidad: int = 1):
+        """Resta unidades de una línea; la elimina si llega a cero."""
+        linea = self._lineas.get(menu_id)
+        if linea is None:
+            return None
+        cantidad = min(cantidad, linea.cantidad)
+        linea.cantidad -= cantidad
+        self._sumar_consumo(menu_id, -cantidad)
+        if linea.cantidad == 0:
+            del self._lineas[menu_id]
+        return linea
+
+    def quitar(self, menu_id: int):
+        linea = self._lineas.pop(menu_id, None)
+        if linea is not None:
+            self._sumar_consumo(menu_id, -linea.cantidad)
+        return linea
+
+    def vaciar(self):
+        """Vacía el carrito y lo identifica con un token nuevo."""
+        self._lineas.clear()
+        self._consumo.clear()
+        self.token = uuid.uuid4().hex
+
+    def linea(self, menu_id: int) -> LineaCarrito | None:
+        return self._lineas.get(menu_id)
+
+    @property
+    def lineas(self) -> list[LineaCarrito]:
+        return list(self._lineas.values())
+
+    def __len__(self):
+        return len(self._lineas)
+
+    def __bool__(self):
+        return bool(self._lineas)
+
+    # ----------------- TOTALES -----------------
+    @property
+    def subtotal(self) -> int:
+        return sum(l.subtotal for l in self._lineas.values())
+
+    @property
+    def iva(self) -> int:
+        return calcular_iva(self.subtotal)
+
+    @property
+    def total(self) -> int:
+        return self.subtotal + self.iva
+
+    # ----------------- SALIDAS -----------------
+    def items_pedido(self) -> dict[int, int]:
+        """Formato que espera crear_pedido: {menu_id: cantidad}"""
+        return {mid: l.cantidad for mid, l in self._lineas.items()}
+
+    def detalle_boleta(self) -> list[tuple[str, int, int, int]]:
+        """Formato que espera Boleta: (nombre, cantidad, precio_unitario, subtotal)"""
+        return [(l.nombre, l.cantidad, l.precio, l.subtotal) for l in self._lineas.values()]
@@ -0,0 +1,173 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func, literal
+from database import get_session, safe_commit, transaccion
+import dialecto
+from models import VentaMenu, VentaHora, MenuORM, VersionDatos
+from archivado import tablas_pedidos
+from instantanea import sesion_reportes
+
+VENTANAS = ("dia", "semana", "mes")
+
+
+# ============================================================
+#                 CLAVES DE CADA VENTANA
+# ============================================================
+
+def clave_ventana(ventana: str, fecha: date) -> str:
+    if isinstance(fecha, datetime):
+        fecha = fecha.date()
+    if ventana == "dia":
+        return fecha.isoformat()
+    if ventana == "semana":
+        return (fecha - timedelta(days=fecha.weekday())).isoformat()
+    if ventana == "mes":
+        return fecha.replace(day=1).isoformat()
+    if ventana == "total":
+        return ""
+    raise ValueError(f"Ventana no válida: {ventana}")
+
+
+def _claves(fecha) -> list[tuple[str, str]]:
+    return [("total", "")] + [(v, clave_ventana(v, fecha)) for v in VENTANAS]
+
+
+# ============================================================
+#        ACTUALIZACIÓN (dentro de la transacción del pedido)
+# ============================================================
+
+def registrar_venta(session, fecha, lineas, signo: int = 1):
+    """
+    Suma (o resta con signo=-1) las líneas de un pedido a los contadores.
+    lineas: [(menu_id, cantidad, precio_unitario), ...]
+    No hace commit: corre en la sesión de crear_pedido/eliminar_pedido.
+    """
+    filas = [
+        {
+            "periodo": periodo, "clave": clave, "menu_id": menu_id,
+            "cantidad": signo * cantidad, "monto": signo * cantidad * precio
+        }
+        for periodo, clave in _claves(fecha)
+        for menu_id, cantidad, precio in lineas
+    ]
+    if not filas:
+        return
+    dialecto.insertar_o_sumar(session, VentaMenu, filas, ["periodo", "clave", "menu_id"], ["cantidad", "monto"])
+
+
+def registrar_pedido_hora(session, fecha: datetime, total: float, signo: int = 1):
+    """Suma (o resta) un pedido al contador de su hora. No hace commit."""
+    fila = {
+        "fecha": fecha.date().isoformat(), "hora": fecha.hour, "dia_semana": fecha.weekday(),
+        "pedidos": signo, "monto": signo * total,
+    }
+    dialecto.insertar_o_sumar(session, VentaHora, [fila], ["fecha", "hora"], ["pedidos", "monto"])
+
+
+def marcar_cambio(session):
+    """
+    Sube el contador de versión de datos (caché de gráficos). No hace commit:
+    corre en la sesión que hizo el cambio, así la versión y los datos se ven
+    juntos. Llamarlo en todo lo que cambie pedidos, recetas, nombres o precios.
+    """
+    dialecto.insertar_o_sumar(session, VersionDatos, [{"nombre": "datos", "valor": 1}], ["nombre"], ["valor"])
+
+
+# ============================================================
+#                        CONSULTAS
+# ============================================================
+
+def version_cambios() -> int:
+    """Valor actual del contador de marcar_cambio (0 si nunca cambió nada). Lectura por clave primaria."""
+    with get_session() as session:
+        return session.scalar(select(VersionDatos.valor).where(VersionDatos.nombre == "datos")) or 0
+
+
+def top_menus(n: int = 5, ventana: str | None = None, fecha=None) -> list[tuple[str, int]]:
+    """
+    Los `n` menús más vendidos: de siempre (ventana=None) o del día/semana/mes
+    que contiene `fecha` (hoy por defecto). Lee el índice de ranking con LIMIT.
+    """
+    periodo = ventana or "total"
+    clave = clave_ventana(periodo, fecha or date.today())
+    with sesion_reportes() as session:
+        return [
+            tuple(r) for r in session.execute(
+                select(MenuORM.nombre, VentaMenu.cantidad)
+                .join(MenuORM, VentaMenu.menu_id == MenuORM.id)
+                .where(VentaMenu.periodo == periodo, VentaMenu.clave == clave, VentaMenu.cantidad > 0)
+                .order_by(VentaMenu.cantidad.desc())
+                .limit(n)
+            ).all()
+        ]
+
+
+def demanda_por_hora(desde: date | None = None, hasta: date | None = None) -> list[tuple[int, int, int, float]]:
+    """
+    [(dia_semana, hora, pedidos, monto)] sumados en el rango (inclusive).
+    Lee a lo más 24 filas por día del rango, no los pedidos.
+    """
+    stmt = (
+        select(VentaHora.dia_semana, VentaHora.hora, func.sum(VentaHora.pedidos), func.sum(VentaHora.monto))
+        .group_by(VentaHora.dia_semana, VentaHora.hora)
+    )
+    if desde is not None:
+        stmt = stmt.where(VentaHora.fecha >= desde.isoformat())
+    if hasta is not None:
+        stmt = stmt.where(VentaHora.fecha <= hasta.isoformat())
+    with sesion_reportes() as session:
+        return [tuple(r) for r in session.execute(stmt).all()]
+
+
+# ============================================================
+#             RECONSTRUCCIÓN DESDE pedidos / pedido_menus
+# ============================================================
+
+_EXPR_CLAVE = {
+    "total": lambda col: literal(""),
+    "dia": lambda col: dialecto.clave_fecha(col, "dia"),
+    "semana": lambda col: dialecto.clave_fecha(col, "semana"),
+    "mes": lambda col: dialecto.clave_fecha(col, "mes"),
+}
+
+
+@transaccion()
+def reconstruir_contadores() -> int:
+    """
+    Recalcula todos los contadores desde los pedidos (incluidos los archivados).
+    Retorna filas generadas.
+    """
+    P, PM = tablas_pedidos()
+    with get_session() as session:
+        session.execute(delete(VentaHora))
+        dia = dialecto.clave_fecha(P.fecha, "dia")
+        hora = dialecto.hora(P.fecha)
+        dia_semana = dialecto.dia_semana(P.fecha)
+        session.execute(
+            VentaHora.__table__.insert().from_select(
+                ["fecha", "hora", "dia_semana", "pedidos", "monto"],
+                select(dia, hora, dia_semana, func.count(P.id), func.sum(P.total))
+                .group_by(dia, hora, dia_semana)
+            )
+        )
+
+        session.execute(delete(VentaMenu))
+        for periodo, expr in _EXPR_CLAVE.items():
+            clave = expr(P.fecha)
+            # "total" tiene una sola clave: agrupar por la constante falla en PostgreSQL
+            agrupar = [PM.menu_id] if periodo == "total" else [clave, PM.menu_id]
+            session.execute(
+                VentaMenu.__table__.insert().from_select(
+                    ["periodo", "clave", "menu_id", "cantidad", "monto"],
+                    select(
+                        literal(periodo), clave, PM.menu_id,
+                        func.sum(PM.cantidad),
+                        func.sum(PM.cantidad * PM.precio_unitario)
+                    )
+                    .join(P, PM.pedido_id == P.id)
+                    .group_by(*agrupar)
+                )
+            )
+        n = session.scalar(select(func.count(VentaMenu.id))) + session.scalar(select(func.count(VentaHora.id)))
+        marcar_cambio(session)
+        safe_commit(session)
+    return n
@@ -1,272 +1,458 @@
-# ============================================================
-#         CREAR MENÚS PREDETERMINADOS (DESDE APP)
-# ============================================================
-def crear_menus_predeterminados():
-    menus_defecto = [
-        {
-            "nombre": "Papas fritas",
-            "descripcion": "Papas fritas clásicas, crujientes y doradas.",
-            "precio": 500,
-            "ingredientes": {"papas": 5}
-        },
-        {
-            "nombre": "Pepsi",
-            "descripcion": "Bebida gaseosa refrescante Pepsi.",
-            "precio": 1100,
-            "ingredientes": {"pepsi": 1}
-        },
-        {
-            "nombre": "Completo",
-            "descripcion": "Pan con vienesa, tomate y palta, estilo chileno.",
-            "precio": 1800,
-            "ingredientes": {"vienesa": 1, "pan de completo": 1, "tomate": 1, "palta": 1}
-        },
-        {
-            "nombre": "Hamburguesa",
-            "descripcion": "Hamburguesa tradicional con queso y carne.",
-            "precio": 3500,
-            "ingredientes": {"pan de hamburguesa": 1, "lamina de queso": 1, "churrasco de carne": 1}
-        },
-        {
-            "nombre": "Panqueques",
-            "descripcion": "Panqueques rellenos de manjar y espolvoreados con azúcar flor.",
-            "precio": 2000,
-            "ingredientes": {"panqueques": 2, "manjar": 1, "azucar flor": 1}
-        },
-        {
-            "nombre": "Pollo frito",
-            "descripcion": "Presa de pollo empanizada y frita, muy crocante.",
-            "precio": 2800,
-            "ingredientes": {"presa de pollo": 1, "porcion de harina": 1, "porcion de aceite": 1}
-        },
-        {
-            "nombre": "Ensalada mixta",
-            "descripcion": "Ensalada fresca de lechuga, tomate y zanahoria rallada.",
-            "precio": 1500,
-            "ingredientes": {"lechuga": 1, "tomate": 1, "zanahoria rallada": 1}
-        }
-    ]
-
-    from crud.ingrediente_crud import listar_ingredientes
-    from sqlalchemy.orm import Session
-    from database import get_session, safe_commit
-    import tkinter.messagebox as messagebox
-
-    with get_session() as session:
-        existentes = {m.nombre.lower() for m in session.scalars(select(MenuORM)).all()}
-        ingredientes_bd = {ing.nombre.lower(): ing for ing in session.scalars(select(IngredienteORM)).all()}
-        generados = []
-        errores = []
-        for menu in menus_defecto:
-            if menu["nombre"].lower() not in existentes:
-                faltantes = []
-                for nombre_ing, cantidad in menu["ingredientes"].items():
-                    ing = ingredientes_bd.get(nombre_ing.lower())
-                    if not ing:
-                        faltantes.append(f"Ingrediente '{nombre_ing}' no encontrado.")
-                    elif ing.stock < cantidad:
-                        faltantes.append(f"No hay suficiente stock de '{nombre_ing}' (stock: {ing.stock}, requerido: {cantidad})")
-                if faltantes:
-                    errores.append(f"No se pudo crear el menú '{menu['nombre']}':\n" + "\n".join(faltantes))
-                    continue
-                # Descontar stock
-                for nombre_ing, cantidad in menu["ingredientes"].items():
-                    ing = ingredientes_bd[nombre_ing.lower()]
-                    ing.stock -= cantidad
-                # Crear menú
-                try:
-                    nuevo_menu = MenuORM(
-                        nombre=menu["nombre"],
-                        descripcion=menu["descripcion"],
-                        precio=menu["precio"]
-                    )
-                    session.add(nuevo_menu)
-                    session.flush()
-                    for nombre_ing, cantidad in menu["ingredientes"].items():
-                        ing = ingredientes_bd[nombre_ing.lower()]
-                        session.add(MenuIngrediente(
-                            menu_id=nuevo_menu.id,
-                            ingrediente_id=ing.id,
-                            cantidad=float(cantidad)
-                        ))
-                    safe_commit(session)
-                    generados.append(menu["nombre"])
-                except Exception as e:
-                    errores.append(f"Error al crear menú '{menu['nombre']}': {e}")
-        # Mostrar solo una ventana emergente al final
-        import tkinter.messagebox as messagebox
-        if generados:
-            messagebox.showinfo("Menús generados", f"Menús generados correctamente: {', '.join(generados)}")
-        if errores:
-            messagebox.showwarning("Errores al generar menús", '\n\n'.join(errores))
-# ============================================================
-#      LIMPIAR INGREDIENTES HUÉRFANOS DE MENÚS
-# ============================================================
-def limpiar_menu_ingredientes_huerfanos():
-    from database import get_session
-    from models import MenuIngrediente, IngredienteORM
-    with get_session() as session:
-        huerfanos = session.query(MenuIngrediente).outerjoin(IngredienteORM, MenuIngrediente.ingrediente_id == IngredienteORM.id).filter(IngredienteORM.id == None).all()
-        count = 0
-        for mi in huerfanos:
-            session.delete(mi)
-            count += 1
-        session.commit()
-    return count
-# crud/menu_crud.py
-from functools import reduce
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
-from database import get_session, safe_commit
-from models import MenuORM, MenuIngrediente, IngredienteORM
-
-
-# ============================================================
-#                  CREAR MENÚ
-# ============================================================
-def crear_menu(nombre: str, descripcion: str, precio: float, ingredientes_cantidades: dict[int, float]):
-    """
-    ingredientes_cantidades: dict {id_ingrediente: cantidad_requerida}
-    """
-    if not nombre.strip():
-        raise ValueError("El nombre del menú no puede estar vacío.")
-    if precio <= 0:
-        raise ValueError("El precio debe ser positivo.")
-    if any(c <= 0 for c in ingredientes_cantidades.values()):
-        raise ValueError("Las cantidades de ingredientes deben ser positivas.")
-
-    with get_session() as session:
-        existe = session.scalars(
-            select(MenuORM).where(MenuORM.nombre.ilike(nombre.strip()))
-        ).first()
-        if existe:
-            raise ValueError("Ya existe un menú con ese nombre.")
-
-        ids = list(ingredientes_cantidades.keys())
-        encontrados = session.scalars(
-            select(IngredienteORM).where(IngredienteORM.id.in_(ids))
-        ).all()
-        if len(encontrados) != len(ids):
-            raise ValueError("Hay ingredientes que no existen.")
-
-        menu = MenuORM(
-            nombre=nombre.strip(),
-            descripcion=descripcion.strip(),
-            precio=float(precio)
-        )
-        session.add(menu)
-        session.flush()  # obtener id
-
-        # asignar ingredientes
-        for id_ing, cant in ingredientes_cantidades.items():
-            session.add(MenuIngrediente(
-                menu_id=menu.id,
-                ingrediente_id=id_ing,
-                cantidad=float(cant)
-            ))
-
-        safe_commit(session)
-        session.refresh(menu)
-        return menu
-
-
-# ============================================================
-#            LISTADOS DE MENÚS (USADOS EN COMPRA)
-# ============================================================
-
-# 🚀 Versión ligera: NO carga ingredientes.
-# Usar esta función en la pestaña COMPRA para EVITAR el error unique()
-def listar_menus_basico():
-    with get_session() as session:
-        return session.scalars(
-            select(MenuORM).order_by(MenuORM.nombre)
-        ).all()
-
-
-# ============================================================
-#       LISTAR MENÚS COMPLETOS (CON INGREDIENTES)
-# ============================================================
-
-def listar_menus():
-    """Cargar menús + ingredientes (para edición)."""
-    with get_session() as session:
-        result = session.scalars(
-            select(MenuORM)
-            .options(
-                joinedload(MenuORM.ingredientes)
-                .joinedload(MenuIngrediente.ingrediente)
-            )
-            .order_by(MenuORM.nombre)
-        )
-        return result.unique().all()   # ✔ OBLIGATORIO
-
-
-def obtener_menu(id_menu: int):
-    with get_session() as session:
-        result = session.scalars(
-            select(MenuORM)
-            .options(
-                joinedload(MenuORM.ingredientes)
-                .joinedload(MenuIngrediente.ingrediente)
-            )
-            .where(MenuORM.id == id_menu)
-        )
-        return result.unique().one_or_none()
-
-
-# ============================================================
-#                    ACTUALIZAR MENÚ
-# ============================================================
-
-def actualizar_menu(id_menu: int, nombre: str, descripcion: str, precio: float,
-                    ingredientes_cantidades: dict[int, float]):
-    if precio <= 0:
-        raise ValueError("El precio debe ser positivo.")
-
-    with get_session() as session:
-        menu = session.get(MenuORM, id_menu)
-        if not menu:
-            raise ValueError("Menú no encontrado.")
-
-        menu.nombre = nombre.strip()
-        menu.descripcion = descripcion.strip()
-        menu.precio = float(precio)
-
-        # borrar ingredientes anteriores
-        for mi in list(menu.ingredientes):
-            session.delete(mi)
-        session.flush()
-
-        # agregar nuevos ingredientes
-        for id_ing, cant in ingredientes_cantidades.items():
-            if cant <= 0:
-                continue
-            session.add(MenuIngrediente(
-                menu_id=menu.id,
-                ingrediente_id=id_ing,
-                cantidad=float(cant)
-            ))
-
-        safe_commit(session)
-        return menu
-
-
-# ============================================================
-#                       ELIMINAR MENÚ
-# ============================================================
-
-def eliminar_menu(id_menu: int):
-    from models import PedidoMenu
-    with get_session() as session:
-        menu = session.get(MenuORM, id_menu)
-        if not menu:
-            raise ValueError("Menú no encontrado.")
-
-        en_pedido = session.scalars(
-            select(PedidoMenu).where(PedidoMenu.menu_id == id_menu)
-        ).first()
-        if en_pedido:
-            raise ValueError("No se puede eliminar un menú que tiene pedidos asociados.")
-
-        session.delete(menu)
-        safe_commit(session)
+# ============================================================
+#         CREAR MENÚS PREDETERMINADOS (DESDE APP)
+# ============================================================
+def crear_menus_predeterminados():
+    menus_defecto = [
+        {
+            "nombre": "Papas fritas",
+            "descripcion": "Papas fritas clásicas, crujientes y doradas.",
+            "precio": 500,
+            "ingredientes": {"papas": 5}
+        },
+        {
+            "nombre": "Pepsi",
+            "descripcion": "Bebida gaseosa refrescante Pepsi.",
+            "precio": 1100,
+            "ingredientes": {"pepsi": 1}
+        },
+        {
+            "nombre": "Completo",
+            "descripcion": "Pan con vienesa, tomate y palta, estilo chileno.",
+            "precio": 1800,
+            "ingredientes": {"vienesa": 1, "pan de completo": 1, "tomate": 1, "palta": 1}
+        },
+        {
+            "nombre": "Hamburguesa",
+            "descripcion": "Hamburguesa tradicional con queso y carne.",
+            "precio": 3500,
+            "ingredientes": {"pan de hamburguesa": 1, "lamina de queso": 1, "churrasco de carne": 1}
+        },
+        {
+            "nombre": "Panqueques",
+            "descripcion": "Panqueques rellenos de manjar y espolvoreados con azúcar flor.",
+            "precio": 2000,
+            "ingredientes": {"panqueques": 2, "manjar": 1, "azucar flor": 1}
+        },
+        {
+            "nombre": "Pollo frito",
+            "descripcion": "Presa de pollo empanizada y frita, muy crocante.",
+            "precio": 2800,
+            "ingredientes": {"presa de pollo": 1, "porcion de harina": 1, "porcion de aceite": 1}
+        },
+        {
+            "nombre": "Ensalada mixta",
+            "descripcion": "Ensalada fresca de lechuga, tomate y zanahoria rallada.",
+            "precio": 1500,
+            "ingredientes": {"lechuga": 1, "tomate": 1, "zanahoria rallada": 1}
+        }
+    ]
+
+    from crud.ingrediente_crud import listar_ingredientes
+    from sqlalchemy.orm import Session
+    from database import get_session, safe_commit
+    import tkinter.messagebox as messagebox
+
+    with get_session() as session:
+        existentes = {m.nombre.lower() for m in session.scalars(select(MenuORM)).all()}
+        ingredientes_bd = {ing.nombre.lower(): ing for ing in session.scalars(select(IngredienteORM)).all()}
+        generados = []
+        errores = []
+        for menu in menus_defecto:
+            if menu["nombre"].lower() not in existentes:
+                faltantes = []
+                for nombre_ing, cantidad in menu["ingredientes"].items():
+                    ing = ingredientes_bd.get(nombre_ing.lower())
+                    if not ing:
+                        faltantes.append(f"Ingrediente '{nombre_ing}' no encontrado.")
+                    elif ing.stock < cantidad:
+                        faltantes.append(f"No hay suficiente stock de '{nombre_ing}' (stock: {ing.stock}, requerido: {cantidad})")
+                if faltantes:
+                    errores.append(f"No se pudo crear el menú '{menu['nombre']}':\n" + "\n".join(faltantes))
+                    continue
+                # Descontar stock
+                for nombre_ing, cantidad in menu["ingredientes"].items():
+                    ing = ingredientes_bd[nombre_ing.lower()]
+                    ing.stock -= cantidad
+                # Crear menú
+                try:
+                    nuevo_menu = MenuORM(
+                        nombre=menu["nombre"],
+                        descripcion=menu["descripcion"],
+                        precio=menu["precio"]
+                    )
+                    session.add(nuevo_menu)
+                    session.flush()
+                    for nombre_ing, cantidad in menu["ingredientes"].items():
+                        ing = ingredientes_bd[nombre_ing.lower()]
+                        session.add(MenuIngrediente(
+                            menu_id=nuevo_menu.id,
+                            ingrediente_id=ing.id,
+                            cantidad=float(cantidad)
+                        ))
+                    session.flush()
+                    reconstruir_bom(session, [nuevo_menu.id])
+                    safe_commit(session)
+                    generados.append(menu["nombre"])
+                except Exception as e:
+                    errores.append(f"Error al crear menú '{menu['nombre']}': {e}")
+        # Mostrar solo una ventana emergente al final
+        import tkinter.messagebox as messagebox
+        if generados:
+            messagebox.showinfo("Menús generados", f"Menús generados correctamente: {', '.join(generados)}")
+        if errores:
+            messagebox.showwarning("Errores al generar menús", '\n\n'.join(errores))
+# ============================================================
+#      LIMPIAR INGREDIENTES HUÉRFANOS DE MENÚS
+# ============================================================
+def limpiar_menu_ingredientes_huerfanos():
+    """Borra en una sola sentencia las filas de receta cuyo ingrediente ya no existe."""
+    from sqlalchemy import delete, exists
+    from database import get_session, safe_commit
+    from models import MenuIngrediente, IngredienteORM
+    with get_session() as session:
+        count = session.execute(
+            delete(MenuIngrediente)
+            .where(~exists().where(IngredienteORM.id == MenuIngrediente.ingrediente_id))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        safe_commit(session)
+    return count
+# crud/menu_crud.py
+from functools import reduce
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import joinedload
+from database import get_session, safe_commit, transaccion
+from models import MenuORM, MenuIngrediente, IngredienteORM, MenuComponente, MenuBOM
+from crud.estadistica_crud import marcar_cambio
+
+
+# ============================================================
+#                  CREAR MENÚ
+# ============================================================
+@transaccion()
+def crear_menu(nombre: str, descripcion: str, precio: float, ingredientes_cantidades: dict[int, float],
+               categoria: str | None = None, componentes: dict[int, float] | None = None,
+               es_preparacion: bool = False):
+    """
+    ingredientes_cantidades: dict {id_ingrediente: cantidad_requerida}
+    componentes: dict {id_menu_preparacion: unidades} (sub-recetas)
+    """
+    if not nombre.strip():
+        raise ValueError("El nombre del menú no puede estar vacío.")
+    if precio <= 0:
+        raise ValueError("El precio debe ser positivo.")
+    if any(c <= 0 for c in ingredientes_cantidades.values()):
+        raise ValueError("Las cantidades de ingredientes deben ser positivas.")
+    componentes = componentes or {}
+    if any(c <= 0 for c in componentes.values()):
+        raise ValueError("Las cantidades de las sub-recetas deben ser positivas.")
+
+    with get_session() as session:
+        existe = session.scalars(
+            select(MenuORM).where(MenuORM.nombre.ilike(nombre.strip()))
+        ).first()
+        if existe:
+            raise ValueError("Ya existe un menú con ese nombre.")
+
+        ids = list(ingredientes_cantidades.keys())
+        encontrados = session.scalars(
+            select(IngredienteORM).where(IngredienteORM.id.in_(ids))
+        ).all()
+        if len(encontrados) != len(ids):
+            raise ValueError("Hay ingredientes que no existen.")
+
+        menu = MenuORM(
+            nombre=nombre.strip(),
+            descripcion=descripcion.strip(),
+            precio=float(precio),
+            categoria=(categoria or "").strip() or None,
+            es_preparacion=bool(es_preparacion)
+        )
+        session.add(menu)
+        session.flush()  # obtener id
+
+        # asignar ingredientes
+        for id_ing, cant in ingredientes_cantidades.items():
+            session.add(MenuIngrediente(
+                menu_id=menu.id,
+                ingrediente_id=id_ing,
+                cantidad=float(cant)
+            ))
+        _asignar_componentes(session, menu.id, componentes)
+
+        session.flush()
+        reconstruir_bom(session, [menu.id])
+        safe_commit(session)
+        session.refresh(menu)
+        return menu
+
+
+# ============================================================
+#            LISTADOS DE MENÚS (USADOS EN COMPRA)
+# ============================================================
+
+# 🚀 Versión ligera: NO carga ingredientes.
+# Usar esta función en la pestaña COMPRA para EVITAR el error unique()
+def listar_menus_basico():
+    """Menús a la venta (sin las preparaciones)."""
+    with get_session() as session:
+        return session.scalars(
+            select(MenuORM)
+            .where(MenuORM.es_preparacion.is_not(True))
+            .order_by(MenuORM.nombre)
+        ).all()
+
+
+# ============================================================
+#       LISTAR MENÚS COMPLETOS (CON INGREDIENTES)
+# ============================================================
+
+def listar_menus():
+    """Cargar menús + ingredientes (para edición)."""
+    with get_session() as session:
+        result = session.scalars(
+            select(MenuORM)
+            .options(
+                joinedload(MenuORM.ingredientes)
+                .joinedload(MenuIngrediente.ingrediente)
+            )
+            .order_by(MenuORM.nombre)
+        )
+        return result.unique().all()   # ✔ OBLIGATORIO
+
+
+def listar_preparaciones():
+    """Preparaciones (sub-recetas que se pueden agregar a otros menús)."""
+    with get_session() as session:
+        return session.scalars(
+            select(MenuORM)
+            .where(MenuORM.es_preparacion.is_(True))
+            .order_by(MenuORM.nombre)
+        ).all()
+
+
+def obtener_menu(id_menu: int):
+    with get_session() as session:
+        result = session.scalars(
+            select(MenuORM)
+            .options(
+                joinedload(MenuORM.ingredientes)
+                .joinedload(MenuIngrediente.ingrediente),
+                joinedload(MenuORM.componentes)
+            )
+            .where(MenuORM.id == id_menu)
+        )
+        return result.unique().one_or_none()
+
+
+# ============================================================
+#                    ACTUALIZAR MENÚ
+# ============================================================
+
+@transaccion()
+def actualizar_menu(id_menu: int, nombre: str, descripcion: str, precio: float,
+                    ingredientes_cantidades: dict[int, float], categoria: str | None = None,
+                    componentes: dict[int, float] | None = None, es_preparacion: bool | None = None):
+    """componentes=None deja las sub-recetas como estaban; {} las quita. es_preparacion=None no cambia la marca."""
+    if precio <= 0:
+        raise ValueError("El precio debe ser positivo.")
+
+    with get_session() as session:
+        menu = session.get(MenuORM, id_menu)
+        if not menu:
+            raise ValueError("Menú no encontrado.")
+
+        menu.nombre = nombre.strip()
+        menu.descripcion = descripcion.strip()
+        menu.precio = float(precio)
+        menu.categoria = (categoria or "").strip() or None
+        if es_preparacion is not None:
+            menu.es_preparacion = bool(es_preparacion)
+
+        # borrar ingredientes anteriores
+        for mi in list(menu.ingredientes):
+            session.delete(mi)
+        session.flush()
+
+        # agregar nuevos ingredientes
+        for id_ing, cant in ingredientes_cantidades.items():
+            if cant <= 0:
+                continue
+            session.add(MenuIngrediente(
+                menu_id=menu.id,
+                ingrediente_id=id_ing,
+                cantidad=float(cant)
+            ))
+
+        if componentes is not None:
+            for mc in list(menu.componentes):
+                session.delete(mc)
+            session.flush()
+            _asignar_componentes(session, menu.id, componentes)
+
+        session.flush()
+        reconstruir_bom(session, [menu.id])
+        safe_commit(session)
+        return menu
+
+
+# ============================================================
+#                       ELIMINAR MENÚ
+# ============================================================
+
+@transaccion()
+def eliminar_menu(id_menu: int):
+    from archivado import tablas_pedidos
+    with get_session() as session:
+        menu = session.get(MenuORM, id_menu)
+        if not menu:
+            raise ValueError("Menú no encontrado.")
+
+        # también los pedidos archivados: sus boletas se reimprimen con el nombre del menú
+        _, PM = tablas_pedidos()
+        en_pedido = session.scalar(select(PM.id).where(PM.menu_id == id_menu).limit(1))
+        if en_pedido:
+            raise ValueError("No se puede eliminar un menú que tiene pedidos asociados.")
+
+        usado_en = session.scalars(
+            select(MenuORM.nombre)
+            .join(MenuComponente, MenuComponente.menu_id == MenuORM.id)
+            .where(MenuComponente.componente_id == id_menu)
+        ).all()
+        if usado_en:
+            raise ValueError(f"No se puede eliminar: es sub-receta de {', '.join(usado_en)}.")
+
+        session.execute(delete(MenuBOM).where(MenuBOM.menu_id == id_menu))
+        session.delete(menu)
+        marcar_cambio(session)
+        safe_commit(session)
+
+
+# ============================================================
+#          RECETAS (menu_id -> {ingrediente_id: cantidad})
+# ============================================================
+
+def obtener_recetas(ids_menu) -> dict[int, dict[int, float]]:
+    """
+    Devuelve la receta aplanada de cada menú (incluye las sub-recetas) como
+    diccionario plano, sin cargar ORM. Lee menu_bom: una consulta para todos.
+    Los menús sin ingredientes quedan con receta vacía.
+    """
+    ids = list(ids_menu)
+    recetas = {mid: {} for mid in ids}
+    if not ids:
+        return recetas
+    with get_session() as session:
+        rows = session.execute(
+            select(MenuBOM.menu_id, MenuBOM.ingrediente_id, MenuBOM.cantidad)
+            .where(MenuBOM.menu_id.in_(ids))
+        ).all()
+    for menu_id, ing_id, cantidad in rows:
+        recetas[menu_id][ing_id] = cantidad
+    return recetas
+
+
+# ============================================================
+#          SUB-RECETAS Y RECETA APLANADA (menu_bom)
+# ============================================================
+
+def _grafo_componentes(session) -> dict[int, dict[int, float]]:
+    """{menu_id: {componente_id: cantidad}} de todas las sub-recetas."""
+    grafo = {}
+    for menu_id, comp_id, cant in session.execute(
+        select(MenuComponente.menu_id, MenuComponente.componente_id, MenuComponente.cantidad)
+    ):
+        grafo.setdefault(menu_id, {})[comp_id] = cant
+    return grafo
+
+
+def _descendientes(grafo, ids) -> set[int]:
+    """ids más todas sus sub-recetas, a cualquier profundidad."""
+    vistos = set()
+    pendientes = list(ids)
+    while pendientes:
+        actual = pendientes.pop()
+        if actual not in vistos:
+            vistos.add(actual)
+            pendientes.extend(grafo.get(actual, ()))
+    return vistos
+
+
+def _ancestros(grafo, ids) -> set[int]:
+    """ids más todos los menús que los usan, directa o indirectamente."""
+    padres = {}
+    for menu_id, comps in grafo.items():
+        for comp_id in comps:
+            padres.setdefault(comp_id, set()).add(menu_id)
+    return _descendientes(padres, ids)
+
+
+def _asignar_componentes(session, menu_id: int, componentes: dict[int, float]):
+    """Agrega las sub-recetas de un menú validando que existan y que no formen un ciclo."""
+    if not componentes:
+        return
+    if any(c <= 0 for c in componentes.values()):
+        raise ValueError("Las cantidades de las sub-recetas deben ser positivas.")
+    existentes = set(session.scalars(select(MenuORM.id).where(MenuORM.id.in_(componentes.keys()))))
+    if len(existentes) != len(componentes):
+        raise ValueError("Hay sub-recetas que no existen.")
+    if menu_id in _descendientes(_grafo_componentes(session), componentes.keys()):
+        raise ValueError("La sub-receta forma un ciclo: un menú no puede contenerse a sí mismo.")
+    for comp_id, cant in componentes.items():
+        session.add(MenuComponente(menu_id=menu_id, componente_id=comp_id, cantidad=float(cant)))
+
+
+def _aplanar(menu_id, grafo, directos, memo) -> dict[int, float]:
+    if menu_id not in memo:
+        receta = dict(directos.get(menu_id, {}))
+        for comp_id, cant in grafo.get(menu_id, {}).items():
+            for ing_id, c in _aplanar(comp_id, grafo, directos, memo).items():
+                receta[ing_id] = receta.get(ing_id, 0.0) + cant * c
+        memo[menu_id] = receta
+    return memo[menu_id]
+
+
+def reconstruir_bom(session, ids=None) -> int:
+    """
+    Recalcula la receta aplanada de `ids` y de todos los menús que los usan
+    como sub-receta (ids=None: todos los menús). Retorna los menús recalculados.
+    No hace commit: corre en la sesión que modificó la receta (hacer flush antes).
+    También marca el cambio para la caché de gráficos (nombre y precio incluidos).
+    """
+    marcar_cambio(session)
+    grafo = _grafo_componentes(session)
+    if ids is None:
+        afectados = set(session.scalars(select(MenuORM.id)))
+    else:
+        afectados = _ancestros(grafo, ids)
+    if not afectados:
+        return 0
+
+    # ingredientes directos de los afectados y de su subárbol (sin huérfanos)
+    directos = {}
+    for menu_id, ing_id, cant in session.execute(
+        select(MenuIngrediente.menu_id, MenuIngrediente.ingrediente_id, MenuIngrediente.cantidad)
+        .join(IngredienteORM, MenuIngrediente.ingrediente_id == IngredienteORM.id)
+        .where(MenuIngrediente.menu_id.in_(_descendientes(grafo, afectados)))
+    ):
+        directos.setdefault(menu_id, {})[ing_id] = cant
+
+    memo = {}
+    filas = [
+        {"menu_id": menu_id, "ingrediente_id": ing_id, "cantidad": cant}
+        for menu_id in afectados
+        for ing_id, cant in _aplanar(menu_id, grafo, directos, memo).items()
+    ]
+    session.execute(delete(MenuBOM).where(MenuBOM.menu_id.in_(afectados)))
+    if filas:
+        session.execute(insert(MenuBOM), filas)
+    return len(afectados)
+
+
+@transaccion()
+def reconstruir_bom_completo() -> int:
+    """Recalcula menu_bom para todos los menús (migración o reparación)."""
+    with get_session() as session:
+        n = reconstruir_bom(session)
+        safe_commit(session)
+    return n
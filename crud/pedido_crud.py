@@ -1,120 +1,164 @@
-from datetime import datetime
-from functools import reduce
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
-from database import get_session, safe_commit
-from models import Pedido, PedidoMenu, MenuORM, Cliente, MenuIngrediente, IngredienteORM
-
-
-def crear_pedido(id_cliente: int, items: dict[int, int], descripcion: str = "", fecha=None):
-    if not items:
-        raise ValueError("El pedido no tiene productos.")
-
-    with get_session() as session:
-        cliente = session.get(Cliente, id_cliente)
-        if not cliente:
-            raise ValueError("Cliente no válido.")
-
-        menus = session.scalars(
-            select(MenuORM)
-            .options(
-                joinedload(MenuORM.ingredientes)
-                .joinedload(MenuIngrediente.ingrediente)
-            )
-            .where(MenuORM.id.in_(items.keys()))
-        ).unique().all()
-
-        if len(menus) != len(items):
-            raise ValueError("Hay menús que no existen.")
-
-        requeridos = {}
-        for menu in menus:
-            cant_menu = items[menu.id]
-            for mi in menu.ingredientes:
-                req = mi.cantidad * cant_menu
-                requeridos[mi.ingrediente_id] = requeridos.get(mi.ingrediente_id, 0.0) + req
-
-        ingredientes = session.scalars(
-            select(IngredienteORM).where(IngredienteORM.id.in_(requeridos.keys()))
-        ).all()
-
-        faltantes = [
-            (ing.id, requeridos[ing.id], ing.stock)
-            for ing in ingredientes
-            if requeridos[ing.id] > ing.stock
-        ]
-
-        if faltantes:
-            raise ValueError(
-                "Stock insuficiente:\n" +
-                "\n".join(f"- Ing {fid}: req={req}, stock={stock}" for fid, req, stock in faltantes)
-            )
-
-        total = sum(menu.precio * items[menu.id] for menu in menus)
-
-        if fecha is None:
-            fecha = datetime.now()
-
-        pedido = Pedido(
-            cliente_id=id_cliente,
-            fecha=fecha,
-            total=total,
-            descripcion=descripcion
-        )
-        session.add(pedido)
-        session.flush()
-
-        for menu in menus:
-            session.add(PedidoMenu(
-                pedido_id=pedido.id,
-                menu_id=menu.id,
-                cantidad=items[menu.id],
-                precio_unitario=menu.precio
-            ))
-
-        for ing in ingredientes:
-            ing.stock -= requeridos[ing.id]
-
-        safe_commit(session)
-        session.refresh(pedido)
-        return pedido
-
-
-# ================================================
-# 🚀 LISTADOS DE PEDIDOS CON .unique() (OBLIGATORIO)
-# ================================================
-
-def listar_pedidos():
-    with get_session() as session:
-        result = session.scalars(
-            select(Pedido)
-            .options(
-                joinedload(Pedido.cliente),
-                joinedload(Pedido.items).joinedload(PedidoMenu.menu)
-            )
-        )
-        return result.unique().all()
-
-
-
-def listar_pedidos_por_cliente(id_cliente: int):
-    with get_session() as session:
-        result = session.scalars(
-            select(Pedido)
-            .options(
-                joinedload(Pedido.cliente),
-                joinedload(Pedido.items).joinedload(PedidoMenu.menu)
-            )
-            .where(Pedido.cliente_id == id_cliente)
-            .order_by(Pedido.fecha.desc())
-        )
-        return result.unique().all()  # <-- FIX
-
-
-def eliminar_pedido(id_pedido: int):
-    with get_session() as session:
-        ped = session.get(Pedido, id_pedido)
-        if not ped:
-            raise ValueError("Pedido no encontrado.")
-        session.delete(ped)
-        safe_commit(session)
+from datetime import datetime
+from functools import reduce
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from database import get_session, safe_commit, transaccion
+from models import Pedido, PedidoMenu, MenuORM, Cliente, MenuBOM, ReservaStock
+from crud.reserva_crud import reservado_por_otros
+from crud.estadistica_crud import registrar_venta, registrar_pedido_hora, marcar_cambio
+from dialecto import descontar_stock
+
+
+def _pedido_por_clave(session, clave: str):
+    return session.scalars(
+        select(Pedido).where(Pedido.clave_idempotencia == clave)
+    ).first()
+
+
+@transaccion()
+def crear_pedido(id_cliente: int, items: dict[int, int], descripcion: str = "", fecha=None,
+                 carrito: str | None = None, clave_idempotencia: str | None = None):
+    """
+    carrito: token del carrito que originó el pedido. Sus reservas no cuentan
+    contra el stock y se liberan al confirmar; las de otros carritos sí se descuentan.
+    clave_idempotencia: si ya existe un pedido con esa clave se retorna ese
+    pedido sin volver a descontar stock.
+    """
+    if not items:
+        raise ValueError("El pedido no tiene productos.")
+
+    with get_session() as session:
+        if clave_idempotencia is not None:
+            existente = _pedido_por_clave(session, clave_idempotencia)
+            if existente:
+                return existente
+
+        cliente = session.get(Cliente, id_cliente)
+        if not cliente:
+            raise ValueError("Cliente no válido.")
+
+        menus = session.scalars(
+            select(MenuORM).where(MenuORM.id.in_(items.keys()))
+        ).all()
+
+        if len(menus) != len(items):
+            raise ValueError("Hay menús que no existen.")
+        if any(m.es_preparacion for m in menus):
+            raise ValueError("Las preparaciones no se venden solas.")
+
+        # receta aplanada (incluye sub-recetas): una fila por menú e ingrediente
+        requeridos = {}
+        for menu_id, ing_id, cant in session.execute(
+            select(MenuBOM.menu_id, MenuBOM.ingrediente_id, MenuBOM.cantidad)
+            .where(MenuBOM.menu_id.in_(items.keys()))
+        ):
+            requeridos[ing_id] = requeridos.get(ing_id, 0.0) + cant * items[menu_id]
+
+        # Se descuenta primero (UPDATE atómico que bloquea las filas hasta el
+        # commit) y se valida sobre el stock resultante: dos terminales no
+        # pueden aprobar el mismo stock. Si falta, el rollback lo devuelve.
+        restante = descontar_stock(session, requeridos)
+        reservado = reservado_por_otros(session, restante.keys(), carrito)
+
+        faltantes = [
+            (ing_id, requeridos[ing_id], stock + requeridos[ing_id] - reservado.get(ing_id, 0.0))
+            for ing_id, stock in restante.items()
+            if stock < reservado.get(ing_id, 0.0)
+        ]
+
+        if faltantes:
+            raise ValueError(
+                "Stock insuficiente:\n" +
+                "\n".join(f"- Ing {fid}: req={req}, stock={stock}" for fid, req, stock in faltantes)
+            )
+
+        total = sum(menu.precio * items[menu.id] for menu in menus)
+
+        if fecha is None:
+            fecha = datetime.now()
+
+        pedido = Pedido(
+            cliente_id=id_cliente,
+            fecha=fecha,
+            total=total,
+            descripcion=descripcion,
+            clave_idempotencia=clave_idempotencia
+        )
+        session.add(pedido)
+        try:
+            session.flush()
+        except IntegrityError:
+            # Otra terminal confirmó la misma clave entre la consulta y el insert
+            session.rollback()
+            existente = _pedido_por_clave(session, clave_idempotencia) if clave_idempotencia else None
+            if existente is None:
+                raise
+            return existente
+
+        for menu in menus:
+            session.add(PedidoMenu(
+                pedido_id=pedido.id,
+                menu_id=menu.id,
+                cantidad=items[menu.id],
+                precio_unitario=menu.precio
+            ))
+
+        registrar_venta(session, fecha, [(menu.id, items[menu.id], menu.precio) for menu in menus])
+        registrar_pedido_hora(session, fecha, total)
+        marcar_cambio(session)
+
+        if carrito is not None:
+            session.execute(delete(ReservaStock).where(ReservaStock.carrito == carrito))
+
+        safe_commit(session)
+        session.refresh(pedido)
+        return pedido
+
+
+# ================================================
+# 🚀 LISTADOS DE PEDIDOS CON .unique() (OBLIGATORIO)
+# ================================================
+
+def listar_pedidos():
+    with get_session() as session:
+        result = session.scalars(
+            select(Pedido)
+            .options(
+                joinedload(Pedido.cliente),
+                joinedload(Pedido.items).joinedload(PedidoMenu.menu)
+            )
+        )
+        return result.unique().all()
+
+
+
+def listar_pedidos_por_cliente(id_cliente: int):
+    with get_session() as session:
+        result = session.scalars(
+            select(Pedido)
+            .options(
+                joinedload(Pedido.cliente),
+                joinedload(Pedido.items).joinedload(PedidoMenu.menu)
+            )
+            .where(Pedido.cliente_id == id_cliente)
+            .order_by(Pedido.fecha.desc())
+        )
+        return result.unique().all()  # <-- FIX
+
+
+@transaccion()
+def eliminar_pedido(id_pedido: int):
+    with get_session() as session:
+        ped = session.get(Pedido, id_pedido)
+        if not ped:
+            raise ValueError("Pedido no encontrado.")
+        registrar_venta(
+            session, ped.fecha,
+            [(it.menu_id, it.cantidad, it.precio_unitario) for it in ped.items],
+            signo=-1
+        )
+        registrar_pedido_hora(session, ped.fecha, ped.total, signo=-1)
+        marcar_cambio(session)
+        session.delete(ped)
+        safe_commit(session)
@@ -0,0 +1,233 @@
+import heapq
+import logging
+import platform
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, update, func
+from database import get_session, safe_commit, transaccion
+from models import ReservaStock, IngredienteORM
+
+# Tiempo que un menú queda "apartado" en un carrito sin actividad
+RESERVA_TTL_SEGUNDOS = 600
+
+TERMINAL = platform.node() or "terminal"
+
+log = logging.getLogger(__name__)
+
+
+# ============================================================
+#          CONSULTAS (solo ingredientes involucrados)
+# ============================================================
+
+def reservado_por_otros(session, ids_ingredientes, carrito: str | None = None, ahora=None) -> dict[int, float]:
+    """
+    Suma de reservas vigentes de otros carritos para los ingredientes dados.
+    Usa el índice (ingrediente_id, expira): no recorre todas las reservas.
+    """
+    ids = list(ids_ingredientes)
+    if not ids:
+        return {}
+    if ahora is None:
+        ahora = datetime.now()
+    stmt = (
+        select(ReservaStock.ingrediente_id, func.sum(ReservaStock.cantidad))
+        .where(ReservaStock.ingrediente_id.in_(ids), ReservaStock.expira > ahora)
+        .group_by(ReservaStock.ingrediente_id)
+    )
+    if carrito is not None:
+        stmt = stmt.where(ReservaStock.carrito != carrito)
+    return dict(session.execute(stmt).all())
+
+
+def stock_disponible(ids_ingredientes, carrito: str | None = None) -> dict[int, tuple[str, float]]:
+    """
+    {id_ingrediente: (nombre, stock - reservas de otros carritos)}
+    """
+    ids = list(ids_ingredientes)
+    if not ids:
+        return {}
+    with get_session() as session:
+        rows = session.execute(
+            select(IngredienteORM.id, IngredienteORM.nombre, IngredienteORM.stock)
+            .where(IngredienteORM.id.in_(ids))
+        ).all()
+        reservado = reservado_por_otros(session, ids, carrito)
+    return {
+        ing_id: (nombre, stock - reservado.get(ing_id, 0.0))
+        for ing_id, nombre, stock in rows
+    }
+
+
+# ============================================================
+#                 RESERVAR / LIBERAR
+# ============================================================
+
+@transaccion()
+def reservar(carrito: str, menu_id: int, receta: dict[int, float], cantidad: int = 1,
+             ttl: int = RESERVA_TTL_SEGUNDOS):
+    """
+    Aparta los ingredientes de `cantidad` unidades del menú para el carrito.
+    Renueva la expiración de todo el carrito. Retorna la nueva fecha de expiración.
+    """
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser positiva.")
+
+    ahora = datetime.now()
+    expira = ahora + timedelta(seconds=ttl)
+
+    with get_session() as session:
+        ids = list(receta.keys())
+        stock = dict(session.execute(
+            select(IngredienteORM.id, IngredienteORM.stock).where(IngredienteORM.id.in_(ids))
+        ).all())
+        reservado = reservado_por_otros(session, ids, carrito, ahora)
+        propias = {
+            (r.menu_id, r.ingrediente_id): r
+            for r in session.scalars(
+                select(ReservaStock).where(
+                    ReservaStock.carrito == carrito,
+                    ReservaStock.ingrediente_id.in_(ids)
+                )
+            ).all()
+        }
+        en_carrito = {}
+        for r in propias.values():
+            en_carrito[r.ingrediente_id] = en_carrito.get(r.ingrediente_id, 0.0) + r.cantidad
+
+        faltantes = []
+        for ing_id, req in receta.items():
+            necesario = en_carrito.get(ing_id, 0.0) + req * cantidad
+            libre = stock.get(ing_id, 0.0) - reservado.get(ing_id, 0.0)
+            if necesario > libre:
+                faltantes.append((ing_id, necesario, libre))
+        if faltantes:
+            raise ValueError(
+                "Stock reservado por otra terminal:\n" +
+                "\n".join(f"- Ing {fid}: req={req}, libre={libre}" for fid, req, libre in faltantes)
+            )
+
+        for ing_id, req in receta.items():
+            fila = propias.get((menu_id, ing_id))
+            if fila:
+                fila.cantidad += req * cantidad
+            else:
+                session.add(ReservaStock(
+                    carrito=carrito,
+                    terminal=TERMINAL,
+                    menu_id=menu_id,
+                    ingrediente_id=ing_id,
+                    cantidad=req * cantidad,
+                    expira=expira
+                ))
+
+        session.execute(
+            update(ReservaStock).where(ReservaStock.carrito == carrito).values(expira=expira)
+        )
+        safe_commit(session)
+    return expira
+
+
+@transaccion()
+def liberar(carrito: str, menu_id: int | None = None) -> int:
+    """
+    Libera las reservas de un carrito (o solo las de un menú). Retorna filas borradas.
+    """
+    with get_session() as session:
+        stmt = delete(ReservaStock).where(ReservaStock.carrito == carrito)
+        if menu_id is not None:
+            stmt = stmt.where(ReservaStock.menu_id == menu_id)
+        n = session.execute(stmt).rowcount
+        safe_commit(session)
+    return n
+
+
+@transaccion()
+def liberar_expiradas(ahora=None) -> int:
+    """Borra reservas vencidas de cualquier terminal (usa el índice por expira)."""
+    if ahora is None:
+        ahora = datetime.now()
+    with get_session() as session:
+        n = session.execute(delete(ReservaStock).where(ReservaStock.expira <= ahora)).rowcount
+        safe_commit(session)
+    return n
+
+
+# ============================================================
+#        PROGRAMADOR DE EXPIRACIÓN (heap, por terminal)
+# ============================================================
+
+class ProgramadorExpiracion:
+    """
+    Heap de (expira, carrito) para los carritos de esta terminal.
+    Renovar un carrito deja la entrada vieja en el heap; se descarta al salir
+    porque ya no coincide con la expiración vigente (borrado perezoso).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._vigente: dict[str, datetime] = {}
+
+    def programar(self, carrito: str, expira: datetime):
+        self._vigente[carrito] = expira
+        heapq.heappush(self._heap, (expira, carrito))
+
+    def cancelar(self, carrito: str):
+        self._vigente.pop(carrito, None)
+
+    def proxima(self) -> datetime | None:
+        while self._heap and self._vigente.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def vencidos(self, ahora=None) -> list[str]:
+        """Saca del heap y retorna los carritos cuya reserva ya expiró."""
+        if ahora is None:
+            ahora = datetime.now()
+        vencidos = []
+        while self._heap and self._heap[0][0] <= ahora:
+            expira, carrito = heapq.heappop(self._heap)
+            if self._vigente.get(carrito) == expira:
+                del self._vigente[carrito]
+                vencidos.append(carrito)
+        return vencidos
+
+
+# ============================================================
+#        LIMPIEZA EN SEGUNDO PLANO (fuera del hilo de la UI)
+# ============================================================
+
+class LimpiezaReservas:
+    """
+    La app llama a tick() periódicamente con los carritos de esta terminal
+    que vencieron (ver ProgramadorExpiracion.vencidos). Sus reservas y las
+    vencidas de cualquier terminal se borran en un hilo aparte (uno a la vez),
+    así el tick no espera a la BD. Un error queda en el log y se reintenta
+    en el próximo tick.
+    """
+
+    def __init__(self):
+        self._hilo = None
+
+    def ocupado(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def tick(self, carritos=()) -> bool:
+        if self.ocupado():
+            return False
+        self._hilo = threading.Thread(
+            target=self._correr, args=(list(carritos),), name="reservas", daemon=True
+        )
+        self._hilo.start()
+        return True
+
+    def esperar(self, timeout: float | None = None):
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def _correr(self, carritos: list[str]):
+        try:
+            for carrito in carritos:
+                liberar(carrito)
+            liberar_expiradas()
+        except Exception:
+            log.exception("No se pudieron liberar las reservas vencidas")
@@ -1,34 +1,326 @@
-# database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.exc import SQLAlchemyError
-
-DATABASE_URL = "sqlite:///restaurante.db"  # puedes cambiar a otro motor si quieres
-
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,           # pon True si quieres ver las consultas en consola
-    future=True
-)
-
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
-
-Base = declarative_base()
-
-
-def get_session():
-    """
-    Crea una sesión nueva. Usar con with para asegurar rollback en errores.
-    """
-    return SessionLocal()
-
-
-def safe_commit(session):
-    """
-    Commit con rollback automático en caso de error.
-    """
-    try:
-        session.commit()
-    except SQLAlchemyError:
-        session.rollback()
-        raise
+# database.py
+import os
+import pathlib
+import random
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, DBAPIError
+import config
+
+# BD en memoria: VFS memdb de SQLite, compartida por todas las conexiones del
+# proceso (sin el "shared cache" y sus bloqueos por tabla). Vive mientras haya
+# una conexión abierta: ANCLA la mantiene aunque el pool se cierre.
+EN_MEMORIA = config.BD_URL == "memoria"
+NOMBRE_MEMORIA = "file:/restaurante?vfs=memdb"
+
+DATABASE_URL = (  # sqlite:///restaurante.db o postgresql+psycopg2://...
+    f"sqlite:///{NOMBRE_MEMORIA}&uri=true" if EN_MEMORIA else config.BD_URL
+)
+ANCLA = sqlite3.connect(NOMBRE_MEMORIA, uri=True, check_same_thread=False) if EN_MEMORIA else None
+
+
+def _crear_engine(url: str):
+    """
+    SQLite: un archivo local con espera ante bloqueos. Servidor (PostgreSQL):
+    pool de conexiones acotado para varias terminales.
+    """
+    if url.startswith("sqlite"):
+        return create_engine(
+            url,
+            echo=False,           # pon True si quieres ver las consultas en consola
+            future=True,
+            # espera de SQLite ante un bloqueo; lo que pase de esto lo reintenta @transaccion
+            connect_args={"timeout": config.BD_ESPERA_BLOQUEO}
+        )
+    if not url.startswith("postgresql"):
+        raise ValueError(f"Motor de BD no soportado: {url.split(':', 1)[0]} (usar sqlite o postgresql)")
+    return create_engine(
+        url,
+        echo=False,
+        future=True,
+        pool_size=config.BD_POOL_TAMANO,
+        max_overflow=config.BD_POOL_EXTRA,
+        pool_timeout=config.TRANSACCION_PLAZO,
+        pool_recycle=config.BD_POOL_RECICLAR,
+        pool_pre_ping=True,   # descarta conexiones que el servidor cerró
+    )
+
+
+engine = _crear_engine(DATABASE_URL)
+
+# "sqlite" o "postgresql": lo consultan dialecto.py y las funciones solo-SQLite
+DIALECTO = engine.dialect.name
+
+# Archivos anuales de pedidos: pedidos_<año>.db se adjunta como "archivo_<año>"
+PATRON_ARCHIVO = re.compile(r"^pedidos_(\d{4})\.db$")
+
+
+def anios_archivados() -> list[int]:
+    if DIALECTO != "sqlite" or not os.path.isdir(config.ARCHIVO_DIR):
+        return []
+    return sorted(
+        int(m.group(1)) for m in map(PATRON_ARCHIVO.match, os.listdir(config.ARCHIVO_DIR)) if m
+    )
+
+
+def firma_archivos() -> tuple:
+    """
+    (año, mtime_ns, tamaño) de cada archivo anual. Cambia cuando un archivado
+    (de este u otro proceso) crea un archivo o le mueve filas.
+    """
+    firma = []
+    for anio in anios_archivados():
+        try:
+            st = os.stat(os.path.join(config.ARCHIVO_DIR, f"pedidos_{anio}.db"))
+        except OSError:
+            continue
+        firma.append((anio, st.st_mtime_ns, st.st_size))
+    return tuple(firma)
+
+
+def destino_archivo(anio: int) -> str:
+    """
+    Lo que va en ATTACH DATABASE para el archivo de `anio`. En memoria la
+    conexión usa el VFS memdb y un ATTACH por ruta lo heredaría (BD vacía en
+    RAM): ahí se adjunta por URI con el VFS del sistema.
+    """
+    ruta = os.path.join(config.ARCHIVO_DIR, f"pedidos_{anio}.db")
+    if not EN_MEMORIA:
+        return ruta
+    vfs = "win32" if os.name == "nt" else "unix"
+    return f"{pathlib.Path(ruta).absolute().as_uri()}?vfs={vfs}"
+
+
+def adjuntar_archivos(dbapi_conn, *_):
+    """
+    Adjunta (ATTACH DATABASE) los archivos anuales que la conexión aún no
+    tiene. Corre al abrir la conexión y cada vez que sale del pool: un
+    archivado hecho por otro proceso (CLI) aparece en las conexiones que ya
+    estaban abiertas.
+    """
+    anios = anios_archivados()
+    if not anios:
+        return
+    adjuntas = {fila[1] for fila in dbapi_conn.execute("PRAGMA database_list")}
+    for anio in anios:
+        if f"archivo_{anio}" not in adjuntas:
+            dbapi_conn.execute(f"ATTACH DATABASE ? AS archivo_{anio}", (destino_archivo(anio),))
+
+
+def escuchar_archivos(motor):
+    """Registra adjuntar_archivos en un engine SQLite (principal o instantánea)."""
+    event.listen(motor, "connect", adjuntar_archivos)
+    event.listen(motor, "checkout", adjuntar_archivos)
+
+
+if DIALECTO == "sqlite":
+    escuchar_archivos(engine)
+
+
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+Base = declarative_base()
+
+
+# Sesión de la unidad de trabajo activa en este hilo (None = cada operación la suya)
+_unidad_actual: ContextVar = ContextVar("unidad_de_trabajo", default=None)
+
+
+class _SesionCompartida:
+    """Lo que entrega get_session() dentro de una unidad de trabajo: su sesión, sin cerrarla."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def __enter__(self):
+        return self.session
+
+    def __exit__(self, *_exc):
+        return False
+
+
+def get_session():
+    """
+    Crea una sesión nueva. Usar con with para asegurar rollback en errores.
+    Dentro de unidad_de_trabajo() entrega la sesión de la unidad.
+    """
+    unidad = _unidad_actual.get()
+    if unidad is not None:
+        return _SesionCompartida(unidad)
+    return SessionLocal()
+
+
+def safe_commit(session):
+    """
+    Commit con rollback automático en caso de error. Los reintentos ante
+    "database is locked" los hace @transaccion sobre la operación completa.
+    Dentro de una unidad de trabajo solo hace flush: el commit es al salir
+    de la unidad.
+    """
+    if session is _unidad_actual.get():
+        session.flush()
+        return
+    try:
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        raise
+
+
+@contextmanager
+def unidad_de_trabajo():
+    """
+    Agrupa varias llamadas al CRUD en una sola sesión y transacción:
+
+        with unidad_de_trabajo():
+            crear_menu(...)
+            nombres = {i.id: i.nombre for i in listar_ingredientes()}
+
+    Las funciones del CRUD se unen a la unidad a través de get_session() y
+    safe_commit(). Se confirma todo al salir o se revierte todo ante una
+    excepción; una unidad anidada se une a la externa. Los objetos
+    retornados conservan sus atributos cargados después del commit
+    (expire_on_commit=False). No cruza hilos: la cola de tareas abre las suyas.
+    """
+    actual = _unidad_actual.get()
+    if actual is not None:
+        yield actual
+        return
+
+    session = SessionLocal(expire_on_commit=False)
+    revertida = []
+    event.listen(session, "after_rollback", lambda _s: revertida.append(True))
+    token = _unidad_actual.set(session)
+    try:
+        yield session
+        if revertida:
+            # una operación hizo rollback a mitad de camino: lo anterior ya no está
+            raise ValueError("La operación se revirtió a mitad de camino; no se guardaron los cambios.")
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        _unidad_actual.reset(token)
+        session.close()
+
+
+# ============================================================
+#            TRANSACCIONES CON REINTENTO Y MÉTRICAS
+# ============================================================
+
+class BDOcupada(ValueError):
+    """La BD siguió bloqueada por otra terminal hasta agotar el plazo."""
+
+
+# PostgreSQL: serialization_failure, deadlock_detected, lock_not_available
+_SQLSTATE_TRANSITORIOS = {"40001", "40P01", "55P03"}
+
+
+def es_bloqueo(error: Exception) -> bool:
+    """
+    True si el error es transitorio: un bloqueo de SQLite (otra conexión
+    escribiendo) o un conflicto entre transacciones de PostgreSQL.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    codigo = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    if codigo is not None:
+        return codigo in _SQLSTATE_TRANSITORIOS
+    if not isinstance(error, OperationalError):
+        return False
+    mensaje = str(error.orig if error.orig is not None else error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class MetricasTransacciones:
+    """Contadores por operación, compartidos entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos: dict[str, dict] = {}
+
+    def registrar(self, nombre: str, intentos: int, espera: float, resultado: str):
+        with self._lock:
+            d = self._datos.setdefault(nombre, {
+                "llamadas": 0, "intentos": 0, "reintentos": 0, "espera": 0.0,
+                "espera_max": 0.0, "ok": 0, "error": 0, "agotadas": 0,
+            })
+            d["llamadas"] += 1
+            d["intentos"] += intentos
+            d["reintentos"] += intentos - 1
+            d["espera"] += espera
+            d["espera_max"] = max(d["espera_max"], espera)
+            d[resultado] += 1
+
+    def resumen(self) -> dict[str, dict]:
+        with self._lock:
+            return {nombre: dict(d) for nombre, d in self._datos.items()}
+
+    def reiniciar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+metricas_transacciones = MetricasTransacciones()
+
+
+def transaccion(nombre: str | None = None, plazo: float | None = None,
+                espera_base: float = 0.02, espera_max: float = 0.5):
+    """
+    Decorador para operaciones de escritura del CRUD. Si la operación falla
+    por un bloqueo de la BD se vuelve a ejecutar completa (con una sesión
+    nueva: la anterior ya hizo rollback al cerrarse) tras una espera
+    aleatoria que crece al doble en cada intento, hasta agotar `plazo`
+    segundos (TRANSACCION_PLAZO). Agotado el plazo lanza BDOcupada.
+
+    Cada llamada queda en metricas_transacciones bajo `nombre` (por defecto
+    el de la función): intentos, segundos esperando y resultado
+    ("ok", "error" o "agotadas").
+
+    Dentro de una unidad de trabajo la función corre una sola vez: reintentar
+    una parte de la transacción no sirve. Para reintentar la unidad completa
+    se decora la función que abre unidad_de_trabajo().
+    """
+    def decorador(funcion):
+        operacion = nombre or funcion.__name__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if _unidad_actual.get() is not None:
+                return funcion(*args, **kwargs)
+            limite = config.TRANSACCION_PLAZO if plazo is None else plazo
+            fin = time.monotonic() + limite
+            intentos, espera = 0, 0.0
+            while True:
+                intentos += 1
+                try:
+                    valor = funcion(*args, **kwargs)
+                except Exception as e:
+                    restante = fin - time.monotonic()
+                    if not es_bloqueo(e):
+                        metricas_transacciones.registrar(operacion, intentos, espera, "error")
+                        raise
+                    if restante <= 0:
+                        metricas_transacciones.registrar(operacion, intentos, espera, "agotadas")
+                        raise BDOcupada(
+                            "La base de datos está ocupada por otra terminal. "
+                            "Intenta nuevamente en unos segundos."
+                        ) from e
+                    # espera aleatoria completa (full jitter) para no reintentar en fila
+                    pausa = min(restante, random.uniform(0, min(espera_max, espera_base * 2 ** intentos)))
+                    time.sleep(pausa)
+                    espera += pausa
+                    continue
+                metricas_transacciones.registrar(operacion, intentos, espera, "ok")
+                return valor
+
+        return envoltura
+    return decorador
@@ -0,0 +1,113 @@
+# dialecto.py
+"""
+SQL que cambia según el motor de la BD (SQLite o PostgreSQL, ver
+config.BD_URL). El resto del código arma sus consultas con estas funciones
+en vez de usar func.date/strftime o el insert de un dialecto en particular.
+
+    truncar_fecha(col, unidad)   inicio del intervalo (hora, dia, semana, mes)
+    clave_fecha(col, unidad)     lo mismo como texto AAAA-MM-DD
+    hora(col), dia_semana(col)   enteros; dia_semana: lunes = 0
+    insertar_o_sumar(...)        upsert que acumula columnas numéricas
+    descontar_stock(...)         resta atómica de stock (sin leer y escribir)
+"""
+from sqlalchemy import update, select, case, cast, func, literal_column, Integer
+from sqlalchemy.dialects import sqlite, postgresql
+from database import DIALECTO
+from models import IngredienteORM
+
+UNIDADES = ("hora", "dia", "semana", "mes")
+_TRUNC_PG = {"hora": "hour", "dia": "day", "semana": "week", "mes": "month"}  # semana ISO: lunes
+
+# Las constantes van como literales SQL y no como parámetros: PostgreSQL
+# compara el GROUP BY con el SELECT por texto y date_trunc($1, ...) no
+# coincide con date_trunc($2, ...).
+
+
+def _validar(unidad: str):
+    if unidad not in UNIDADES:
+        raise ValueError(f"Unidad de fecha no válida: {unidad}")
+
+
+# ============================================================
+#                   AGRUPACIÓN POR FECHA
+# ============================================================
+
+def truncar_fecha(col, unidad: str):
+    """
+    Lleva cada fecha al inicio de su intervalo (la semana empieza el lunes).
+    En SQLite es texto ('AAAA-MM-DD[ HH:00:00]'); en PostgreSQL, timestamp.
+    """
+    _validar(unidad)
+    if DIALECTO == "postgresql":
+        return func.date_trunc(literal_column(f"'{_TRUNC_PG[unidad]}'"), col)
+    return {
+        "hora": lambda: func.strftime("%Y-%m-%d %H:00:00", col),
+        "dia": lambda: func.date(col),
+        "semana": lambda: func.date(col, "weekday 0", "-6 days"),
+        "mes": lambda: func.strftime("%Y-%m-01", col),
+    }[unidad]()
+
+
+def clave_fecha(col, unidad: str):
+    """Inicio del intervalo como texto AAAA-MM-DD (claves de los contadores)."""
+    _validar(unidad)
+    if unidad == "hora":
+        raise ValueError("clave_fecha no admite la unidad 'hora'.")
+    if DIALECTO == "postgresql":
+        return func.to_char(truncar_fecha(col, unidad), literal_column("'YYYY-MM-DD'"))
+    return truncar_fecha(col, unidad)
+
+
+def hora(col):
+    if DIALECTO == "postgresql":
+        return cast(func.extract("hour", col), Integer)
+    return cast(func.strftime("%H", col), Integer)
+
+
+def dia_semana(col):
+    """0 = lunes ... 6 = domingo, igual que date.weekday()."""
+    if DIALECTO == "postgresql":
+        return cast(func.extract("isodow", col), Integer) - literal_column("1", Integer)
+    return (cast(func.strftime("%w", col), Integer) + 6) % 7
+
+
+# ============================================================
+#                  ESCRITURAS SIN CARRERAS
+# ============================================================
+
+def insertar_o_sumar(session, modelo, filas, claves: list[str], sumar: list[str]):
+    """
+    INSERT de `filas`; si ya existe una fila con las mismas `claves` (índice
+    único) se le suman las columnas `sumar`. Una sola sentencia en ambos motores.
+    """
+    insert = postgresql.insert if DIALECTO == "postgresql" else sqlite.insert
+    stmt = insert(modelo).values(filas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=claves,
+        set_={c: getattr(modelo, c) + getattr(stmt.excluded, c) for c in sumar},
+    )
+    session.execute(stmt)
+
+
+def descontar_stock(session, requeridos: dict[int, float]) -> dict[int, float]:
+    """
+    Resta `requeridos` {id_ingrediente: cantidad} con un solo UPDATE
+    stock = stock - cantidad (sin leer y luego escribir, que pierde
+    descuentos entre terminales). Deja bloqueadas las filas hasta el commit:
+    quien valide el stock después del descuento ve el valor definitivo.
+    Retorna {id_ingrediente: stock resultante}.
+    """
+    if not requeridos:
+        return {}
+    stmt = (
+        update(IngredienteORM)
+        .where(IngredienteORM.id.in_(requeridos.keys()))
+        .values(stock=IngredienteORM.stock - case(requeridos, value=IngredienteORM.id, else_=0.0))
+        .execution_options(synchronize_session="fetch")
+    )
+    if session.get_bind().dialect.update_returning:
+        return dict(session.execute(stmt.returning(IngredienteORM.id, IngredienteORM.stock)).all())
+    session.execute(stmt)
+    return dict(session.execute(
+        select(IngredienteORM.id, IngredienteORM.stock).where(IngredienteORM.id.in_(requeridos.keys()))
+    ).all())
@@ -0,0 +1,222 @@
+# exportacion.py
+"""
+Exportación del historial de pedidos y líneas de pedido para contabilidad/BI.
+
+Las filas se leen por bloques (paginación por id, una sesión corta por bloque)
+y se escriben a medida que llegan, así la memoria no crece con el tamaño de
+la tabla y la BD no queda con una lectura abierta durante la exportación.
+Formatos: "csv" (csv.gz) y "parquet" (requiere pyarrow, opcional).
+
+Cada exportación incremental emite solo las filas con id mayor a la última
+marca guardada en <destino>/marca_exportacion.json (los ids no se reutilizan:
+ver models.Pedido). Los pedidos eliminados o modificados después de
+exportados no se vuelven a emitir.
+
+Uso:
+    python exportacion.py exportaciones --formato parquet
+    python exportacion.py exportaciones --completo
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+from sqlalchemy import select
+from database import get_session
+from models import MenuORM
+from archivado import tablas_pedidos
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = None
+    pq = None
+
+BLOQUE = 5000  # filas por viaje a la BD
+FORMATOS = ("csv", "parquet")
+ARCHIVO_MARCA = "marca_exportacion.json"
+
+
+# ============================================================
+#                  CONSULTAS EXPORTADAS
+# ============================================================
+
+# incluyen los pedidos ya movidos a los archivos anuales (ver archivado.py)
+
+def _consulta_pedidos(desde_id: int):
+    P, _ = tablas_pedidos()
+    return (
+        select(P.id, P.fecha, P.cliente_id, P.total, P.descripcion)
+        .where(P.id > desde_id)
+        .order_by(P.id)
+    )
+
+
+def _consulta_lineas(desde_id: int):
+    P, PM = tablas_pedidos()
+    return (
+        select(
+            PM.id, PM.pedido_id, P.fecha, PM.menu_id, MenuORM.nombre,
+            PM.cantidad, PM.precio_unitario,
+            (PM.cantidad * PM.precio_unitario).label("subtotal"),
+        )
+        .join(P, PM.pedido_id == P.id)
+        .outerjoin(MenuORM, PM.menu_id == MenuORM.id)
+        .where(PM.id > desde_id)
+        .order_by(PM.id)
+    )
+
+
+# nombre de tabla -> (consulta, columnas, tipos pyarrow)
+TABLAS = {
+    "pedidos": (
+        _consulta_pedidos,
+        ["id", "fecha", "cliente_id", "total", "descripcion"],
+        ["int64", "timestamp", "int64", "float64", "string"],
+    ),
+    "pedido_menus": (
+        _consulta_lineas,
+        ["id", "pedido_id", "fecha", "menu_id", "menu", "cantidad", "precio_unitario", "subtotal"],
+        ["int64", "int64", "timestamp", "int64", "string", "int64", "float64", "float64"],
+    ),
+}
+
+
+def _esquema(columnas, tipos):
+    conv = {
+        "int64": pa.int64(), "float64": pa.float64(),
+        "string": pa.string(), "timestamp": pa.timestamp("s"),
+    }
+    return pa.schema([(c, conv[t]) for c, t in zip(columnas, tipos)])
+
+
+# ============================================================
+#                     MARCA INCREMENTAL
+# ============================================================
+
+def leer_marca(destino: str) -> dict[str, int]:
+    """Último id exportado por tabla ({} si nunca se exportó)."""
+    ruta = os.path.join(destino, ARCHIVO_MARCA)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _guardar_marca(destino: str, marca: dict[str, int]):
+    ruta = os.path.join(destino, ARCHIVO_MARCA)
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(marca, f)
+    os.replace(tmp, ruta)
+
+
+# ============================================================
+#                       ESCRITORES
+# ============================================================
+
+def _bloques(consulta, desde_id: int, bloque: int):
+    """
+    Genera listas de filas de a `bloque` sin cargar la tabla completa. Cada
+    bloque se lee en su propia sesión corta (paginación por id, como
+    pdf/reimpresion.iterar_datos_rango): no queda un cursor abierto sobre la
+    BD mientras se escribe el archivo, que bloquearía a las terminales.
+    """
+    ultimo = desde_id
+    while True:
+        with get_session() as session:
+            filas = session.execute(consulta(ultimo).limit(bloque)).all()
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1][0]
+
+
+def _escribir_csv(ruta: str, columnas, bloques) -> tuple[int, int]:
+    n, ultimo = 0, None
+    with gzip.open(ruta, "wt", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columnas)
+        for filas in bloques:
+            w.writerows(filas)
+            n += len(filas)
+            ultimo = filas[-1][0]
+    return n, ultimo
+
+
+def _escribir_parquet(ruta: str, columnas, tipos, bloques) -> tuple[int, int]:
+    esquema = _esquema(columnas, tipos)
+    n, ultimo = 0, None
+    with pq.ParquetWriter(ruta, esquema, compression="zstd") as w:
+        for filas in bloques:
+            datos = {c: list(v) for c, v in zip(columnas, zip(*filas))}
+            w.write_table(pa.Table.from_pydict(datos, schema=esquema))
+            n += len(filas)
+            ultimo = filas[-1][0]
+    return n, ultimo
+
+
+def exportar_tabla(tabla: str, destino: str, formato: str = "csv",
+                   desde_id: int = 0, bloque: int = BLOQUE):
+    """
+    Exporta las filas de `tabla` con id > desde_id a un archivo nuevo en `destino`.
+    Retorna (ruta, filas, ultimo_id); sin filas nuevas retorna (None, 0, desde_id).
+    """
+    if tabla not in TABLAS:
+        raise ValueError(f"Tabla no exportable: {tabla}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    if formato == "parquet" and pq is None:
+        raise ValueError("Para exportar a Parquet instala pyarrow (pip install pyarrow).")
+
+    consulta, columnas, tipos = TABLAS[tabla]
+    os.makedirs(destino, exist_ok=True)
+    extension = "csv.gz" if formato == "csv" else "parquet"
+    tmp = os.path.join(destino, f".{tabla}.{extension}.tmp")
+    bloques = _bloques(consulta, desde_id, bloque)
+    try:
+        if formato == "csv":
+            n, ultimo = _escribir_csv(tmp, columnas, bloques)
+        else:
+            n, ultimo = _escribir_parquet(tmp, columnas, tipos, bloques)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if n == 0:
+        os.remove(tmp)
+        return None, 0, desde_id
+
+    ruta = os.path.join(destino, f"{tabla}_{desde_id + 1:08d}-{ultimo:08d}.{extension}")
+    os.replace(tmp, ruta)
+    return ruta, n, ultimo
+
+
+def exportar_historial(destino: str, formato: str = "csv", completo: bool = False,
+                       bloque: int = BLOQUE) -> dict[str, tuple]:
+    """
+    Exporta pedidos y pedido_menus desde la última marca (o todo si completo=True)
+    y avanza la marca solo cuando ambos archivos quedaron escritos.
+    Retorna {tabla: (ruta, filas)}.
+    """
+    marca = {} if completo else leer_marca(destino)
+    resultado = {}
+    nueva = dict(marca)
+    for tabla in TABLAS:
+        ruta, n, ultimo = exportar_tabla(tabla, destino, formato, marca.get(tabla, 0), bloque)
+        resultado[tabla] = (ruta, n)
+        nueva[tabla] = ultimo
+    _guardar_marca(destino, nueva)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta el historial de pedidos (csv.gz o Parquet).")
+    parser.add_argument("destino")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--completo", action="store_true", help="ignora la marca y exporta todo")
+    parser.add_argument("--bloque", type=int, default=BLOQUE)
+    args = parser.parse_args()
+    for tabla, (ruta, n) in exportar_historial(args.destino, args.formato, args.completo, args.bloque).items():
+        print(f"{tabla}: {n} filas" + (f" -> {ruta}" if ruta else " (sin filas nuevas)"))
@@ -1,104 +1,447 @@
-
-# graficos.py
-import matplotlib.pyplot as plt
-from collections import Counter
-from sqlalchemy import select, func
-from database import get_session
-from models import Pedido, PedidoMenu, MenuORM, IngredienteORM, MenuIngrediente
-import warnings
-from matplotlib.ticker import FixedLocator
-
-# Ocultar warnings de Matplotlib
-warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
-
-
-def grafico_ventas_por_fecha():
-    """
-    Retorna una figura con ventas por fecha (suma total por día).
-    """
-    with get_session() as session:
-        rows = session.execute(
-            select(func.date(Pedido.fecha), func.sum(Pedido.total)).group_by(func.date(Pedido.fecha))
-        ).all()
-
-    if not rows:
-        raise ValueError("No hay datos disponibles para graficar ventas por fecha.")
-
-    fechas = [r[0] for r in rows]
-    totales = [r[1] for r in rows]
-
-    fig, ax = plt.subplots()
-    ax.plot(fechas, totales, marker="o")
-    ax.set_title("Ventas por fecha")
-    ax.set_xlabel("Fecha")
-    ax.set_ylabel("Total vendido")
-    fig.autofmt_xdate()
-    return fig
-
-
-def grafico_menus_mas_vendidos(top_n: int = 5):
-    """
-    Figura con los menús más comprados.
-    """
-    with get_session() as session:
-        rows = session.execute(
-            select(MenuORM.nombre, func.sum(PedidoMenu.cantidad))
-            .join(PedidoMenu.menu)
-            .group_by(MenuORM.nombre)
-            .order_by(func.sum(PedidoMenu.cantidad).desc())
-        ).all()
-
-    if not rows:
-        raise ValueError("No hay datos disponibles para graficar menús más vendidos.")
-
-    filas = rows[:top_n]
-    nombres = [r[0] for r in filas]
-    cantidades = [r[1] for r in filas]
-
-    fig, ax = plt.subplots(figsize=(6, 3.5))
-    bars = ax.bar(nombres, cantidades)
-    ax.set_title("Menús más vendidos", fontsize=12)
-    ax.set_ylabel("Cantidad vendida", fontsize=10)
-    # Usar FixedLocator para evitar warning
-    ax.set_xticks(range(len(nombres)))
-    ax.set_xticklabels(nombres, rotation=30, ha="right", fontsize=9)
-    ax.tick_params(axis='y', labelsize=9)
-    fig.tight_layout()
-    return fig
-
-
-def grafico_uso_ingredientes():
-    """
-    Uso de ingredientes en todos los pedidos.
-    """
-    with get_session() as session:
-        pedidos = session.scalars(select(Pedido)).all()
-        if not pedidos:
-            raise ValueError("No hay pedidos para calcular uso de ingredientes.")
-        # contabilizar ingredientes a través de los pedidos
-        contador = Counter()
-        for ped in pedidos:
-            for item in ped.items:
-                menu = item.menu
-                for mi in menu.ingredientes:
-                    if mi.ingrediente is None:
-                        continue
-                    total_ing = mi.cantidad * item.cantidad
-                    contador[mi.ingrediente.nombre] += total_ing
-
-    if not contador:
-        raise ValueError("No hay datos de uso de ingredientes.")
-
-    nombres = list(contador.keys())
-    valores = list(contador.values())
-
-    fig, ax = plt.subplots(figsize=(6, 3.5))
-    bars = ax.bar(nombres, valores)
-    ax.set_title("Uso de ingredientes", fontsize=12)
-    ax.set_ylabel("Cantidad utilizada", fontsize=10)
-    # Usar FixedLocator para evitar warning
-    ax.set_xticks(range(len(nombres)))
-    ax.set_xticklabels(nombres, rotation=30, ha="right", fontsize=9)
-    ax.tick_params(axis='y', labelsize=9)
-    fig.tight_layout()
-    return fig
+# graficos.py
+import argparse
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from sqlalchemy import select, func
+from instantanea import sesion_reportes, version as version_instantanea
+from models import Pedido, MenuORM
+from crud.estadistica_crud import top_menus, demanda_por_hora, version_cambios
+from archivado import tablas_pedidos
+from dialecto import truncar_fecha
+from analitica import consumo_ingredientes
+import warnings
+from matplotlib.ticker import FixedLocator
+
+# Ocultar warnings de Matplotlib
+warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
+
+# Las figuras se crean con matplotlib.figure.Figure y no con pyplot: pyplot las
+# registra globalmente y nunca se liberan si no se llama a plt.close().
+
+
+# ============================================================
+#                     DATOS DE CADA GRÁFICO
+# ============================================================
+
+def _filtrar_fechas(stmt, desde: date | None, hasta: date | None, P=Pedido):
+    """Restringe a pedidos entre `desde` y `hasta` (ambos inclusive)."""
+    if desde is not None:
+        stmt = stmt.where(P.fecha >= datetime.combine(desde, time.min))
+    if hasta is not None:
+        stmt = stmt.where(P.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+    return stmt
+
+
+# ----------------- VENTAS: resolución y submuestreo -----------------
+RESOLUCIONES = ("hora", "dia", "semana", "mes")
+MAX_PUNTOS = 500
+
+
+
+def elegir_resolucion(desde: date, hasta: date) -> str:
+    """Resolución automática según el largo del rango."""
+    dias = (hasta - desde).days + 1
+    if dias <= 3:
+        return "hora"
+    if dias <= 180:
+        return "dia"
+    if dias <= 3 * 365:
+        return "semana"
+    return "mes"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_salida: int):
+    """
+    Largest-Triangle-Three-Buckets: reduce una serie a `n_salida` puntos
+    conservando su forma (picos y valles). x debe ser numérico y creciente.
+    Retorna los índices elegidos.
+    """
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+
+    # bordes de los n_salida-2 buckets interiores
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(int)
+    elegidos = np.empty(n_salida, dtype=int)
+    elegidos[0] = 0
+    elegidos[-1] = n - 1
+    a = 0
+    for i in range(n_salida - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        # promedio del bucket siguiente (o el último punto)
+        sig_ini, sig_fin = fin, bordes[i + 2] if i + 2 < len(bordes) else n
+        cx = x[sig_ini:sig_fin].mean()
+        cy = y[sig_ini:sig_fin].mean()
+        area = np.abs(
+            (x[a] - cx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy - y[a])
+        )
+        a = ini + int(area.argmax())
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def datos_ventas_por_fecha(desde: date | None = None, hasta: date | None = None,
+                           resolucion: str = "auto", max_puntos: int = MAX_PUNTOS):
+    """
+    Ventas sumadas por intervalo (hora/dia/semana/mes o "auto"), agregadas en SQL.
+    Si la serie tiene más de `max_puntos` se submuestrea con LTTB, así el
+    costo de dibujar no depende del largo del historial.
+    Retorna (fechas, totales, resolucion).
+    """
+    P, _ = tablas_pedidos(desde, hasta)
+    with sesion_reportes() as session:
+        if resolucion == "auto":
+            if desde is None or hasta is None:
+                minimo, maximo = session.execute(
+                    _filtrar_fechas(select(func.min(P.fecha), func.max(P.fecha)), desde, hasta, P)
+                ).one()
+                if minimo is None:
+                    raise ValueError("No hay datos disponibles para graficar ventas por fecha.")
+                desde = desde or minimo.date()
+                hasta = hasta or maximo.date()
+            resolucion = elegir_resolucion(desde, hasta)
+        elif resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución no válida: {resolucion}")
+
+        bucket = truncar_fecha(P.fecha, resolucion)
+        rows = session.execute(_filtrar_fechas(
+            select(bucket, func.sum(P.total)).group_by(bucket).order_by(bucket),
+            desde, hasta, P
+        )).all()
+
+    if not rows:
+        raise ValueError("No hay datos disponibles para graficar ventas por fecha.")
+
+    fechas = np.array([r[0] for r in rows], dtype="datetime64[s]")
+    totales = np.array([r[1] for r in rows], dtype=float)
+    if len(fechas) > max_puntos:
+        idx = lttb(fechas.astype(np.int64).astype(float), totales, max_puntos)
+        fechas, totales = fechas[idx], totales[idx]
+    return fechas.astype(datetime).tolist(), totales.tolist(), resolucion
+
+
+def datos_menus_mas_vendidos(top_n: int = 5, desde: date | None = None, hasta: date | None = None,
+                             ventana: str | None = None):
+    """
+    Sin rango se leen los contadores incrementales (de siempre o de la
+    ventana dia/semana/mes actual). Con rango arbitrario se agrega en SQL.
+    """
+    if desde is None and hasta is None:
+        filas = top_menus(top_n, ventana)
+    else:
+        P, PM = tablas_pedidos(desde, hasta)
+        with sesion_reportes() as session:
+            filas = session.execute(_filtrar_fechas(
+                select(MenuORM.nombre, func.sum(PM.cantidad))
+                .select_from(PM)
+                .join(MenuORM, PM.menu_id == MenuORM.id)
+                .join(P, PM.pedido_id == P.id)
+                .group_by(MenuORM.nombre)
+                .order_by(func.sum(PM.cantidad).desc())
+                .limit(top_n),
+                desde, hasta, P
+            )).all()
+
+    if not filas:
+        raise ValueError("No hay datos disponibles para graficar menús más vendidos.")
+
+    return [r[0] for r in filas], [r[1] for r in filas]
+
+
+def datos_uso_ingredientes(desde: date | None = None, hasta: date | None = None):
+    """Consumo por ingrediente vía la matriz de recetas (ver analitica.py)."""
+    contador = consumo_ingredientes(desde, hasta)
+    if not contador:
+        raise ValueError("No hay datos de uso de ingredientes.")
+
+    return list(contador.keys()), list(contador.values())
+
+
+DIAS_SEMANA = ("Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom")
+
+
+def datos_mapa_calor_demanda(desde: date | None = None, hasta: date | None = None,
+                             metrica: str = "pedidos"):
+    """
+    Matriz 7x24 (día de semana x hora) de pedidos o monto, desde los
+    contadores por hora. Retorna (matriz, metrica).
+    """
+    filas = demanda_por_hora(desde, hasta)
+    if not filas:
+        raise ValueError("No hay datos disponibles para el mapa de calor.")
+    col = 2 if metrica == "pedidos" else 3
+    arr = np.array(filas, dtype=float)
+    matriz = np.zeros((7, 24))
+    matriz[arr[:, 0].astype(int), arr[:, 1].astype(int)] = arr[:, col]
+    return matriz, metrica
+
+
+# ============================================================
+#           DIBUJO (sobre una figura existente o nueva)
+# ============================================================
+
+# Si `fig` ya tiene dibujado el mismo gráfico se actualizan sus artistas
+# (línea, barras, imagen) en vez de limpiarla y crear ejes nuevos: es lo que
+# pasa en cada clic de la pestaña Gráficos cuando cambian los datos.
+
+def _preparar(fig, tipo: str, figsize=None):
+    """Limpia y reutiliza `fig` si viene; si no, crea una figura nueva. La marca con `tipo`."""
+    if fig is None:
+        fig = Figure(figsize=figsize)
+    else:
+        fig.clear()
+    fig.set_label(tipo)
+    return fig, fig.add_subplot()
+
+
+def _ejes_previos(fig, tipo: str):
+    """Ejes de `fig` si ya tiene dibujado un gráfico `tipo`; si no, None."""
+    if fig is not None and fig.get_label() == tipo and fig.axes:
+        return fig.axes[0]
+    return None
+
+
+def dibujar_ventas_por_fecha(datos, fig=None):
+    fechas, totales, resolucion = datos
+    # con muchos puntos los marcadores solo ensucian y cuestan
+    marcador = "o" if len(fechas) <= 60 else "None"
+    ax = _ejes_previos(fig, "ventas_por_fecha")
+    if ax is not None:
+        linea = ax.lines[0]
+        linea.set_data(fechas, totales)
+        linea.set_marker(marcador)
+        ax.relim()
+        ax.autoscale_view()
+    else:
+        fig, ax = _preparar(fig, "ventas_por_fecha")
+        ax.plot(fechas, totales, marker=marcador)
+        ax.set_xlabel("Fecha")
+        ax.set_ylabel("Total vendido")
+        fig.autofmt_xdate()
+    ax.set_title(f"Ventas por fecha (por {resolucion})")
+    return fig
+
+
+def _dibujar_barras(datos, titulo, ylabel, fig=None):
+    nombres, valores = datos
+    ax = _ejes_previos(fig, titulo)
+    if ax is not None and len(ax.patches) == len(valores):
+        for barra, valor in zip(ax.patches, valores):
+            barra.set_height(valor)
+        ax.relim()
+        ax.autoscale_view()
+    else:
+        fig, ax = _preparar(fig, titulo, figsize=(6, 3.5))
+        # posiciones numéricas: un eje categórico acumularía los nombres viejos
+        ax.bar(range(len(nombres)), valores)
+        ax.set_title(titulo, fontsize=12)
+        ax.set_ylabel(ylabel, fontsize=10)
+        # Usar FixedLocator para evitar warning
+        ax.set_xticks(range(len(nombres)))
+        ax.tick_params(axis='y', labelsize=9)
+    ax.set_xticklabels(nombres, rotation=30, ha="right", fontsize=9)
+    fig.tight_layout()
+    return fig
+
+
+def dibujar_mapa_calor_demanda(datos, fig=None):
+    matriz, metrica = datos
+    titulo = "Demanda por hora y día" + (" (monto)" if metrica != "pedidos" else " (pedidos)")
+    ax = _ejes_previos(fig, "mapa_calor_demanda")
+    if ax is not None:
+        im = ax.images[0]
+        im.set_data(matriz)
+        im.autoscale()  # la barra de color sigue a la imagen
+        ax.set_title(titulo, fontsize=12)
+        return fig
+    fig, ax = _preparar(fig, "mapa_calor_demanda", figsize=(8, 3.5))
+    im = ax.imshow(matriz, aspect="auto", cmap="YlOrRd", interpolation="nearest")
+    ax.set_title(titulo, fontsize=12)
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(DIAS_SEMANA, fontsize=9)
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_xticklabels([f"{h:02d}" for h in range(0, 24, 2)], fontsize=9)
+    ax.set_xlabel("Hora", fontsize=10)
+    fig.colorbar(im, ax=ax)
+    fig.tight_layout()
+    return fig
+
+
+def dibujar_menus_mas_vendidos(datos, fig=None):
+    return _dibujar_barras(datos, "Menús más vendidos", "Cantidad vendida", fig)
+
+
+def dibujar_uso_ingredientes(datos, fig=None):
+    return _dibujar_barras(datos, "Uso de ingredientes", "Cantidad utilizada", fig)
+
+
+# ============================================================
+#                 API ORIGINAL (figura nueva)
+# ============================================================
+
+def grafico_ventas_por_fecha(desde: date | None = None, hasta: date | None = None,
+                             resolucion: str = "auto", max_puntos: int = MAX_PUNTOS):
+    """
+    Retorna una figura con ventas por fecha (suma total por intervalo).
+    """
+    return dibujar_ventas_por_fecha(datos_ventas_por_fecha(desde, hasta, resolucion, max_puntos))
+
+
+def grafico_menus_mas_vendidos(top_n: int = 5):
+    """
+    Figura con los menús más comprados.
+    """
+    return dibujar_menus_mas_vendidos(datos_menus_mas_vendidos(top_n))
+
+
+def grafico_mapa_calor_demanda(desde: date | None = None, hasta: date | None = None,
+                               metrica: str = "pedidos"):
+    """
+    Mapa de calor hora x día de semana (pedidos o "monto").
+    """
+    return dibujar_mapa_calor_demanda(datos_mapa_calor_demanda(desde, hasta, metrica))
+
+
+def grafico_uso_ingredientes():
+    """
+    Uso de ingredientes en todos los pedidos.
+    """
+    return dibujar_uso_ingredientes(datos_uso_ingredientes())
+
+
+# ============================================================
+#             SERVICIO CON CACHÉ (pestaña Gráficos)
+# ============================================================
+
+GRAFICOS = {
+    "ventas_por_fecha": (datos_ventas_por_fecha, dibujar_ventas_por_fecha),
+    "menus_mas_vendidos": (datos_menus_mas_vendidos, dibujar_menus_mas_vendidos),
+    "uso_ingredientes": (datos_uso_ingredientes, dibujar_uso_ingredientes),
+    "mapa_calor_demanda": (datos_mapa_calor_demanda, dibujar_mapa_calor_demanda),
+}
+
+
+def version_datos():
+    """
+    Versión de los datos que alimentan los gráficos: el contador que suben
+    los CRUD de pedidos, menús e ingredientes (estadistica_crud.marcar_cambio),
+    leído por clave primaria. Si los gráficos leen una instantánea, es la
+    fecha de esa instantánea.
+    """
+    instantanea = version_instantanea()
+    if instantanea is not None:
+        return instantanea
+    return version_cambios()
+
+
+def marcar_version(fig, version):
+    """Anota en la figura la fecha de la instantánea de la que salieron los datos."""
+    for texto in [t for t in fig.texts if t.get_gid() == "version"]:
+        texto.remove()
+    if isinstance(version, datetime):
+        fig.text(0.99, 0.01, f"Datos al {version:%d/%m/%Y %H:%M:%S}",
+                 ha="right", va="bottom", fontsize=7, color="gray", gid="version")
+    return fig
+
+
+class ServicioGraficos:
+    """
+    Una figura por (gráfico, parámetros), reutilizada entre clics.
+    Si la versión de datos no cambió se devuelve tal cual; si cambió se
+    actualizan los artistas de la misma figura. Guarda a lo más `maximo` figuras: al
+    desalojar una se limpia explícitamente.
+    """
+
+    def __init__(self, maximo: int = 8):
+        self.maximo = maximo
+        self._cache: OrderedDict = OrderedDict()  # clave -> (version, fig)
+
+    def obtener(self, nombre: str, **params) -> Figure:
+        clave = (nombre, tuple(sorted(params.items())))
+        version = version_datos()
+
+        entrada = self._cache.get(clave)
+        if entrada is not None:
+            self._cache.move_to_end(clave)
+            if entrada[0] == version:
+                return entrada[1]
+
+        cargar, dibujar = GRAFICOS[nombre]
+        datos = cargar(**params)
+        fig = marcar_version(dibujar(datos, fig=entrada[1] if entrada else None), version)
+        self._cache[clave] = (version, fig)
+
+        while len(self._cache) > self.maximo:
+            _, (_, vieja) = self._cache.popitem(last=False)
+            vieja.clear()
+        return fig
+
+    def version(self, nombre: str, **params):
+        """Versión de datos (fecha de instantánea o contador) con que se dibujó el gráfico."""
+        entrada = self._cache.get((nombre, tuple(sorted(params.items()))))
+        return entrada[0] if entrada else None
+
+    def limpiar(self):
+        for _, fig in self._cache.values():
+            fig.clear()
+        self._cache.clear()
+
+
+# ============================================================
+#          EXPORTACIÓN SIN PANTALLA (PNG/SVG, backend Agg)
+# ============================================================
+# Cada llamada crea su propia Figure con un FigureCanvasAgg y no toca pyplot
+# ni Tk, así se puede usar desde hilos, procesos o scripts sin display.
+
+FORMATOS = ("png", "svg", "pdf")
+_pool_exportacion = None
+
+
+def exportar_grafico(nombre: str, formato: str = "png", salida: str | None = None,
+                     desde: date | None = None, hasta: date | None = None,
+                     dpi: int = 100, **params):
+    """
+    Renderiza un gráfico de GRAFICOS. Retorna los bytes o, si se indica
+    `salida`, escribe el archivo y retorna la ruta. La figura lleva anotada la
+    fecha de la instantánea de la que salieron los datos.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    cargar, dibujar = GRAFICOS[nombre]
+    version = version_datos()
+    fig = marcar_version(dibujar(cargar(desde=desde, hasta=hasta, **params)), version)
+    FigureCanvasAgg(fig)
+    buffer = BytesIO()
+    fig.savefig(buffer, format=formato, dpi=dpi)
+    fig.clear()
+    datos = buffer.getvalue()
+    if salida is None:
+        return datos
+    with open(salida, "wb") as f:
+        f.write(datos)
+    return salida
+
+
+def exportar_grafico_async(nombre: str, formato: str = "png", **kwargs):
+    """Igual que exportar_grafico pero en un hilo de fondo. Retorna un Future."""
+    global _pool_exportacion
+    if _pool_exportacion is None:
+        _pool_exportacion = ThreadPoolExecutor(max_workers=2, thread_name_prefix="graficos")
+    return _pool_exportacion.submit(exportar_grafico, nombre, formato, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta un gráfico a PNG/SVG/PDF sin interfaz.")
+    parser.add_argument("nombre", choices=sorted(GRAFICOS))
+    parser.add_argument("salida")
+    parser.add_argument("--desde", type=date.fromisoformat)
+    parser.add_argument("--hasta", type=date.fromisoformat)
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args()
+    formato = args.salida.rsplit(".", 1)[-1].lower()
+    print(exportar_grafico(args.nombre, formato, args.salida, args.desde, args.hasta, args.dpi))
@@ -0,0 +1,104 @@
+# instantanea.py
+"""
+Instantánea de solo lectura para gráficos e informes.
+
+Las consultas analíticas no usan el pool de la BD de caja: leen una copia
+(hecha con la API de backup, ver respaldo.copiar_en_linea) abierta en modo
+solo lectura. Si la copia tiene más de INSTANTANEA_MAX_SEGUNDOS se hace una
+nueva antes de responder, así los datos nunca están más atrasados que eso.
+
+Cada copia es un archivo nuevo (reportes_<marca>.db) con su propio engine:
+no se reemplaza un archivo abierto (Windows no lo permite) y las sesiones
+que siguen leyendo la copia anterior terminan sin problemas.
+
+Los archivos anuales (archivado.py) no se copian: se adjuntan tal cual. Si
+cambian después de la copia (un archivado movió pedidos que la copia aún
+tiene en la BD principal) la instantánea se renueva, si no esos pedidos se
+contarían dos veces.
+
+Con REPORTES_INSTANTANEA=0, o si la BD es un servidor (PostgreSQL) o está
+en memoria, todo lee la BD principal.
+"""
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import config
+from database import get_session, escuchar_archivos, firma_archivos, DIALECTO, EN_MEMORIA
+from respaldo import ruta_bd, copiar_en_linea
+
+PREFIJO = "reportes_"
+
+_lock = threading.Lock()
+_actual = None  # (version: datetime, ruta, engine, SessionReportes, firma de los archivos)
+
+
+def _abrir(ruta: str):
+    motor = create_engine(f"sqlite:///file:{os.path.abspath(ruta)}?mode=ro&uri=true", future=True)
+    escuchar_archivos(motor)
+    return motor, sessionmaker(bind=motor, autoflush=False, autocommit=False, future=True)
+
+
+def _limpiar_antiguas(vigente: str):
+    for nombre in os.listdir(config.INSTANTANEA_DIR):
+        ruta = os.path.join(config.INSTANTANEA_DIR, nombre)
+        if nombre.startswith(PREFIJO) and ruta != vigente:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass  # aún abierta: se borra en el próximo refresco
+
+
+def refrescar() -> datetime:
+    """Copia la BD de caja a una instantánea nueva y la deja vigente. Retorna su versión."""
+    global _actual
+    with _lock:
+        os.makedirs(config.INSTANTANEA_DIR, exist_ok=True)
+        version = datetime.now()
+        ruta = os.path.join(config.INSTANTANEA_DIR, PREFIJO + version.strftime("%Y%m%d_%H%M%S_%f") + ".db")
+        tmp = ruta + ".tmp"
+        # antes de copiar: si un archivado termina durante la copia, la firma ya no coincide
+        firma = firma_archivos()
+        copiar_en_linea(ruta_bd(), tmp, paginas=256, pausa=0.005)
+        os.replace(tmp, ruta)
+        motor, fabrica = _abrir(ruta)
+        anterior, _actual = _actual, (version, ruta, motor, fabrica, firma)
+        if anterior is not None:
+            anterior[2].dispose()
+        _limpiar_antiguas(ruta)
+        return version
+
+
+def _vigente():
+    """La instantánea actual, renovándola si pasó el límite de antigüedad o cambiaron los archivos."""
+    actual = _actual
+    if (
+        actual is None
+        or (datetime.now() - actual[0]).total_seconds() > config.INSTANTANEA_MAX_SEGUNDOS
+        or actual[4] != firma_archivos()
+    ):
+        refrescar()
+        actual = _actual
+    return actual
+
+
+def activa() -> bool:
+    return config.REPORTES_INSTANTANEA and DIALECTO == "sqlite" and not EN_MEMORIA
+
+
+def version() -> datetime | None:
+    """Fecha de la instantánea que usarán las consultas (None si se lee la BD principal)."""
+    if not activa():
+        return None
+    return _vigente()[0]
+
+
+def sesion_reportes():
+    """
+    Sesión para consultas de solo lectura (gráficos, analítica, informes).
+    Usar con with, igual que database.get_session().
+    """
+    if not activa():
+        return get_session()
+    return _vigente()[3]()
@@ -1,12 +1,110 @@
-# main.py
-from database import engine, Base
-import models  # importa para registrar las clases en Base
-
-
-def init_db():
-    Base.metadata.create_all(bind=engine)
-
-
-if __name__ == "__main__":
-    init_db()
-    print("Tablas creadas correctamente.")
+# main.py
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateTable
+from database import engine, Base, DIALECTO
+import models  # importa para registrar las clases en Base
+
+
+def _agregar_columnas_faltantes():
+    """
+    create_all no modifica tablas existentes: agrega las columnas nuevas
+    (siempre nullable) y sus índices a una BD creada con una versión anterior.
+    """
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existentes = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existentes:
+                    tipo = col.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {tipo}")
+            for idx in table.indexes:
+                idx.create(conn, checkfirst=True)
+
+
+def _activar_autoincrement():
+    """
+    pedidos y pedido_menus se crean con AUTOINCREMENT (ver models.py). Una BD
+    SQLite anterior se migra una vez reconstruyendo la tabla con los mismos
+    ids; la secuencia parte del mayor id usado, también en los archivos anuales.
+    """
+    if DIALECTO != "sqlite":
+        return
+    with engine.begin() as conn:
+        adjuntas = [fila[1] for fila in conn.exec_driver_sql("PRAGMA database_list")]
+        for table in (models.Pedido.__table__, models.PedidoMenu.__table__):
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).scalar()
+            if sql is None or "AUTOINCREMENT" in sql.upper():
+                continue
+            nueva = f"{table.name}_nueva"
+            ddl = str(CreateTable(table).compile(dialect=engine.dialect))
+            conn.exec_driver_sql(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {nueva} ", 1))
+            columnas = ", ".join(c.name for c in table.columns)
+            conn.exec_driver_sql(f"INSERT INTO {nueva} ({columnas}) SELECT {columnas} FROM {table.name}")
+            conn.exec_driver_sql(f"DROP TABLE {table.name}")
+            conn.exec_driver_sql(f"ALTER TABLE {nueva} RENAME TO {table.name}")
+            for idx in table.indexes:
+                idx.create(conn)
+
+            ultimo = conn.exec_driver_sql(f"SELECT max(id) FROM {table.name}").scalar() or 0
+            for esquema in adjuntas:
+                if esquema.startswith("archivo_") and conn.exec_driver_sql(
+                    f"SELECT 1 FROM {esquema}.sqlite_master WHERE type = 'table' AND name = ?",
+                    (table.name,)
+                ).first():
+                    ultimo = max(ultimo, conn.exec_driver_sql(
+                        f"SELECT max(id) FROM {esquema}.{table.name}"
+                    ).scalar() or 0)
+            conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+            conn.exec_driver_sql(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, ultimo)
+            )
+
+
+def _inicializar_contadores():
+    """Si la tabla de contadores es nueva pero ya hay pedidos, se reconstruye."""
+    from sqlalchemy import select, func
+    from database import get_session
+    from crud.estadistica_crud import reconstruir_contadores
+    with get_session() as session:
+        vacia = (
+            session.scalar(select(func.count(models.VentaMenu.id))) == 0
+            or session.scalar(select(func.count(models.VentaHora.id))) == 0
+        )
+        hay_pedidos = session.scalar(select(func.count(models.Pedido.id))) > 0
+    if vacia and hay_pedidos:
+        reconstruir_contadores()
+
+
+def _inicializar_recetas_aplanadas():
+    """Si menu_bom es nueva pero ya hay recetas, se calcula para todos los menús."""
+    from sqlalchemy import select, func
+    from database import get_session
+    from crud.menu_crud import reconstruir_bom_completo
+    with get_session() as session:
+        vacia = session.scalar(select(func.count(models.MenuBOM.id))) == 0
+        hay_recetas = session.scalar(select(func.count(models.MenuIngrediente.id))) > 0
+    if vacia and hay_recetas:
+        reconstruir_bom_completo()
+
+
+def init_db():
+    # En una BD SQLite nueva (sin tablas) deja activo el vacuum incremental; en una
+    # existente el PRAGMA no tiene efecto (ver mantenimiento.py --activar-vacuum)
+    if DIALECTO == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+    Base.metadata.create_all(bind=engine)
+    _agregar_columnas_faltantes()
+    _activar_autoincrement()
+    _inicializar_contadores()
+    _inicializar_recetas_aplanadas()
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Tablas creadas correctamente.")
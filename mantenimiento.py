@@ -0,0 +1,273 @@
+# mantenimiento.py
+"""
+Mantenimiento periódico de la BD.
+
+Trabajos (cada uno con su periodo):
+    huerfanos   borra en SQL (sin cargar filas) recetas, sub-recetas, recetas
+                aplanadas y reservas que apuntan a filas que ya no existen
+    optimizar   PRAGMA optimize (o ANALYZE acotado la primera vez)
+    vacuum      PRAGMA incremental_vacuum por bloques chicos
+    integridad  PRAGMA quick_check
+
+Cada trabajo tiene un límite de tiempo: un progress handler de SQLite
+interrumpe la sentencia en curso al pasarlo. Las escrituras van en
+transacciones cortas, así una caja que confirma un pedido espera a lo más
+un bloque. Cada ejecución queda en la tabla mantenimiento_log, que también
+sirve para saber qué trabajos están pendientes. Un trabajo cortado por el
+límite queda con ok=False y completo=False: no cuenta como ejecutado y se
+reintenta en la próxima pausa (un quick_check a medias no es un "ok").
+
+Solo aplica a SQLite: con un servidor (PostgreSQL) de esto se encarga el
+propio servidor (autovacuum) y no hay trabajos pendientes.
+
+En la app, ProgramadorMantenimiento corre los pendientes en un hilo propio
+solo cuando la interfaz lleva MANTENIMIENTO_INACTIVIDAD segundos sin uso.
+
+Uso:
+    python mantenimiento.py                 (trabajos pendientes)
+    python mantenimiento.py vacuum integridad --limite 10
+    python mantenimiento.py --activar-vacuum   (VACUUM completo, con la app cerrada)
+"""
+import argparse
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.exc import OperationalError
+import config
+from database import engine, get_session, safe_commit, DIALECTO
+from models import (
+    MenuORM, IngredienteORM, MenuIngrediente, MenuComponente, MenuBOM,
+    ReservaStock, RegistroMantenimiento
+)
+
+PAGINAS_POR_BLOQUE = 200  # incremental_vacuum: páginas liberadas por transacción
+
+log = logging.getLogger(__name__)
+
+
+class TiempoAgotado(Exception):
+    """El trabajo no alcanzó a terminar dentro de su límite (el mensaje dice hasta dónde llegó)."""
+    pass
+
+
+@contextmanager
+def _conexion_limitada(limite: float):
+    """Conexión cuyas sentencias se interrumpen al pasar `limite` segundos."""
+    fin = time.monotonic() + limite
+    with engine.connect() as conn:
+        dbapi = conn.connection.dbapi_connection
+        dbapi.set_progress_handler(lambda: 1 if time.monotonic() > fin else 0, 1000)
+        try:
+            yield conn, fin
+        except OperationalError as e:
+            if "interrupted" in str(e):
+                raise TiempoAgotado() from e
+            raise
+        finally:
+            dbapi.set_progress_handler(None, 0)
+
+
+# ============================================================
+#                         TRABAJOS
+# ============================================================
+
+def limpiar_huerfanos(limite: float) -> str:
+    sentencias = {
+        "menu_ingredientes": delete(MenuIngrediente).where(
+            ~exists().where(IngredienteORM.id == MenuIngrediente.ingrediente_id)
+            | ~exists().where(MenuORM.id == MenuIngrediente.menu_id)
+        ),
+        "menu_componentes": delete(MenuComponente).where(
+            ~exists().where(MenuORM.id == MenuComponente.menu_id)
+            | ~exists().where(MenuORM.id == MenuComponente.componente_id)
+        ),
+        "menu_bom": delete(MenuBOM).where(
+            ~exists().where(IngredienteORM.id == MenuBOM.ingrediente_id)
+            | ~exists().where(MenuORM.id == MenuBOM.menu_id)
+        ),
+        "reservas_stock": delete(ReservaStock).where(ReservaStock.expira <= datetime.now()),
+    }
+    borradas = {}
+    with _conexion_limitada(limite) as (conn, _):
+        for tabla, stmt in sentencias.items():
+            borradas[tabla] = conn.execute(stmt).rowcount
+            conn.commit()
+    return ", ".join(f"{t}={n}" for t, n in borradas.items())
+
+
+def optimizar(limite: float) -> str:
+    with _conexion_limitada(limite) as (conn, _):
+        # analysis_limit acota las filas que ANALYZE lee por índice
+        conn.exec_driver_sql("PRAGMA analysis_limit=400")
+        sin_estadisticas = conn.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).scalar() == 0
+        conn.exec_driver_sql("ANALYZE" if sin_estadisticas else "PRAGMA optimize")
+        conn.commit()
+    return "ANALYZE inicial" if sin_estadisticas else "PRAGMA optimize"
+
+
+def vacuum_incremental(limite: float) -> str:
+    with _conexion_limitada(limite) as (conn, fin):
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return "auto_vacuum no es INCREMENTAL (usar --activar-vacuum con la app cerrada)"
+        liberadas = 0
+        while time.monotonic() < fin:
+            libres = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            if libres == 0:
+                break
+            # el PRAGMA libera una página por paso: executescript (sqlite3_exec)
+            # lo recorre completo, execute() solo daría el primer paso
+            conn.connection.dbapi_connection.executescript(
+                f"PRAGMA incremental_vacuum({PAGINAS_POR_BLOQUE});"
+            )
+            pendientes = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+            liberadas += libres - pendientes
+        pendientes = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    detalle = f"páginas liberadas={liberadas}, libres restantes={pendientes}"
+    if pendientes:
+        raise TiempoAgotado(detalle)
+    return detalle
+
+
+def verificar_integridad(limite: float) -> str:
+    with _conexion_limitada(limite) as (conn, _):
+        filas = [r[0] for r in conn.exec_driver_sql("PRAGMA quick_check(20)")]
+    if filas != ["ok"]:
+        raise ValueError("quick_check: " + "; ".join(filas))
+    return "ok"
+
+
+# nombre -> (función, periodo)
+TRABAJOS = {
+    "huerfanos": (limpiar_huerfanos, timedelta(hours=1)),
+    "optimizar": (optimizar, timedelta(hours=6)),
+    "vacuum": (vacuum_incremental, timedelta(days=1)),
+    "integridad": (verificar_integridad, timedelta(days=1)),
+}
+
+
+# ============================================================
+#                   EJECUCIÓN Y REGISTRO
+# ============================================================
+
+def ejecutar(nombre: str, limite: float | None = None) -> RegistroMantenimiento:
+    """Corre un trabajo con su límite de tiempo y guarda el resultado en mantenimiento_log."""
+    if nombre not in TRABAJOS:
+        raise ValueError(f"Trabajo de mantenimiento desconocido: {nombre}")
+    if DIALECTO != "sqlite":
+        raise ValueError("El mantenimiento de la BD solo aplica a SQLite.")
+    limite = config.MANTENIMIENTO_LIMITE if limite is None else limite
+    funcion, _ = TRABAJOS[nombre]
+    inicio = datetime.now()
+    t0 = time.perf_counter()
+    completo = True
+    try:
+        detalle, ok = funcion(limite), True
+    except TiempoAgotado as e:
+        detalle = f"tiempo agotado ({limite:g} s); se continúa en la próxima ejecución"
+        if str(e):
+            detalle += f" - {e}"
+        ok, completo = False, False
+    except Exception as e:
+        detalle, ok = f"{type(e).__name__}: {e}", False
+
+    registro = RegistroMantenimiento(
+        trabajo=nombre, inicio=inicio, segundos=time.perf_counter() - t0,
+        ok=ok, completo=completo, detalle=detalle
+    )
+    with get_session() as session:
+        session.add(registro)
+        safe_commit(session)
+        session.refresh(registro)
+    return registro
+
+
+def pendientes(ahora: datetime | None = None) -> list[str]:
+    """
+    Trabajos cuya última ejecución terminada es más antigua que su periodo (o
+    que nunca terminaron). Las cortadas por tiempo no cuentan: se reintentan.
+    """
+    if DIALECTO != "sqlite":
+        return []
+    ahora = ahora or datetime.now()
+    with get_session() as session:
+        ultimos = dict(session.execute(
+            select(RegistroMantenimiento.trabajo, func.max(RegistroMantenimiento.inicio))
+            .where(RegistroMantenimiento.completo.is_not(False))
+            .group_by(RegistroMantenimiento.trabajo)
+        ).all())
+    return [
+        nombre for nombre, (_, periodo) in TRABAJOS.items()
+        if nombre not in ultimos or ahora - ultimos[nombre] >= periodo
+    ]
+
+
+def ejecutar_pendientes(limite: float | None = None) -> list[RegistroMantenimiento]:
+    return [ejecutar(nombre, limite) for nombre in pendientes()]
+
+
+def activar_vacuum_incremental() -> str:
+    """
+    Cambia la BD a auto_vacuum=INCREMENTAL. Requiere un VACUUM completo que
+    bloquea la BD mientras dura: hacerlo con la app cerrada.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+        return "auto_vacuum=" + str(conn.exec_driver_sql("PRAGMA auto_vacuum").scalar())
+
+
+class ProgramadorMantenimiento:
+    """
+    La app llama a tick() periódicamente con los segundos sin actividad del
+    usuario. Si superan MANTENIMIENTO_INACTIVIDAD se revisan los pendientes
+    y se corren en un hilo aparte (uno a la vez): tick() no toca la BD, así
+    el hilo de la UI nunca espera. Un error queda en el log.
+    """
+
+    def __init__(self):
+        self._hilo = None
+        self.ultimos: list[RegistroMantenimiento] = []
+
+    def ocupado(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def tick(self, segundos_inactivo: float) -> bool:
+        if self.ocupado() or segundos_inactivo < config.MANTENIMIENTO_INACTIVIDAD:
+            return False
+        self._hilo = threading.Thread(target=self._correr, name="mantenimiento", daemon=True)
+        self._hilo.start()
+        return True
+
+    def esperar(self, timeout: float | None = None):
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def _correr(self):
+        try:
+            self.ultimos = ejecutar_pendientes()
+        except Exception:
+            log.exception("Falló el mantenimiento de la BD; se reintenta en la próxima pausa")
+            return
+        for r in self.ultimos:
+            if not r.ok:
+                log.warning("Mantenimiento %s: %s", r.trabajo, r.detalle)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de la BD del restaurante.")
+    parser.add_argument("trabajos", nargs="*", help=", ".join(TRABAJOS))
+    parser.add_argument("--limite", type=float, default=None, help="segundos por trabajo")
+    parser.add_argument("--activar-vacuum", action="store_true")
+    args = parser.parse_args()
+    if args.activar_vacuum:
+        print(activar_vacuum_incremental())
+    nombres = args.trabajos or pendientes()
+    for nombre in nombres:
+        r = ejecutar(nombre, args.limite)
+        estado = "ok" if r.ok else ("INCOMPLETO" if r.completo is False else "ERROR")
+        print(f"{r.trabajo}: {estado} en {r.segundos:.2f} s - {r.detalle}")
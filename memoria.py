@@ -0,0 +1,106 @@
+# memoria.py
+"""
+Modo de BD en memoria para pruebas, demos y mediciones (BD_URL=memoria).
+
+La BD vive en RAM (ver database.EN_MEMORIA): no escribe restaurante.db ni
+deja estado entre ejecuciones. Se siembra desde un archivo .db o un
+respaldo .db.gz (respaldo.py) con la API de backup de SQLite; la primera
+carga de cada semilla queda lista en una copia en memoria, así reiniciar()
+vuelve al estado inicial en milisegundos. guardar() la lleva a disco cuando se
+quiere conservar.
+
+Uso:
+    RESTAURANTE_BD_URL=memoria RESTAURANTE_BD_SEMILLA=demo.db python app.py
+
+    import memoria
+    memoria.reiniciar("semilla.db")      # antes de cada prueba
+    ...
+    memoria.guardar("resultado.db")
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import config
+from database import engine, EN_MEMORIA, ANCLA
+
+_lock = threading.Lock()
+_semillas: dict[str, sqlite3.Connection] = {}  # ruta ("" = vacía) -> copia lista en memoria
+
+
+def _requiere_memoria():
+    if not EN_MEMORIA:
+        raise ValueError("La BD no está en memoria (usar RESTAURANTE_BD_URL=memoria).")
+
+
+def _abrir_semilla(ruta: str) -> sqlite3.Connection:
+    """Conexión de solo lectura a la semilla; un respaldo .db.gz se descomprime en memoria."""
+    if not os.path.exists(ruta):
+        raise ValueError(f"No existe la semilla: {ruta}")
+    if not ruta.endswith(".gz"):
+        return sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    copia = sqlite3.connect(":memory:")
+    fd, tmp = tempfile.mkstemp(suffix=".db")
+    try:
+        with os.fdopen(fd, "wb") as f_out, gzip.open(ruta, "rb") as f_in:
+            shutil.copyfileobj(f_in, f_out, 1 << 20)
+        origen = sqlite3.connect(tmp)
+        origen.backup(copia)
+        origen.close()
+    finally:
+        os.remove(tmp)
+    return copia
+
+
+def cargar(origen: sqlite3.Connection):
+    """Reemplaza todo el contenido de la BD en memoria por el de `origen`."""
+    _requiere_memoria()
+    with _lock:
+        # sin conexiones del pool a medio usar durante el reemplazo
+        engine.dispose()
+        origen.backup(ANCLA)
+
+
+def reiniciar(semilla: str | None = None):
+    """
+    Deja la BD como la semilla (por defecto BD_SEMILLA) o vacía, con todas
+    las tablas creadas. La primera vez se lee el archivo y se corre init_db
+    (columnas nuevas, contadores, recetas aplanadas); el resultado queda
+    guardado en memoria y las siguientes veces solo se copia.
+    """
+    from main import init_db
+    semilla = config.BD_SEMILLA if semilla is None else semilla
+    clave = os.path.abspath(semilla) if semilla else ""
+    if clave in _semillas:
+        cargar(_semillas[clave])
+        return
+
+    origen = _abrir_semilla(clave) if clave else sqlite3.connect(":memory:")
+    cargar(origen)
+    origen.close()
+    init_db()
+    lista = sqlite3.connect(":memory:", check_same_thread=False)
+    with _lock:
+        ANCLA.backup(lista)
+    _semillas[clave] = lista
+
+
+def guardar(ruta: str) -> str:
+    """Copia la BD en memoria a un archivo (reemplazándolo de una vez). Retorna la ruta."""
+    _requiere_memoria()
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".db", dir=directorio)
+    os.close(fd)
+    try:
+        destino = sqlite3.connect(tmp)
+        with _lock:
+            ANCLA.backup(destino)
+        destino.close()
+        os.replace(tmp, ruta)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return ruta
@@ -1,93 +1,245 @@
-# models.py
-from datetime import datetime
-from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, ForeignKey, Text, UniqueConstraint
-)
-from sqlalchemy.orm import relationship
-from database import Base
-
-
-class Cliente(Base):
-    __tablename__ = "clientes"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre = Column(String(100), nullable=False)
-    correo = Column(String(120), nullable=False, unique=True)
-    telefono = Column(String(50), nullable=True)
-
-    pedidos = relationship("Pedido", back_populates="cliente")
-
-    def __repr__(self):
-        return f"<Cliente {self.id} {self.nombre} ({self.correo})>"
-
-
-class IngredienteORM(Base):
-    __tablename__ = "ingredientes"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre = Column(String(100), nullable=False, unique=True)
-    unidad = Column(String(50), nullable=False)
-    stock = Column(Float, nullable=False, default=0.0)  # stock >= 0
-
-    def __repr__(self):
-        return f"<Ingrediente {self.nombre} {self.stock} {self.unidad}>"
-
-
-class MenuORM(Base):
-    __tablename__ = "menus"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    nombre = Column(String(100), nullable=False, unique=True)
-    descripcion = Column(Text, nullable=True)
-    precio = Column(Float, nullable=False, default=0.0)
-
-    ingredientes = relationship("MenuIngrediente", back_populates="menu", cascade="all, delete-orphan")
-    pedidos = relationship("PedidoMenu", back_populates="menu")
-
-    def __repr__(self):
-        return f"<Menu {self.nombre} ${self.precio}>"
-
-
-class MenuIngrediente(Base):
-    __tablename__ = "menu_ingredientes"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
-    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), nullable=False)
-    cantidad = Column(Float, nullable=False)  # cantidad requerida para 1 menú
-
-    menu = relationship("MenuORM", back_populates="ingredientes")
-    ingrediente = relationship("IngredienteORM")
-
-    __table_args__ = (
-        UniqueConstraint("menu_id", "ingrediente_id", name="uq_menu_ingrediente"),
-    )
-
-
-class Pedido(Base):
-    __tablename__ = "pedidos"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
-    fecha = Column(DateTime, default=datetime.now, nullable=False)
-    total = Column(Float, nullable=False, default=0.0)
-    descripcion = Column(Text, nullable=True)
-
-    cliente = relationship("Cliente", back_populates="pedidos")
-    items = relationship("PedidoMenu", back_populates="pedido", cascade="all, delete-orphan")
-
-    def __repr__(self):
-        return f"<Pedido {self.id} cliente={self.cliente_id} total={self.total}>"
-
-
-class PedidoMenu(Base):
-    __tablename__ = "pedido_menus"
-
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False)
-    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
-    cantidad = Column(Integer, nullable=False, default=1)
-    precio_unitario = Column(Float, nullable=False, default=0.0)
-
-    pedido = relationship("Pedido", back_populates="items")
-    menu = relationship("MenuORM", back_populates="pedidos")
+# models.py
+from datetime import datetime
+from sqlalchemy import (
+    Column, Integer, String, Float, DateTime, ForeignKey, Text, UniqueConstraint, Index, Boolean
+)
+from sqlalchemy.orm import relationship
+from database import Base
+
+
+class Cliente(Base):
+    __tablename__ = "clientes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    nombre = Column(String(100), nullable=False)
+    correo = Column(String(120), nullable=False, unique=True)
+    telefono = Column(String(50), nullable=True)
+
+    pedidos = relationship("Pedido", back_populates="cliente")
+
+    def __repr__(self):
+        return f"<Cliente {self.id} {self.nombre} ({self.correo})>"
+
+
+class IngredienteORM(Base):
+    __tablename__ = "ingredientes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    nombre = Column(String(100), nullable=False, unique=True)
+    unidad = Column(String(50), nullable=False)
+    stock = Column(Float, nullable=False, default=0.0)  # stock >= 0
+
+    def __repr__(self):
+        return f"<Ingrediente {self.nombre} {self.stock} {self.unidad}>"
+
+
+class MenuORM(Base):
+    __tablename__ = "menus"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    nombre = Column(String(100), nullable=False, unique=True)
+    descripcion = Column(Text, nullable=True)
+    precio = Column(Float, nullable=False, default=0.0)
+    categoria = Column(String(50), nullable=True)  # sección de la carta
+    # Preparación (salsa, masa, ...): se usa como sub-receta y no se vende sola
+    es_preparacion = Column(Boolean, nullable=True, default=False)
+
+    ingredientes = relationship("MenuIngrediente", back_populates="menu", cascade="all, delete-orphan")
+    componentes = relationship(
+        "MenuComponente", foreign_keys="MenuComponente.menu_id",
+        back_populates="menu", cascade="all, delete-orphan"
+    )
+    pedidos = relationship("PedidoMenu", back_populates="menu")
+
+    def __repr__(self):
+        return f"<Menu {self.nombre} ${self.precio}>"
+
+
+class MenuIngrediente(Base):
+    __tablename__ = "menu_ingredientes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), nullable=False)
+    cantidad = Column(Float, nullable=False)  # cantidad requerida para 1 menú
+
+    menu = relationship("MenuORM", back_populates="ingredientes")
+    ingrediente = relationship("IngredienteORM")
+
+    __table_args__ = (
+        UniqueConstraint("menu_id", "ingrediente_id", name="uq_menu_ingrediente"),
+    )
+
+
+class MenuComponente(Base):
+    """Sub-receta: una unidad de `menu_id` lleva `cantidad` unidades de `componente_id`."""
+    __tablename__ = "menu_componentes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    componente_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    cantidad = Column(Float, nullable=False)
+
+    menu = relationship("MenuORM", foreign_keys=[menu_id], back_populates="componentes")
+    componente = relationship("MenuORM", foreign_keys=[componente_id])
+
+    __table_args__ = (
+        UniqueConstraint("menu_id", "componente_id", name="uq_menu_componente"),
+        # búsqueda de los menús que usan una preparación (al reconstruir la receta aplanada)
+        Index("ix_menu_componentes_componente", "componente_id"),
+    )
+
+
+class MenuBOM(Base):
+    """
+    Receta aplanada de cada menú: ingredientes directos más los de todas sus
+    sub-recetas. Es un caché derivado de menu_ingredientes/menu_componentes
+    que se reconstruye solo para los menús cuyo árbol cambió.
+    """
+    __tablename__ = "menu_bom"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), nullable=False)
+    cantidad = Column(Float, nullable=False)  # cantidad total para 1 menú
+
+    __table_args__ = (
+        UniqueConstraint("menu_id", "ingrediente_id", name="uq_menu_bom"),
+    )
+
+
+class Pedido(Base):
+    __tablename__ = "pedidos"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
+    fecha = Column(DateTime, default=datetime.now, nullable=False)
+    total = Column(Float, nullable=False, default=0.0)
+    descripcion = Column(Text, nullable=True)
+    # Clave enviada por la terminal; reintentos con la misma clave no duplican el pedido
+    clave_idempotencia = Column(String(64), nullable=True)
+
+    cliente = relationship("Cliente", back_populates="pedidos")
+    items = relationship("PedidoMenu", back_populates="pedido", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("uq_pedidos_clave_idempotencia", "clave_idempotencia", unique=True),
+        # ids nunca reutilizados (SQLite sin AUTOINCREMENT reusa el mayor tras
+        # borrarlo): la exportación incremental y el archivado se guían por el id
+        {"sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<Pedido {self.id} cliente={self.cliente_id} total={self.total}>"
+
+
+class PedidoMenu(Base):
+    __tablename__ = "pedido_menus"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False)
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    cantidad = Column(Integer, nullable=False, default=1)
+    precio_unitario = Column(Float, nullable=False, default=0.0)
+
+    pedido = relationship("Pedido", back_populates="items")
+    menu = relationship("MenuORM", back_populates="pedidos")
+
+    __table_args__ = {"sqlite_autoincrement": True}  # ver Pedido
+
+
+class ReservaStock(Base):
+    """
+    Retención temporal de ingredientes mientras un menú está en un carrito.
+    Una fila por (carrito, menú, ingrediente); expira sola si no se confirma.
+    """
+    __tablename__ = "reservas_stock"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    carrito = Column(String(36), nullable=False)
+    terminal = Column(String(100), nullable=True)
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    ingrediente_id = Column(Integer, ForeignKey("ingredientes.id"), nullable=False)
+    cantidad = Column(Float, nullable=False)
+    expira = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("carrito", "menu_id", "ingrediente_id", name="uq_reserva_carrito_menu_ing"),
+        Index("ix_reservas_ingrediente_expira", "ingrediente_id", "expira"),
+        Index("ix_reservas_expira", "expira"),
+    )
+
+    def __repr__(self):
+        return f"<Reserva {self.carrito} ing={self.ingrediente_id} {self.cantidad} hasta {self.expira}>"
+
+
+class VentaMenu(Base):
+    """
+    Contadores de ventas por menú, mantenidos en la misma transacción del pedido.
+    periodo: "total" (clave ""), "dia" (AAAA-MM-DD), "semana" (lunes AAAA-MM-DD)
+    o "mes" (AAAA-MM-01).
+    """
+    __tablename__ = "ventas_menu"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    periodo = Column(String(10), nullable=False)
+    clave = Column(String(10), nullable=False, default="")
+    menu_id = Column(Integer, ForeignKey("menus.id"), nullable=False)
+    cantidad = Column(Integer, nullable=False, default=0)
+    monto = Column(Float, nullable=False, default=0.0)
+
+    menu = relationship("MenuORM")
+
+    __table_args__ = (
+        UniqueConstraint("periodo", "clave", "menu_id", name="uq_ventas_menu_periodo"),
+        # top-N por ventana: lectura ordenada directamente del índice
+        Index("ix_ventas_menu_ranking", "periodo", "clave", "cantidad"),
+    )
+
+
+class VentaHora(Base):
+    """
+    Pedidos y monto por hora de cada día, para el mapa de calor de demanda.
+    dia_semana: 0 = lunes ... 6 = domingo.
+    """
+    __tablename__ = "ventas_hora"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    fecha = Column(String(10), nullable=False)  # AAAA-MM-DD
+    hora = Column(Integer, nullable=False)
+    dia_semana = Column(Integer, nullable=False)
+    pedidos = Column(Integer, nullable=False, default=0)
+    monto = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint("fecha", "hora", name="uq_ventas_hora"),
+    )
+
+
+class VersionDatos(Base):
+    """
+    Contador que sube en cada cambio de los datos que alimentan los gráficos
+    (pedidos, recetas, nombres y precios). Ver crud.estadistica_crud.marcar_cambio.
+    """
+    __tablename__ = "version_datos"
+
+    nombre = Column(String(30), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+
+
+class RegistroMantenimiento(Base):
+    """Una ejecución de un trabajo de mantenimiento (ver mantenimiento.py)."""
+    __tablename__ = "mantenimiento_log"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trabajo = Column(String(30), nullable=False)
+    inicio = Column(DateTime, nullable=False)
+    segundos = Column(Float, nullable=False)
+    ok = Column(Boolean, nullable=False)
+    # False: cortado por el límite de tiempo, se reintenta (NULL en registros antiguos = terminado)
+    completo = Column(Boolean, nullable=True)
+    detalle = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_mantenimiento_log_trabajo", "trabajo", "inicio"),
+    )
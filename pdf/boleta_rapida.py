@@ -0,0 +1,145 @@
+# boleta_rapida.py
+"""
+Boleta dibujada directamente sobre el canvas de reportlab, sin Platypus.
+
+Todo lo que no cambia entre boletas (textos del encabezado, posiciones de
+columnas, anchos de fuente) se calcula una sola vez al importar el módulo;
+por boleta solo se escriben las líneas de detalle y los totales.
+Misma entrada que pdf.boleta.Boleta: items = [(nombre, cantidad, precio_unitario, subtotal)]
+"""
+from io import BytesIO
+from functools import lru_cache
+from datetime import datetime
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from carrito import totales, IVA_PORCENTAJE
+
+ANCHO, ALTO = letter
+MARGEN = 36
+FUENTE = "Helvetica"
+FUENTE_B = "Helvetica-Bold"
+TAM = 10
+ALTO_FILA = 18
+
+EMPRESA = (
+    ("Boleta Restaurante", FUENTE_B),
+    ("Restaurante Crunch", FUENTE),
+    ("RUT: 12.345.678-9", FUENTE),
+    ("Dirección: Calle Ejemplo 123, Temuco", FUENTE),
+    ("Teléfono: +56 9 1234 5678", FUENTE),
+)
+
+# ----------------- COLUMNAS (x inicial, ancho) -----------------
+_ANCHOS = (250, 80, 120, 120)
+_X = [MARGEN]
+for _w in _ANCHOS[:-1]:
+    _X.append(_X[-1] + _w)
+COLUMNAS = tuple(zip(_X, _ANCHOS))
+X_FIN_TABLA = _X[-1] + _ANCHOS[-1]
+ENCABEZADOS = ("Producto", "Cantidad", "Precio Unitario", "Subtotal")
+GRIS = colors.HexColor("#EFEFEF")
+
+# ancho disponible para el nombre del producto (con 4pt de relleno por lado)
+_ANCHO_NOMBRE = _ANCHOS[0] - 8
+_ANCHO_ELIPSIS = stringWidth("...", FUENTE, TAM)
+
+
+def _pesos(valor) -> str:
+    return f"${valor:,.0f}".replace(",", ".")
+
+
+@lru_cache(maxsize=512)
+def _recortar(texto: str) -> str:
+    if stringWidth(texto, FUENTE, TAM) <= _ANCHO_NOMBRE:
+        return texto
+    while texto and stringWidth(texto, FUENTE, TAM) + _ANCHO_ELIPSIS > _ANCHO_NOMBRE:
+        texto = texto[:-1]
+    return texto + "..."
+
+
+class BoletaRapida:
+    def __init__(self, items, fecha=None, invariante: bool = False):
+        """
+        invariante: sin fecha de creación ni id aleatorio en el PDF, así la
+        misma boleta produce siempre los mismos bytes (reimpresiones).
+        """
+        self.items = items
+        self.fecha = fecha
+        self.invariante = invariante
+
+    # ----------------- PARTES FIJAS -----------------
+    def _encabezado(self, c, fecha_txt: str) -> float:
+        y = ALTO - MARGEN - TAM
+        for texto, fuente in EMPRESA:
+            c.setFont(fuente, TAM)
+            c.drawString(MARGEN, y, texto)
+            y -= TAM + 2
+        c.setFont(FUENTE, TAM)
+        c.drawRightString(MARGEN + 500, ALTO - MARGEN - TAM, fecha_txt)
+        return y - 20
+
+    def _fila(self, c, y: float, fill: int):
+        """Rectángulo de una fila de la grilla más sus divisiones de columna."""
+        c.rect(MARGEN, y - ALTO_FILA, X_FIN_TABLA - MARGEN, ALTO_FILA, stroke=1, fill=fill)
+        for x, _ in COLUMNAS[1:]:
+            c.line(x, y - ALTO_FILA, x, y)
+
+    def _cabecera_tabla(self, c, y: float) -> float:
+        c.setFillColor(GRIS)
+        self._fila(c, y, fill=1)
+        c.setFillColor(colors.black)
+        c.setFont(FUENTE_B, TAM)
+        for (x, w), texto in zip(COLUMNAS, ENCABEZADOS):
+            c.drawString(x + 4, y - ALTO_FILA + 5, texto)
+        return y - ALTO_FILA
+
+    # ----------------- GENERAR -----------------
+    def dibujar(self, c):
+        fecha = self.fecha if self.fecha is not None else datetime.now()
+        y = self._encabezado(c, fecha.strftime("%d/%m/%Y %H:%M"))
+        y = self._cabecera_tabla(c, y)
+        c.setFont(FUENTE, TAM)
+
+        for nombre, cant, precio, sub in self.items:
+            if y - ALTO_FILA < MARGEN + 4 * ALTO_FILA:
+                c.showPage()
+                y = self._cabecera_tabla(c, ALTO - MARGEN)
+                c.setFont(FUENTE, TAM)
+
+            base = y - ALTO_FILA + 5
+            self._fila(c, y, fill=0)
+            c.drawString(COLUMNAS[0][0] + 4, base, _recortar(str(nombre)))
+            for (x, w), texto in zip(COLUMNAS[1:], (str(cant), _pesos(precio), _pesos(sub))):
+                c.drawCentredString(x + w / 2, base, texto)
+            y -= ALTO_FILA
+
+        # ----------------- TOTALES -----------------
+        subtotal, iva, total = totales(self.items)
+        y -= 15 + TAM
+        for etiqueta, valor, fuente in (
+            ("Subtotal:", subtotal, FUENTE),
+            (f"IVA ({IVA_PORCENTAJE}%):", iva, FUENTE),
+            ("Total:", total, FUENTE_B),
+        ):
+            c.setFont(fuente, TAM)
+            c.drawString(MARGEN + 250, y, etiqueta)
+            c.setFont(FUENTE, TAM)
+            c.drawRightString(MARGEN + 520, y, _pesos(valor))
+            y -= TAM + 6
+
+        c.drawString(MARGEN, y - 20, "Gracias por su compra.")
+        c.showPage()
+
+    def generar_pdf(self, salida="boleta.pdf"):
+        """salida: ruta o buffer (BytesIO)."""
+        c = canvas.Canvas(salida, pagesize=letter, invariant=1 if self.invariante else 0)
+        self.dibujar(c)
+        c.save()
+        return salida
+
+    def generar_bytes(self) -> bytes:
+        buffer = BytesIO()
+        self.generar_pdf(buffer)
+        return buffer.getvalue()
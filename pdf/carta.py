@@ -1,67 +1,184 @@
-# carta.py
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-
-def generar_menu_pdf(menus, salida="carta.pdf"):
-    """
-    Genera un PDF con la carta del restaurante.
-    Recibe: menus = [(nombre, precio), ...]
-    """
-    doc = SimpleDocTemplate(
-        salida, pagesize=letter,
-        leftMargin=36, rightMargin=36,
-        topMargin=36, bottomMargin=36
-    )
-
-    styles = getSampleStyleSheet()
-    story = []
-
-    # ----------------- ENCABEZADO -----------------
-    header = Paragraph(
-        "<b>Restaurante Crunch — Carta</b><br/>Primavera 2025",
-        ParagraphStyle("hdr", parent=styles["Heading1"], textColor=colors.white)
-    )
-
-    header_table = Table([[header]], colWidths=[doc.width])
-    header_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#2B9BE6")),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
-        ("TOPPADDING", (0, 0), (-1, -1), 10),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-    ]))
-
-    story.append(header_table)
-    story.append(Spacer(1, 20))
-
-    # ----------------- TABLA DE MENÚS -----------------
-    data = [
-        [
-            Paragraph("<b>Menú</b>", styles["Normal"]),
-            Paragraph("<b>Precio</b>", styles["Normal"])
-        ]
-    ]
-
-    for nombre, precio in menus:
-        data.append([
-            Paragraph(nombre, styles["Normal"]),
-            Paragraph(f"${precio:,.0f}".replace(",", "."), styles["Normal"])
-        ])
-
-    tabla = Table(data, colWidths=[350, 100])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F5F7FA")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.3, colors.gray),
-        ("BOX", (0, 0), (-1, -1), 0.3, colors.gray),
-        ("ALIGN", (1, 1), (1, -1), "RIGHT"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE")
-    ]))
-
-    story.append(tabla)
-    story.append(Spacer(1, 20))
-
-    # ----------------- GENERAR PDF -----------------
-    doc.build(story)
-    return salida
+# carta.py
+import hashlib
+import json
+import os
+import config
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+
+def generar_menu_pdf(menus, salida="carta.pdf"):
+    """
+    Genera un PDF con la carta del restaurante.
+    Recibe: menus = [(nombre, precio), ...]
+    """
+    doc = SimpleDocTemplate(
+        salida, pagesize=letter,
+        leftMargin=36, rightMargin=36,
+        topMargin=36, bottomMargin=36
+    )
+
+    styles = getSampleStyleSheet()
+    story = []
+
+    # ----------------- ENCABEZADO -----------------
+    header = Paragraph(
+        "<b>Restaurante Crunch — Carta</b><br/>Primavera 2025",
+        ParagraphStyle("hdr", parent=styles["Heading1"], textColor=colors.white)
+    )
+
+    header_table = Table([[header]], colWidths=[doc.width])
+    header_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#2B9BE6")),
+        ("LEFTPADDING", (0, 0), (-1, -1), 12),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+    ]))
+
+    story.append(header_table)
+    story.append(Spacer(1, 20))
+
+    # ----------------- TABLA DE MENÚS -----------------
+    data = [
+        [
+            Paragraph("<b>Menú</b>", styles["Normal"]),
+            Paragraph("<b>Precio</b>", styles["Normal"])
+        ]
+    ]
+
+    for nombre, precio in menus:
+        data.append([
+            Paragraph(nombre, styles["Normal"]),
+            Paragraph(f"${precio:,.0f}".replace(",", "."), styles["Normal"])
+        ])
+
+    tabla = Table(data, colWidths=[350, 100])
+    tabla.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F5F7FA")),
+        ("INNERGRID", (0, 0), (-1, -1), 0.3, colors.gray),
+        ("BOX", (0, 0), (-1, -1), 0.3, colors.gray),
+        ("ALIGN", (1, 1), (1, -1), "RIGHT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE")
+    ]))
+
+    story.append(tabla)
+    story.append(Spacer(1, 20))
+
+    # ----------------- GENERAR PDF -----------------
+    doc.build(story)
+    return salida
+
+
+# ============================================================
+#          CARTA POR CATEGORÍAS (CACHEADA EN DISCO)
+# ============================================================
+SIN_CATEGORIA = "Otros"
+
+
+def generar_carta_pdf(secciones, salida="carta.pdf"):
+    """
+    Carta agrupada por categoría.
+    Recibe: secciones = [(categoria, [(nombre, descripcion, precio, disponible), ...]), ...]
+    """
+    doc = SimpleDocTemplate(
+        salida, pagesize=letter,
+        leftMargin=36, rightMargin=36,
+        topMargin=36, bottomMargin=36
+    )
+
+    styles = getSampleStyleSheet()
+    desc_style = ParagraphStyle("desc", parent=styles["Normal"], fontSize=8, textColor=colors.gray)
+    story = []
+
+    header = Paragraph(
+        "<b>Restaurante Crunch — Carta</b>",
+        ParagraphStyle("hdr", parent=styles["Heading1"], textColor=colors.white)
+    )
+    header_table = Table([[header]], colWidths=[doc.width])
+    header_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#2B9BE6")),
+        ("LEFTPADDING", (0, 0), (-1, -1), 12),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+    ]))
+    story.append(header_table)
+    story.append(Spacer(1, 20))
+
+    for categoria, menus in secciones:
+        story.append(Paragraph(categoria, styles["Heading2"]))
+        data = []
+        for nombre, descripcion, precio, disponible in menus:
+            texto = f"<b>{nombre}</b>"
+            if not disponible:
+                texto += " <font color='#B31312'>(agotado)</font>"
+            celda = [Paragraph(texto, styles["Normal"])]
+            if descripcion:
+                celda.append(Paragraph(descripcion, desc_style))
+            data.append([celda, Paragraph(f"${precio:,.0f}".replace(",", "."), styles["Normal"])])
+
+        tabla = Table(data, colWidths=[400, 100])
+        tabla.setStyle(TableStyle([
+            ("LINEBELOW", (0, 0), (-1, -1), 0.3, colors.gray),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE")
+        ]))
+        story.append(tabla)
+        story.append(Spacer(1, 12))
+
+    doc.build(story)
+    return salida
+
+
+def secciones_carta():
+    """Lee el catálogo desde la BD y lo agrupa por categoría (orden alfabético)."""
+    from crud.menu_crud import listar_menus_basico, obtener_recetas
+    from crud.ingrediente_crud import obtener_stock
+
+    menus = listar_menus_basico()
+    recetas = obtener_recetas(m.id for m in menus)
+    stock = obtener_stock({ing for r in recetas.values() for ing in r})
+
+    grupos = {}
+    for m in menus:
+        disponible = all(
+            stock.get(ing_id, ("", 0.0))[1] >= cant
+            for ing_id, cant in recetas[m.id].items()
+        )
+        grupos.setdefault(m.categoria or SIN_CATEGORIA, []).append(
+            (m.nombre, m.descripcion or "", m.precio, disponible)
+        )
+    return sorted(grupos.items())
+
+
+def version_carta(secciones) -> str:
+    """Hash del contenido de la carta: cambia solo si cambia algo visible."""
+    return hashlib.sha256(
+        json.dumps(secciones, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def obtener_carta(directorio: str | None = None) -> str:
+    """
+    Retorna la ruta de la carta vigente. Si ya existe un PDF para la versión
+    actual del catálogo se sirve tal cual; si no, se genera y se borran las
+    versiones anteriores.
+    """
+    directorio = directorio or config.CARTA_DIR
+    secciones = secciones_carta()
+    salida = os.path.join(directorio, f"carta_{version_carta(secciones)}.pdf")
+    if os.path.exists(salida):
+        return salida
+
+    os.makedirs(directorio, exist_ok=True)
+    tmp = salida + ".tmp"
+    generar_carta_pdf(secciones, tmp)
+    os.replace(tmp, salida)
+
+    for nombre in os.listdir(directorio):
+        ruta = os.path.join(directorio, nombre)
+        if nombre.startswith("carta_") and nombre.endswith(".pdf") and ruta != salida:
+            os.remove(ruta)
+    return salida
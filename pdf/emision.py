@@ -0,0 +1,56 @@
+# emision.py
+"""
+Emisión de boletas fuera del hilo de la UI: render, guardado en la carpeta
+configurada y entrega opcional. Pensado para correr dentro de una Tarea.
+"""
+import os
+import webbrowser
+import config
+from pdf.boleta_rapida import BoletaRapida
+from pdf.escpos import BoletaEscPos
+
+
+def ruta_boleta(pedido_id: int, extension: str = "pdf") -> str:
+    return os.path.join(config.BOLETAS_DIR, f"boleta_{pedido_id}.{extension}")
+
+
+def guardar_boleta(pedido_id: int, detalle, fecha=None) -> str:
+    """
+    Genera la boleta del pedido en BOLETAS_DIR. Escribe a un archivo temporal
+    y lo renombra, así un reintento nunca deja un PDF a medias.
+    """
+    os.makedirs(config.BOLETAS_DIR, exist_ok=True)
+    salida = ruta_boleta(pedido_id)
+    tmp = salida + ".tmp"
+    BoletaRapida(detalle, fecha=fecha).generar_pdf(tmp)
+    os.replace(tmp, salida)
+    return salida
+
+
+def entregar_boleta(ruta: str):
+    if config.ENTREGA_BOLETA == "abrir":
+        webbrowser.open(os.path.abspath(ruta))
+
+
+def imprimir_escpos(pedido_id: int, detalle, fecha=None) -> str:
+    """Envía la boleta ESC/POS a IMPRESORA_DESTINO (o a un archivo en BOLETAS_DIR)."""
+    destino = config.IMPRESORA_DESTINO
+    if not destino:
+        os.makedirs(config.BOLETAS_DIR, exist_ok=True)
+        destino = ruta_boleta(pedido_id, "escpos")
+    return BoletaEscPos(detalle, fecha=fecha).enviar(destino)
+
+
+def emitir_boleta(pedido_id: int, detalle, fecha=None) -> str:
+    if config.BOLETA_BACKEND == "escpos":
+        return imprimir_escpos(pedido_id, detalle, fecha)
+    ruta = guardar_boleta(pedido_id, detalle, fecha)
+    entregar_boleta(ruta)
+    return ruta
+
+
+def reemitir_boleta(pedido_id: int) -> str:
+    """Vuelve a emitir la boleta de un pedido existente, leída desde la BD."""
+    from pdf.reimpresion import datos_boleta
+    detalle, fecha = datos_boleta(pedido_id)
+    return emitir_boleta(pedido_id, detalle, fecha)
@@ -0,0 +1,107 @@
+# escpos.py
+"""
+Boleta en texto plano ESC/POS para impresoras térmicas.
+
+Mismos items que pdf.boleta.Boleta: [(nombre, cantidad, precio_unitario, subtotal)].
+El encabezado y el pie se arman como bytes una sola vez; por boleta solo se
+formatean las líneas de detalle.
+"""
+import socket
+from datetime import datetime
+from carrito import totales, IVA_PORCENTAJE
+
+# Ancho en caracteres de una impresora de 80 mm con fuente A
+ANCHO = 42
+CODIFICACION = "cp858"  # PC858: español + símbolo del euro
+
+# ----------------- COMANDOS ESC/POS -----------------
+ESC = b"\x1b"
+GS = b"\x1d"
+INICIAR = ESC + b"@"
+CODEPAGE_858 = ESC + b"t\x13"
+ALINEAR_IZQ = ESC + b"a\x00"
+ALINEAR_CENTRO = ESC + b"a\x01"
+NEGRITA_ON = ESC + b"E\x01"
+NEGRITA_OFF = ESC + b"E\x00"
+DOBLE_ALTO = GS + b"!\x01"
+NORMAL = GS + b"!\x00"
+AVANZAR_4 = ESC + b"d\x04"
+CORTAR = GS + b"V\x42\x00"  # corte parcial tras avanzar
+
+
+def _b(texto: str) -> bytes:
+    return texto.encode(CODIFICACION, errors="replace")
+
+
+def _pesos(valor) -> str:
+    return f"${valor:,.0f}".replace(",", ".")
+
+
+# Columnas: producto | cant | subtotal
+_COL_CANT = 5
+_COL_SUB = 11
+_COL_NOMBRE = ANCHO - _COL_CANT - _COL_SUB
+SEPARADOR = _b("-" * ANCHO + "\n")
+
+ENCABEZADO = b"".join([
+    INICIAR, CODEPAGE_858,
+    ALINEAR_CENTRO, NEGRITA_ON, DOBLE_ALTO, _b("Restaurante Crunch\n"), NORMAL, NEGRITA_OFF,
+    _b("Boleta Restaurante\n"),
+    _b("RUT: 12.345.678-9\n"),
+    _b("Calle Ejemplo 123, Temuco\n"),
+    _b("Tel: +56 9 1234 5678\n"),
+    ALINEAR_IZQ,
+])
+CABECERA_TABLA = SEPARADOR + _b(
+    f"{'Producto':<{_COL_NOMBRE}}{'Cant':>{_COL_CANT}}{'Subtotal':>{_COL_SUB}}\n"
+) + SEPARADOR
+PIE = b"".join([
+    ALINEAR_CENTRO, _b("\nGracias por su compra.\n"), ALINEAR_IZQ,
+    AVANZAR_4, CORTAR,
+])
+
+
+def _linea_total(etiqueta: str, valor) -> str:
+    monto = _pesos(valor)
+    return f"{etiqueta:>{ANCHO - _COL_SUB}}{monto:>{_COL_SUB}}\n"
+
+
+class BoletaEscPos:
+    def __init__(self, items, fecha=None):
+        self.items = items
+        self.fecha = fecha
+
+    def generar_bytes(self) -> bytes:
+        fecha = self.fecha if self.fecha is not None else datetime.now()
+        partes = [ENCABEZADO, _b(fecha.strftime("%d/%m/%Y %H:%M") + "\n"), CABECERA_TABLA]
+
+        lineas = []
+        for nombre, cant, precio, sub in self.items:
+            nombre = str(nombre)[:_COL_NOMBRE - 1]
+            lineas.append(f"{nombre:<{_COL_NOMBRE}}{cant:>{_COL_CANT}}{_pesos(sub):>{_COL_SUB}}\n")
+            if cant != 1:
+                lineas.append(f"  {cant} x {_pesos(precio)}\n")
+
+        subtotal, iva, total = totales(self.items)
+        lineas.append("-" * ANCHO + "\n")
+        lineas.append(_linea_total("Subtotal:", subtotal))
+        lineas.append(_linea_total(f"IVA ({IVA_PORCENTAJE}%):", iva))
+        partes.append(_b("".join(lineas)))
+        partes.append(NEGRITA_ON + _b(_linea_total("TOTAL:", total)) + NEGRITA_OFF)
+        partes.append(PIE)
+        return b"".join(partes)
+
+    def enviar(self, destino: str) -> str:
+        """
+        destino: ruta de archivo o dispositivo (p. ej. /dev/usb/lp0),
+        o "tcp://host:puerto" para una impresora de red / socket local.
+        """
+        datos = self.generar_bytes()
+        if destino.startswith("tcp://"):
+            host, _, puerto = destino[len("tcp://"):].rpartition(":")
+            with socket.create_connection((host, int(puerto)), timeout=5) as s:
+                s.sendall(datos)
+        else:
+            with open(destino, "wb") as f:
+                f.write(datos)
+        return destino
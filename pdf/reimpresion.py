@@ -0,0 +1,167 @@
+# reimpresion.py
+"""
+Reimpresión de boletas desde la BD (Pedido + PedidoMenu.precio_unitario),
+incluidos los pedidos ya movidos a los archivos anuales (ver archivado.py).
+
+El resultado es determinista: misma boleta, mismos bytes. La reimpresión masiva
+lee los pedidos en bloques en este proceso y reparte solo el render entre un
+pool de procesos, así los workers no abren conexiones a la BD.
+
+Uso:
+    python -m pdf.reimpresion 2025-01-01 2025-01-31 --dir boletas_enero
+    python -m pdf.reimpresion 2025-01-01 2025-01-31 --zip enero.zip
+"""
+import argparse
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import select
+from database import get_session
+from models import Pedido, PedidoMenu, MenuORM
+from archivado import tablas_pedidos
+from pdf.boleta_rapida import BoletaRapida
+
+BLOQUE = 200  # pedidos por tarea enviada al pool
+
+
+def nombre_boleta(pedido_id: int) -> str:
+    return f"boleta_{pedido_id}.pdf"
+
+
+# ============================================================
+#                    LECTURA DESDE LA BD
+# ============================================================
+
+def _detalles(session, ids, PM=PedidoMenu) -> dict[int, list]:
+    """{pedido_id: [(nombre, cantidad, precio_unitario, subtotal), ...]} en una consulta."""
+    detalles = {pid: [] for pid in ids}
+    rows = session.execute(
+        select(PM.pedido_id, MenuORM.nombre, PM.cantidad, PM.precio_unitario)
+        .join(MenuORM, PM.menu_id == MenuORM.id)
+        .where(PM.pedido_id.in_(ids))
+        .order_by(PM.pedido_id, PM.id)
+    ).all()
+    for pid, nombre, cant, precio in rows:
+        detalles[pid].append((nombre, cant, precio, precio * cant))
+    return detalles
+
+
+def datos_boleta(id_pedido: int):
+    """Retorna (detalle, fecha) de un pedido existente."""
+    with get_session() as session:
+        pedido = session.get(Pedido, id_pedido)
+        if pedido:
+            return _detalles(session, [id_pedido])[id_pedido], pedido.fecha
+        # no está en la BD principal: buscar en los archivos anuales
+        P, PM = tablas_pedidos()
+        fecha = session.scalar(select(P.fecha).where(P.id == id_pedido))
+        if fecha is None:
+            raise ValueError("Pedido no encontrado.")
+        return _detalles(session, [id_pedido], PM)[id_pedido], fecha
+
+
+def iterar_datos_rango(desde: date, hasta: date, bloque: int = BLOQUE):
+    """
+    Genera bloques [(pedido_id, fecha, detalle), ...] de los pedidos entre
+    `desde` y `hasta` (ambos inclusive), ordenados por id.
+    """
+    inicio = datetime.combine(desde, time.min)
+    fin = datetime.combine(hasta + timedelta(days=1), time.min)
+    P, PM = tablas_pedidos(desde, hasta)
+    ultimo = 0
+    while True:
+        with get_session() as session:
+            pedidos = session.execute(
+                select(P.id, P.fecha)
+                .where(P.fecha >= inicio, P.fecha < fin, P.id > ultimo)
+                .order_by(P.id)
+                .limit(bloque)
+            ).all()
+            if not pedidos:
+                return
+            detalles = _detalles(session, [pid for pid, _ in pedidos], PM)
+        yield [(pid, fecha, detalles[pid]) for pid, fecha in pedidos]
+        ultimo = pedidos[-1][0]
+
+
+# ============================================================
+#                          RENDER
+# ============================================================
+
+def boleta_bytes(detalle, fecha) -> bytes:
+    return BoletaRapida(detalle, fecha=fecha, invariante=True).generar_bytes()
+
+
+def reimprimir_boleta(id_pedido: int, salida: str) -> str:
+    detalle, fecha = datos_boleta(id_pedido)
+    with open(salida, "wb") as f:
+        f.write(boleta_bytes(detalle, fecha))
+    return salida
+
+
+def _render_bloque(bloque, directorio: str | None):
+    """Worker: retorna [(nombre, bytes)] o, si hay directorio, escribe y retorna [(nombre, None)]."""
+    salida = []
+    for pid, fecha, detalle in bloque:
+        nombre = nombre_boleta(pid)
+        datos = boleta_bytes(detalle, fecha)
+        if directorio:
+            with open(os.path.join(directorio, nombre), "wb") as f:
+                f.write(datos)
+            salida.append((nombre, None))
+        else:
+            salida.append((nombre, datos))
+    return salida
+
+
+def reimprimir_rango(desde: date, hasta: date, directorio: str | None = None,
+                     archivo_zip: str | None = None, procesos: int | None = None) -> int:
+    """
+    Reimprime todas las boletas del rango en un directorio o en un único zip.
+    procesos=None usa un worker por núcleo. Retorna la cantidad de boletas.
+    """
+    if bool(directorio) == bool(archivo_zip):
+        raise ValueError("Indica un directorio o un archivo zip (solo uno).")
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    procesos = procesos or os.cpu_count() or 1
+    total = 0
+    zf = zipfile.ZipFile(archivo_zip, "w", zipfile.ZIP_DEFLATED) if archivo_zip else None
+
+    def recoger(futuro):
+        nonlocal total
+        for nombre, datos in futuro.result():
+            if zf is not None:
+                zf.writestr(nombre, datos)
+            total += 1
+
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            # a lo más 2 bloques por worker en vuelo: memoria acotada en rangos grandes
+            en_vuelo = deque()
+            for bloque in iterar_datos_rango(desde, hasta):
+                en_vuelo.append(pool.submit(_render_bloque, bloque, directorio))
+                if len(en_vuelo) >= 2 * procesos:
+                    recoger(en_vuelo.popleft())
+            while en_vuelo:
+                recoger(en_vuelo.popleft())
+    finally:
+        if zf is not None:
+            zf.close()
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reimprime boletas de un rango de fechas.")
+    parser.add_argument("desde", type=date.fromisoformat)
+    parser.add_argument("hasta", type=date.fromisoformat)
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--dir", dest="directorio")
+    grupo.add_argument("--zip", dest="archivo_zip")
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+    n = reimprimir_rango(args.desde, args.hasta, args.directorio, args.archivo_zip, args.procesos)
+    print(f"{n} boletas reimpresas.")
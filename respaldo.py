@@ -0,0 +1,238 @@
+# respaldo.py
+"""
+Respaldos en línea de restaurante.db con la API de backup de SQLite.
+
+La copia avanza de a `paginas` páginas con una pausa entre pasos: en cada
+paso solo se toma un bloqueo de lectura corto, así crear_pedido sigue
+escribiendo mientras se respalda. Si otra conexión escribe, SQLite reinicia
+la copia; tras MAX_REINICIOS reinicios se termina en un solo paso (un
+bloqueo de lectura de lo que tarde copiar el archivo). La copia se verifica con
+PRAGMA integrity_check antes de comprimirla; luego se rota a los últimos
+RESPALDO_CONSERVAR respaldos.
+
+Los archivos anuales de pedidos (archivado.py) no cambian después de
+escritos y no se incluyen: se copian como archivos normales.
+
+Uso:
+    python respaldo.py crear
+    python respaldo.py listar
+    python respaldo.py verificar respaldos/respaldo_20250101_230000.db.gz
+    python respaldo.py restaurar respaldos/respaldo_20250101_230000.db.gz   (con la app cerrada)
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+import config
+from database import engine, DIALECTO, EN_MEMORIA
+
+PAGINAS_POR_PASO = 256
+PAUSA_ENTRE_PASOS = 0.005  # segundos
+MAX_REINICIOS = 3
+PREFIJO = "respaldo_"
+EXTENSION = ".db.gz"
+
+
+def ruta_bd() -> str:
+    if EN_MEMORIA:
+        raise ValueError("La BD está en memoria: guardarla con memoria.guardar(ruta).")
+    ruta = engine.url.database
+    if DIALECTO != "sqlite" or not ruta or ruta == ":memory:":
+        raise ValueError(
+            "La BD actual no es un archivo SQLite: respaldarla con las herramientas "
+            "del servidor (p. ej. pg_dump)."
+        )
+    return ruta
+
+
+def _sha256(ruta: str) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+class _CopiaReiniciada(Exception):
+    pass
+
+
+def copiar_en_linea(ruta_origen: str, ruta_destino: str, paginas: int, pausa: float) -> int:
+    """
+    Backup por pasos; si las escrituras concurrentes lo reinician más de
+    MAX_REINICIOS veces, se repite en un solo paso. Retorna los reinicios.
+    """
+    reinicios = 0
+    anterior = None
+
+    def progreso(_estado, restantes, _total):
+        nonlocal reinicios, anterior
+        if anterior is not None and restantes > anterior:
+            reinicios += 1
+            if reinicios > MAX_REINICIOS:
+                raise _CopiaReiniciada()
+        anterior = restantes
+
+    origen = sqlite3.connect(ruta_origen)
+    dst = sqlite3.connect(ruta_destino)
+    try:
+        try:
+            origen.backup(dst, pages=paginas, progress=progreso, sleep=pausa)
+        except _CopiaReiniciada:
+            origen.backup(dst)
+    finally:
+        dst.close()
+        origen.close()
+    return reinicios
+
+
+def _integridad(ruta_sqlite: str) -> str:
+    conn = sqlite3.connect(ruta_sqlite)
+    try:
+        return conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ============================================================
+#                       CREAR Y ROTAR
+# ============================================================
+
+def respaldar(directorio: str | None = None, paginas: int = PAGINAS_POR_PASO,
+              pausa: float = PAUSA_ENTRE_PASOS, conservar: int | None = None) -> str:
+    """
+    Copia la BD en línea, verifica la copia, la comprime y rota los antiguos.
+    Retorna la ruta del respaldo (.db.gz). Junto a él queda un .sha256.
+    """
+    directorio = directorio or config.RESPALDO_DIR
+    conservar = config.RESPALDO_CONSERVAR if conservar is None else conservar
+    os.makedirs(directorio, exist_ok=True)
+
+    nombre = PREFIJO + datetime.now().strftime("%Y%m%d_%H%M%S")
+    destino = os.path.join(directorio, nombre + EXTENSION)
+    fd, copia = tempfile.mkstemp(suffix=".db", dir=directorio)
+    os.close(fd)
+    try:
+        copiar_en_linea(ruta_bd(), copia, paginas, pausa)
+
+        resultado = _integridad(copia)
+        if resultado != "ok":
+            raise ValueError(f"La copia no pasó la verificación de integridad: {resultado}")
+
+        tmp_gz = destino + ".tmp"
+        with open(copia, "rb") as f_in, gzip.open(tmp_gz, "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1 << 20)
+        os.replace(tmp_gz, destino)
+        with open(destino + ".sha256", "w", encoding="utf-8") as f:
+            f.write(f"{_sha256(destino)}  {os.path.basename(destino)}\n")
+    finally:
+        if os.path.exists(copia):
+            os.remove(copia)
+
+    rotar(directorio, conservar)
+    return destino
+
+
+def listar_respaldos(directorio: str | None = None) -> list[str]:
+    """Respaldos del directorio, del más antiguo al más reciente."""
+    directorio = directorio or config.RESPALDO_DIR
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(
+        os.path.join(directorio, n) for n in os.listdir(directorio)
+        if n.startswith(PREFIJO) and n.endswith(EXTENSION)
+    )
+
+
+def rotar(directorio: str | None = None, conservar: int | None = None) -> list[str]:
+    """Borra los respaldos más antiguos dejando `conservar`. Retorna los borrados."""
+    conservar = config.RESPALDO_CONSERVAR if conservar is None else conservar
+    sobrantes = listar_respaldos(directorio)[:-conservar] if conservar > 0 else []
+    for ruta in sobrantes:
+        os.remove(ruta)
+        if os.path.exists(ruta + ".sha256"):
+            os.remove(ruta + ".sha256")
+    return sobrantes
+
+
+# ============================================================
+#                   VERIFICAR Y RESTAURAR
+# ============================================================
+
+def _descomprimir(ruta: str, directorio: str) -> str:
+    fd, salida = tempfile.mkstemp(suffix=".db", dir=directorio)
+    with os.fdopen(fd, "wb") as f_out, gzip.open(ruta, "rb") as f_in:
+        shutil.copyfileobj(f_in, f_out, 1 << 20)
+    return salida
+
+
+def verificar_respaldo(ruta: str) -> str:
+    """
+    Comprueba el hash (si hay .sha256) y la integridad de la BD respaldada.
+    Retorna "ok" o la descripción del problema.
+    """
+    if os.path.exists(ruta + ".sha256"):
+        with open(ruta + ".sha256", encoding="utf-8") as f:
+            esperado = f.read().split()[0]
+        if _sha256(ruta) != esperado:
+            return "El hash del archivo no coincide (respaldo dañado)."
+    copia = _descomprimir(ruta, os.path.dirname(os.path.abspath(ruta)))
+    try:
+        return _integridad(copia)
+    except sqlite3.DatabaseError as e:
+        return str(e)
+    finally:
+        os.remove(copia)
+
+
+def restaurar(ruta: str, destino: str | None = None) -> str:
+    """
+    Reemplaza la BD por el contenido del respaldo (verificado antes).
+    Usa la API de backup hacia el archivo de destino, así otras conexiones
+    nunca ven una BD a medio copiar. Hacerlo con la app cerrada.
+    """
+    resultado = verificar_respaldo(ruta)
+    if resultado != "ok":
+        raise ValueError(f"No se restaura: {resultado}")
+    destino = destino or ruta_bd()
+    copia = _descomprimir(ruta, os.path.dirname(os.path.abspath(destino)) or ".")
+    try:
+        origen = sqlite3.connect(copia)
+        dst = sqlite3.connect(destino)
+        try:
+            origen.backup(dst)
+        finally:
+            dst.close()
+            origen.close()
+    finally:
+        os.remove(copia)
+    engine.dispose()
+    return destino
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Respaldos de la BD del restaurante.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+    crear = sub.add_parser("crear")
+    crear.add_argument("--dir", dest="directorio", default=None)
+    crear.add_argument("--paginas", type=int, default=PAGINAS_POR_PASO)
+    sub.add_parser("listar")
+    ver = sub.add_parser("verificar")
+    ver.add_argument("archivo")
+    res = sub.add_parser("restaurar")
+    res.add_argument("archivo")
+    args = parser.parse_args()
+
+    if args.accion == "crear":
+        print(f"Respaldo creado: {respaldar(args.directorio, args.paginas)}")
+    elif args.accion == "listar":
+        for ruta in listar_respaldos():
+            print(ruta)
+    elif args.accion == "verificar":
+        print(verificar_respaldo(args.archivo))
+    else:
+        print(f"BD restaurada en {restaurar(args.archivo)}")
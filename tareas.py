@@ -0,0 +1,90 @@
+# tareas.py
+"""
+Cola de trabajos en segundo plano (hilos) con reintentos.
+
+La UI encola y sigue atendiendo; los resultados quedan en una cola que la
+UI revisa con `after`, porque Tk no se puede tocar desde otros hilos.
+"""
+import queue
+import threading
+import time
+import traceback
+
+
+class Tarea:
+    def __init__(self, nombre: str, funcion, *args, reintentos: int = 3, **kwargs):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.reintentos = reintentos
+        self.intentos = 0
+
+    def __repr__(self):
+        return f"<Tarea {self.nombre} intentos={self.intentos}>"
+
+
+class Resultado:
+    def __init__(self, tarea: Tarea, ok: bool, valor=None, error: Exception | None = None):
+        self.tarea = tarea
+        self.ok = ok
+        self.valor = valor
+        self.error = error
+
+
+class ColaTareas:
+    """
+    Ejecuta Tareas en `hilos` hilos daemon. Un fallo se reintenta con espera
+    exponencial (espera_base, 2*espera_base, ...) hasta agotar `reintentos`.
+    """
+
+    def __init__(self, hilos: int = 1, espera_base: float = 0.5):
+        self._pendientes = queue.Queue()
+        self.resultados = queue.Queue()
+        self._espera_base = espera_base
+        self._hilos = [
+            threading.Thread(target=self._trabajar, name=f"tareas-{i}", daemon=True)
+            for i in range(hilos)
+        ]
+        for h in self._hilos:
+            h.start()
+
+    def encolar(self, tarea: Tarea) -> Tarea:
+        self._pendientes.put(tarea)
+        return tarea
+
+    def _trabajar(self):
+        while True:
+            tarea = self._pendientes.get()
+            try:
+                self._ejecutar(tarea)
+            finally:
+                self._pendientes.task_done()
+
+    def _ejecutar(self, tarea: Tarea):
+        while True:
+            tarea.intentos += 1
+            try:
+                valor = tarea.funcion(*tarea.args, **tarea.kwargs)
+            except Exception as e:
+                if tarea.intentos > tarea.reintentos:
+                    traceback.print_exc()
+                    self.resultados.put(Resultado(tarea, False, error=e))
+                    return
+                time.sleep(self._espera_base * 2 ** (tarea.intentos - 1))
+            else:
+                self.resultados.put(Resultado(tarea, True, valor=valor))
+                return
+
+    def resultados_listos(self) -> list[Resultado]:
+        """Retorna (sin bloquear) los resultados terminados desde la última llamada."""
+        listos = []
+        while True:
+            try:
+                listos.append(self.resultados.get_nowait())
+            except queue.Empty:
+                return listos
+
+    def esperar(self):
+        """Bloquea hasta que no queden tareas pendientes (útil en scripts)."""
+        self._pendientes.join()
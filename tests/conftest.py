@@ -0,0 +1,56 @@
+# tests/conftest.py
+"""
+Las pruebas corren contra la BD que indique RESTAURANTE_BD_URL (por defecto
+"memoria", ver memoria.py). Para la matriz SQLite / PostgreSQL ver
+tests/matriz.py. Cada prueba que usa la fixture `bd` parte de una BD vacía.
+"""
+import os
+import sys
+
+os.environ.setdefault("RESTAURANTE_BD_URL", "memoria")
+os.environ.setdefault("RESTAURANTE_REPORTES_INSTANTANEA", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import config
+from database import engine, Base, EN_MEMORIA
+
+
+def _bd_vacia():
+    if EN_MEMORIA:
+        import memoria
+        memoria.reiniciar("")
+    else:
+        from main import init_db
+        Base.metadata.drop_all(engine)
+        init_db()
+
+
+@pytest.fixture
+def bd(tmp_path, monkeypatch):
+    """BD vacía con todas las tablas; los archivos generados van a tmp_path."""
+    monkeypatch.setattr(config, "ARCHIVO_DIR", str(tmp_path / "archivo"))
+    monkeypatch.setattr(config, "BOLETAS_DIR", str(tmp_path / "boletas"))
+    _bd_vacia()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def catalogo(bd):
+    """Un cliente, tres ingredientes y dos menús (uno con sub-receta)."""
+    from crud.cliente_crud import crear_cliente
+    from crud.ingrediente_crud import crear_ingrediente
+    from crud.menu_crud import crear_menu
+    cliente = crear_cliente("Ana", "ana@correo.cl")
+    pan = crear_ingrediente("pan", "u", 100)
+    carne = crear_ingrediente("carne", "g", 1000)
+    queso = crear_ingrediente("queso", "lamina", 50)
+    base = crear_menu("Base hamburguesa", "", 1, {carne.id: 150}, es_preparacion=True)
+    hamburguesa = crear_menu("Hamburguesa", "", 3500, {pan.id: 1, queso.id: 1}, componentes={base.id: 1})
+    completo = crear_menu("Completo", "", 1800, {pan.id: 1})
+    return {
+        "cliente": cliente.id,
+        "ingredientes": {"pan": pan.id, "carne": carne.id, "queso": queso.id},
+        "menus": {"base": base.id, "hamburguesa": hamburguesa.id, "completo": completo.id},
+    }
@@ -0,0 +1,89 @@
+# tests/test_analitica.py
+"""
+Paridad de MatrizRecetas con el cálculo anterior: bucles anidados sobre
+pedido.items y menu.ingredientes (más las sub-recetas de menu.componentes).
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import select
+from database import get_session
+from models import Pedido, PedidoMenu, MenuORM, IngredienteORM
+from crud.ingrediente_crud import crear_ingrediente
+from crud.menu_crud import crear_menu
+from analitica import MatrizRecetas, vector_stock, consumo_ingredientes
+
+
+def _receta_con_bucles(menu, factor=1.0, acumulado=None) -> Counter:
+    """{ingrediente_id: cantidad} de una unidad de `menu`, recorriendo el árbol."""
+    acumulado = Counter() if acumulado is None else acumulado
+    for mi in menu.ingredientes:
+        acumulado[mi.ingrediente_id] += mi.cantidad * factor
+    for mc in menu.componentes:
+        _receta_con_bucles(mc.componente, factor * mc.cantidad, acumulado)
+    return acumulado
+
+
+@pytest.fixture
+def sembrada(catalogo):
+    """El catálogo más menús al azar y 300 pedidos cargados directamente."""
+    rnd = random.Random(7)
+    ings = list(catalogo["ingredientes"].values())
+    ings += [crear_ingrediente(f"ing{i}", "u", rnd.uniform(0, 500)).id for i in range(12)]
+    menus = [catalogo["menus"]["hamburguesa"], catalogo["menus"]["completo"]]
+    for i in range(10):
+        receta = {j: rnd.uniform(0.5, 4) for j in rnd.sample(ings, rnd.randint(1, 4))}
+        componentes = {catalogo["menus"]["base"]: 2} if i % 3 == 0 else None
+        menus.append(crear_menu(f"Menú {i}", "", 1000 + i, receta, componentes=componentes).id)
+    menus.append(crear_menu("Bebida", "", 900, {}).id)  # sin receta
+
+    inicio = datetime(2024, 1, 1)
+    with get_session() as session:
+        for p in range(300):
+            pedido = Pedido(cliente_id=catalogo["cliente"], fecha=inicio + timedelta(hours=p), total=0)
+            pedido.items = [
+                PedidoMenu(menu_id=m, cantidad=rnd.randint(1, 3), precio_unitario=1000)
+                for m in rnd.sample(menus, rnd.randint(1, 4))
+            ]
+            session.add(pedido)
+        session.commit()
+    return menus
+
+
+def test_consumo_igual_a_bucles_sobre_menu_ingredientes(sembrada):
+    esperado = Counter()
+    with get_session() as session:
+        nombres = dict(session.execute(select(IngredienteORM.id, IngredienteORM.nombre)).all())
+        for pedido in session.scalars(select(Pedido)):
+            for item in pedido.items:
+                for ing_id, cant in _receta_con_bucles(item.menu, item.cantidad).items():
+                    esperado[nombres[ing_id]] += cant
+    obtenido = consumo_ingredientes()
+    assert obtenido.keys() == {n for n, c in esperado.items() if c > 0}
+    for nombre, cant in obtenido.items():
+        assert cant == pytest.approx(esperado[nombre])
+
+
+def test_disponibilidad_y_proyeccion_iguales_a_bucles(sembrada):
+    matriz = MatrizRecetas.cargar()
+    stock = vector_stock(matriz)
+    disponibles = matriz.disponibilidad(stock)
+    plan = {m: u for m, u in zip(sembrada, range(1, len(sembrada) + 1))}
+    proyectado = matriz.proyectar_stock(stock, plan)
+
+    with get_session() as session:
+        stock_bd = dict(session.execute(select(IngredienteORM.id, IngredienteORM.stock)).all())
+        restante = dict(stock_bd)
+        for menu in session.scalars(select(MenuORM)):
+            receta = _receta_con_bucles(menu)
+            esperado = min(
+                (max(stock_bd[i], 0) // c for i, c in receta.items() if c > 0), default=np.inf
+            )
+            assert disponibles[matriz.indices_menus([menu.id])[0]] == esperado, menu.nombre
+            for ing_id, cant in receta.items():
+                restante[ing_id] -= cant * plan.get(menu.id, 0)
+
+    for ing_id, cant in restante.items():
+        assert proyectado[matriz.indices_ingredientes([ing_id])[0]] == pytest.approx(cant)
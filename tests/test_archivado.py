@@ -0,0 +1,79 @@
+# tests/test_archivado.py
+import os
+import sqlite3
+from datetime import date, datetime
+import pytest
+from sqlalchemy import select
+import config
+from database import get_session, DIALECTO, EN_MEMORIA
+from archivado import archivar, tablas_pedidos
+from crud.pedido_crud import crear_pedido
+
+pytestmark = pytest.mark.skipif(DIALECTO != "sqlite", reason="el archivado por año es de SQLite")
+
+
+def _archivar_desde_otro_proceso(anio: int, pedido_id: int, cliente_id: int, menu_id: int):
+    """Lo que deja archivado.py corrido por la CLI: el archivo anual, sin pasar por este engine."""
+    os.makedirs(config.ARCHIVO_DIR, exist_ok=True)
+    con = sqlite3.connect(os.path.join(config.ARCHIVO_DIR, f"pedidos_{anio}.db"))
+    con.executescript(
+        "CREATE TABLE pedidos (id INTEGER PRIMARY KEY, cliente_id INTEGER NOT NULL, fecha DATETIME NOT NULL,"
+        " total FLOAT NOT NULL, descripcion TEXT, clave_idempotencia VARCHAR(64));"
+        "CREATE TABLE pedido_menus (id INTEGER PRIMARY KEY, pedido_id INTEGER NOT NULL,"
+        " menu_id INTEGER NOT NULL, cantidad INTEGER NOT NULL, precio_unitario FLOAT NOT NULL);"
+    )
+    con.execute("INSERT INTO pedidos VALUES (?, ?, ?, 1800, '', NULL)",
+                (pedido_id, cliente_id, f"{anio}-05-01 12:00:00.000000"))
+    con.execute("INSERT INTO pedido_menus VALUES (?, ?, ?, 1, 1800)", (pedido_id, pedido_id, menu_id))
+    con.commit()
+    con.close()
+
+
+def test_conexiones_del_pool_ven_archivos_creados_despues(catalogo):
+    actual = crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 1})
+    with get_session() as session:  # deja una conexión abierta en el pool
+        session.scalars(select(tablas_pedidos()[0].id)).all()
+
+    _archivar_desde_otro_proceso(2020, 999, catalogo["cliente"], catalogo["menus"]["completo"])
+    P, _ = tablas_pedidos()
+    with get_session() as session:
+        assert session.scalars(select(P.id).order_by(P.id)).all() == [actual.id, 999]
+
+
+def test_archivar_mueve_y_sigue_consultable(catalogo):
+    completo = catalogo["menus"]["completo"]
+    viejo = crear_pedido(catalogo["cliente"], {completo: 1}, fecha=datetime(2021, 3, 1, 13))
+    nuevo = crear_pedido(catalogo["cliente"], {completo: 1})
+    assert archivar(date(2022, 1, 1)) == {2021: 1}
+
+    P, PM = tablas_pedidos(date(2021, 1, 1), date(2021, 12, 31))
+    with get_session() as session:
+        assert session.scalars(select(P.id).where(P.fecha < datetime(2022, 1, 1))).all() == [viejo.id]
+        assert session.scalar(select(PM.cantidad).where(PM.pedido_id == viejo.id)) == 1
+    with get_session() as session:
+        assert session.scalars(select(tablas_pedidos()[0].id).order_by("id")).all() == [viejo.id, nuevo.id]
+
+
+@pytest.mark.skipif(EN_MEMORIA, reason="la instantánea copia el archivo de la BD (correr con una URL sqlite:///)")
+def test_instantanea_no_duplica_lo_archivado(catalogo, tmp_path, monkeypatch):
+    import instantanea
+    from analitica import consumo_ingredientes
+    monkeypatch.setattr(config, "REPORTES_INSTANTANEA", True)
+    monkeypatch.setattr(config, "INSTANTANEA_DIR", str(tmp_path / "instantaneas"))
+    monkeypatch.setattr(config, "INSTANTANEA_MAX_SEGUNDOS", 300)
+    monkeypatch.setattr(instantanea, "_actual", None)
+
+    completo = catalogo["menus"]["completo"]
+    crear_pedido(catalogo["cliente"], {completo: 2}, fecha=datetime(2021, 3, 1, 13))
+    crear_pedido(catalogo["cliente"], {completo: 3})
+
+    def pedidos_en_reportes():
+        P, _ = tablas_pedidos()
+        with instantanea.sesion_reportes() as session:
+            return session.scalars(select(P.id).order_by(P.id)).all()
+
+    antes = pedidos_en_reportes()
+    assert instantanea.activa() and consumo_ingredientes() == {"pan": 5}
+    archivar(date(2022, 1, 1))
+    assert pedidos_en_reportes() == antes
+    assert consumo_ingredientes() == {"pan": 5}
@@ -0,0 +1,96 @@
+# tests/test_bd.py
+"""
+Escrituras que dependen del motor (dialecto.py) y los contadores. Corren
+contra RESTAURANTE_BD_URL; tests/matriz.py las repite en SQLite y PostgreSQL.
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+from database import get_session
+from models import VentaMenu, VentaHora
+import dialecto
+from crud.pedido_crud import crear_pedido, eliminar_pedido
+from crud.ingrediente_crud import obtener_stock
+from crud.estadistica_crud import reconstruir_contadores
+
+
+def _contadores():
+    """Filas con valores distintos de cero (las incrementales pueden quedar en 0)."""
+    with get_session() as session:
+        ventas = {
+            (p, c, m): (cant, monto) for p, c, m, cant, monto in session.execute(
+                select(VentaMenu.periodo, VentaMenu.clave, VentaMenu.menu_id, VentaMenu.cantidad, VentaMenu.monto)
+            ) if cant
+        }
+        horas = {
+            (f, h, d): (n, monto) for f, h, d, n, monto in session.execute(
+                select(VentaHora.fecha, VentaHora.hora, VentaHora.dia_semana, VentaHora.pedidos, VentaHora.monto)
+            ) if n
+        }
+    return ventas, horas
+
+
+def test_crear_pedido_descuenta_stock_y_suma_contadores(catalogo):
+    completo = catalogo["menus"]["completo"]
+    pan = catalogo["ingredientes"]["pan"]
+    fecha = datetime(2024, 5, 6, 13, 30)  # lunes
+    pedido = crear_pedido(catalogo["cliente"], {completo: 3}, fecha=fecha)
+    assert obtener_stock([pan])[pan][1] == 97
+    ventas, horas = _contadores()
+    assert ventas[("total", "", completo)] == (3, 5400)
+    assert ventas[("semana", "2024-05-06", completo)] == (3, 5400)
+    assert horas == {("2024-05-06", 13, 0): (1, pedido.total)}
+
+
+def test_crear_pedido_sin_stock_no_descuenta(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    with pytest.raises(ValueError):
+        crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 101})
+    assert obtener_stock([pan])[pan][1] == 100
+    assert _contadores() == ({}, {})
+
+
+def test_descontar_stock_es_atomico_y_se_deshace(catalogo):
+    ings = catalogo["ingredientes"]
+    with get_session() as session:
+        restante = dialecto.descontar_stock(session, {ings["pan"]: 2, ings["queso"]: 1.5})
+        assert restante == {ings["pan"]: 98, ings["queso"]: 48.5}
+        session.rollback()
+    assert obtener_stock([ings["pan"]])[ings["pan"]][1] == 100
+    with get_session() as session:
+        dialecto.descontar_stock(session, {ings["pan"]: 2})
+        dialecto.descontar_stock(session, {ings["pan"]: 3})
+        session.commit()
+    assert obtener_stock([ings["pan"]])[ings["pan"]][1] == 95
+
+
+def test_insertar_o_sumar_acumula_en_la_misma_clave(catalogo):
+    completo = catalogo["menus"]["completo"]
+    fila = {"periodo": "dia", "clave": "2024-01-01", "menu_id": completo, "cantidad": 2, "monto": 3600}
+    with get_session() as session:
+        dialecto.insertar_o_sumar(session, VentaMenu, [fila], ["periodo", "clave", "menu_id"], ["cantidad", "monto"])
+        dialecto.insertar_o_sumar(
+            session, VentaMenu, [fila, dict(fila, clave="2024-01-02")],
+            ["periodo", "clave", "menu_id"], ["cantidad", "monto"]
+        )
+        session.commit()
+    ventas, _ = _contadores()
+    assert ventas == {
+        ("dia", "2024-01-01", completo): (4, 7200),
+        ("dia", "2024-01-02", completo): (2, 3600),
+    }
+
+
+def test_reconstruir_contadores_igual_a_los_incrementales(catalogo):
+    menus, cliente = catalogo["menus"], catalogo["cliente"]
+    fechas = [datetime(2024, 1, 31, 20), datetime(2024, 2, 1, 9), datetime(2024, 2, 1, 9, 45), datetime(2024, 2, 4, 23)]
+    pedidos = [
+        crear_pedido(cliente, {menus["completo"]: 1 + i % 2, menus["hamburguesa"]: 1}, fecha=f)
+        for i, f in enumerate(fechas)
+    ]
+    eliminar_pedido(pedidos[1].id)
+    incrementales = _contadores()
+
+    reconstruir_contadores()
+    assert _contadores() == incrementales
+    assert incrementales[0][("total", "", menus["hamburguesa"])] == (3, 3 * 3500)
@@ -0,0 +1,41 @@
+# tests/test_boletas.py
+from io import BytesIO
+from reportlab.pdfgen import canvas
+from carrito import Carrito
+from pdf.boleta_rapida import BoletaRapida
+from pdf.escpos import BoletaEscPos, CODIFICACION
+
+
+class _CanvasRegistro(canvas.Canvas):
+    """Canvas que además anota los montos alineados a la derecha (los totales)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.montos = []
+
+    def drawRightString(self, x, y, texto, *args, **kwargs):
+        self.montos.append(texto)
+        return super().drawRightString(x, y, texto, *args, **kwargs)
+
+
+def _carrito_1750() -> Carrito:
+    c = Carrito()
+    c.cargar_receta(1, {}, {})
+    c.agregar(1, "Completo", 1750, 1)
+    return c
+
+
+def test_iva_de_boleta_rapida_coincide_con_el_carrito():
+    carrito = _carrito_1750()
+    assert (carrito.subtotal, carrito.iva, carrito.total) == (1750, 333, 2083)
+    lienzo = _CanvasRegistro(BytesIO())
+    BoletaRapida(carrito.detalle_boleta()).dibujar(lienzo)
+    assert lienzo.montos[-3:] == ["$1.750", "$333", "$2.083"]
+
+
+def test_iva_de_boleta_escpos_coincide_con_el_carrito():
+    carrito = _carrito_1750()
+    texto = BoletaEscPos(carrito.detalle_boleta()).generar_bytes().decode(CODIFICACION)
+    lineas = [l.strip() for l in texto.splitlines()]
+    assert any(l.startswith("IVA (19%):") and l.endswith("$333") for l in lineas)
+    assert any("TOTAL:" in l and l.endswith("$2.083") for l in lineas)
@@ -0,0 +1,86 @@
+# tests/test_carrito.py
+import math
+import pytest
+from carrito import Carrito, a_pesos, calcular_iva, formatear_pesos, totales
+
+
+def test_a_pesos_redondea_a_entero():
+    assert a_pesos(1800.0) == 1800
+    assert a_pesos(1799.6) == 1800
+    assert a_pesos("2500") == 2500
+    assert isinstance(a_pesos(10.2), int)
+
+
+@pytest.mark.parametrize("subtotal, iva", [(0, 0), (100, 19), (1750, 333), (1800, 342), (50, 10), (26, 5)])
+def test_calcular_iva_redondea_la_mitad_hacia_arriba(subtotal, iva):
+    assert calcular_iva(subtotal) == iva
+
+
+def test_calcular_iva_es_entero_y_exacto():
+    for subtotal in range(0, 20001):
+        iva = calcular_iva(subtotal)
+        # |iva - 19% exacto| <= 0,5 peso, sin errores de punto flotante
+        assert abs(iva * 100 - subtotal * 19) <= 50
+
+
+def test_formatear_pesos():
+    assert formatear_pesos(1800) == "$1.800"
+    assert formatear_pesos(1234567) == "$1.234.567"
+
+
+def _carrito(stock=None, recetas=None):
+    c = Carrito()
+    stock = stock or {1: ("pan", 10.0), 2: ("carne", 1000.0)}
+    recetas = recetas or {10: {1: 1.0, 2: 150.0}, 20: {1: 2.0}}
+    for menu_id, receta in recetas.items():
+        c.cargar_receta(menu_id, receta, {i: stock[i] for i in receta})
+    return c
+
+
+def test_subtotal_iva_y_total():
+    c = _carrito()
+    c.agregar(10, "Hamburguesa", 3500.0, 2)
+    c.agregar(20, "Completo", 1799.6)
+    assert c.subtotal == 2 * 3500 + 1800
+    assert c.iva == calcular_iva(8800)
+    assert c.total == 8800 + calcular_iva(8800)
+    assert totales(c.detalle_boleta()) == (c.subtotal, c.iva, c.total)
+
+
+def test_reducir_y_quitar_actualizan_totales():
+    c = _carrito()
+    c.agregar(10, "Hamburguesa", 3500, 3)
+    c.reducir(10)
+    assert c.linea(10).cantidad == 2 and c.subtotal == 7000
+    c.quitar(10)
+    assert not c and c.subtotal == 0 and c.total == 0
+
+
+def test_maximo_agregable_respeta_stock_compartido():
+    c = _carrito()
+    # carne alcanza para 6 hamburguesas, pan para 10
+    assert c.maximo_agregable(10) == 6
+    c.agregar(20, "Completo", 1800, 2)   # usa 4 panes
+    assert c.maximo_agregable(10) == 6
+    c.agregar(20, "Completo", 1800, 1)   # 6 panes usados
+    assert c.maximo_agregable(10) == 4
+    with pytest.raises(ValueError, match="Máximo permitido: 4"):
+        c.agregar(10, "Hamburguesa", 3500, 5)
+
+
+def test_sin_stock_rechaza():
+    c = _carrito(stock={1: ("pan", 0.0), 2: ("carne", 1000.0)})
+    with pytest.raises(ValueError, match="No hay stock de pan"):
+        c.agregar(10, "Hamburguesa", 3500)
+
+
+def test_menu_sin_receta_no_tiene_limite():
+    c = _carrito(recetas={30: {}})
+    assert c.maximo_agregable(30) == math.inf
+    c.agregar(30, "Agua de la llave", 500, 50)
+    assert c.linea(30).cantidad == 50
+
+
+def test_receta_no_cargada():
+    with pytest.raises(ValueError, match="Receta del menú no cargada"):
+        Carrito().agregar(99, "X", 100)
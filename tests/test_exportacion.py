@@ -0,0 +1,69 @@
+# tests/test_exportacion.py
+import csv
+import gzip
+import pytest
+from sqlalchemy import text
+from database import engine, DIALECTO
+from crud.pedido_crud import crear_pedido, eliminar_pedido
+from exportacion import exportar_historial, _bloques, _consulta_pedidos
+
+
+def _ids_exportados(ruta: str) -> list[int]:
+    with gzip.open(ruta, "rt", encoding="utf-8") as f:
+        return [int(fila[0]) for fila in list(csv.reader(f))[1:]]
+
+
+def test_no_se_reutiliza_el_id_del_ultimo_pedido_eliminado(catalogo):
+    completo = catalogo["menus"]["completo"]
+    primero = crear_pedido(catalogo["cliente"], {completo: 1})
+    segundo = crear_pedido(catalogo["cliente"], {completo: 1})
+    eliminar_pedido(segundo.id)
+    tercero = crear_pedido(catalogo["cliente"], {completo: 1})
+    assert tercero.id > segundo.id > primero.id
+
+
+def test_exportacion_incremental_tras_eliminar_el_ultimo(catalogo, tmp_path):
+    completo = catalogo["menus"]["completo"]
+    crear_pedido(catalogo["cliente"], {completo: 1})
+    ultimo = crear_pedido(catalogo["cliente"], {completo: 2})
+    exportar_historial(str(tmp_path))
+
+    eliminar_pedido(ultimo.id)
+    nuevo = crear_pedido(catalogo["cliente"], {completo: 3})
+    resultado = exportar_historial(str(tmp_path))
+    ruta, n = resultado["pedidos"]
+    assert n == 1 and _ids_exportados(ruta) == [nuevo.id]
+    assert resultado["pedido_menus"][1] == 1
+
+
+def test_bloques_no_dejan_lectura_abierta(catalogo):
+    completo = catalogo["menus"]["completo"]
+    ids = [crear_pedido(catalogo["cliente"], {completo: 1}).id for _ in range(5)]
+    bloques = _bloques(_consulta_pedidos, 0, 2)
+    leidos = [fila[0] for fila in next(bloques)]
+    # entre bloques otra terminal puede escribir sin esperar a la exportación
+    ids.append(crear_pedido(catalogo["cliente"], {completo: 1}).id)
+    for filas in bloques:
+        leidos += [fila[0] for fila in filas]
+    assert leidos == ids
+
+
+@pytest.mark.skipif(DIALECTO != "sqlite", reason="migración propia de SQLite")
+def test_migracion_a_autoincrement_conserva_ids(bd):
+    from main import _activar_autoincrement
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE pedido_menus")
+        conn.exec_driver_sql(
+            "CREATE TABLE pedido_menus (id INTEGER NOT NULL, pedido_id INTEGER NOT NULL, "
+            "menu_id INTEGER NOT NULL, cantidad INTEGER NOT NULL, precio_unitario FLOAT NOT NULL, "
+            "PRIMARY KEY (id))"
+        )
+        conn.exec_driver_sql("INSERT INTO pedido_menus VALUES (3, 1, 1, 1, 100.0), (7, 1, 1, 2, 100.0)")
+    _activar_autoincrement()
+    with engine.begin() as conn:
+        sql = conn.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'pedido_menus'"))
+        assert "AUTOINCREMENT" in sql
+        assert conn.exec_driver_sql("SELECT id FROM pedido_menus ORDER BY id").scalars().all() == [3, 7]
+        conn.exec_driver_sql("DELETE FROM pedido_menus WHERE id = 7")
+        conn.exec_driver_sql("INSERT INTO pedido_menus (pedido_id, menu_id, cantidad, precio_unitario) VALUES (1, 1, 1, 1)")
+        assert conn.exec_driver_sql("SELECT max(id) FROM pedido_menus").scalar() == 8
@@ -0,0 +1,54 @@
+# tests/test_graficos.py
+"""
+Caché de figuras de ServicioGraficos: se redibuja cuando cambian los datos
+(también recetas, nombres y precios, no solo la cantidad de pedidos) y la
+figura se actualiza en su lugar.
+"""
+from datetime import datetime
+from crud.pedido_crud import crear_pedido
+from crud.menu_crud import actualizar_menu
+from crud.ingrediente_crud import actualizar_ingrediente
+from graficos import ServicioGraficos, version_datos
+
+
+def _barras(fig):
+    ax = fig.axes[0]
+    return [t.get_text() for t in ax.get_xticklabels()], [b.get_height() for b in ax.patches]
+
+
+def test_receta_y_nombres_cambian_la_version(catalogo):
+    ids = catalogo["ingredientes"]
+    completo = catalogo["menus"]["completo"]
+    crear_pedido(catalogo["cliente"], {completo: 2}, fecha=datetime(2024, 5, 2, 13))
+    servicio = ServicioGraficos()
+
+    fig = servicio.obtener("uso_ingredientes")
+    ejes = fig.axes[0]
+    assert _barras(fig) == (["pan"], [2.0])
+
+    # misma cantidad de filas de receta: un conteo no lo notaría
+    actualizar_menu(completo, "Completo", "", 1800, {ids["pan"]: 3})
+    assert servicio.obtener("uso_ingredientes") is fig
+    assert fig.axes[0] is ejes  # artistas actualizados, no ejes nuevos
+    assert _barras(fig) == (["pan"], [6.0])
+
+    actualizar_ingrediente(ids["pan"], "marraqueta", "u", 100)
+    assert _barras(servicio.obtener("uso_ingredientes")) == (["marraqueta"], [6.0])
+
+    assert _barras(servicio.obtener("menus_mas_vendidos")) == (["Completo"], [2])
+    actualizar_menu(completo, "Completo XL", "", 2500, {ids["pan"]: 3})
+    assert _barras(servicio.obtener("menus_mas_vendidos")) == (["Completo XL"], [2])
+
+
+def test_sin_cambios_no_se_redibuja(catalogo):
+    crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 1}, fecha=datetime(2024, 5, 2, 13))
+    servicio = ServicioGraficos()
+    fig = servicio.obtener("mapa_calor_demanda")
+    version = servicio.version("mapa_calor_demanda")
+    assert version == version_datos()
+
+    assert servicio.obtener("mapa_calor_demanda") is fig
+    crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 1}, fecha=datetime(2024, 5, 2, 13))
+    assert servicio.obtener("mapa_calor_demanda") is fig
+    assert servicio.version("mapa_calor_demanda") != version
+    assert fig.axes[0].images[0].get_array().max() == 2
@@ -0,0 +1,81 @@
+# tests/test_mantenimiento.py
+"""
+Registro de mantenimiento: qué trabajos quedan pendientes y cómo se anota
+un trabajo cortado por el límite de tiempo.
+"""
+import logging
+from datetime import datetime
+import pytest
+import config
+import mantenimiento
+from mantenimiento import ejecutar, pendientes, TRABAJOS, ProgramadorMantenimiento, _conexion_limitada
+
+
+def _consulta_infinita(limite: float) -> str:
+    with _conexion_limitada(limite) as (conn, _):
+        conn.exec_driver_sql(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+        ).scalar()
+    return "ok"
+
+
+def test_pendientes_segun_periodo(bd):
+    assert pendientes() == list(TRABAJOS)
+
+    r = ejecutar("huerfanos", limite=5)
+    assert r.ok and r.completo
+    assert "huerfanos" not in pendientes()
+    assert "huerfanos" in pendientes(datetime.now() + TRABAJOS["huerfanos"][1])
+
+
+def test_tiempo_agotado_queda_incompleto_y_pendiente(bd, monkeypatch):
+    periodo = TRABAJOS["integridad"][1]
+    monkeypatch.setitem(TRABAJOS, "integridad", (_consulta_infinita, periodo))
+
+    r = ejecutar("integridad", limite=0.05)
+    assert not r.ok and r.completo is False
+    assert "tiempo agotado" in r.detalle
+    # no cuenta como ejecutado: se reintenta en la próxima pausa
+    assert "integridad" in pendientes()
+
+    monkeypatch.setitem(TRABAJOS, "integridad", (mantenimiento.verificar_integridad, periodo))
+    r = ejecutar("integridad", limite=5)
+    assert r.ok and r.detalle == "ok"
+    assert "integridad" not in pendientes()
+
+
+def test_error_cuenta_como_intento(bd, monkeypatch):
+    def falla(limite):
+        raise ValueError("quick_check: página dañada")
+
+    monkeypatch.setitem(TRABAJOS, "integridad", (falla, TRABAJOS["integridad"][1]))
+    r = ejecutar("integridad", limite=5)
+    assert not r.ok and r.completo
+    assert "página dañada" in r.detalle
+    # un error no se reintenta en cada pausa: espera su periodo
+    assert "integridad" not in pendientes()
+
+
+def test_trabajo_desconocido(bd):
+    with pytest.raises(ValueError):
+        ejecutar("defragmentar")
+
+
+def test_programador_corre_en_su_hilo_y_registra_errores(bd, monkeypatch, caplog):
+    monkeypatch.setattr(config, "MANTENIMIENTO_INACTIVIDAD", 60)
+    prog = ProgramadorMantenimiento()
+    assert not prog.tick(10)  # la interfaz está en uso
+
+    assert prog.tick(120)
+    prog.esperar(30)
+    assert [r.trabajo for r in prog.ultimos] == list(TRABAJOS)
+    assert pendientes() == []
+
+    def falla(limite=None):
+        raise RuntimeError("BD bloqueada")
+
+    monkeypatch.setattr(mantenimiento, "ejecutar_pendientes", falla)
+    with caplog.at_level(logging.ERROR, logger="mantenimiento"):
+        assert prog.tick(120)
+        prog.esperar(30)
+    assert "BD bloqueada" in caplog.text
@@ -0,0 +1,77 @@
+# tests/test_pedidos.py
+import pytest
+from sqlalchemy import select, func
+from database import SessionLocal, get_session
+from models import Pedido
+from crud import pedido_crud
+from crud.pedido_crud import crear_pedido
+from crud.ingrediente_crud import obtener_stock
+from crud.menu_crud import actualizar_menu, listar_menus_basico, listar_preparaciones
+
+
+def _stock(ing_id: int) -> float:
+    return obtener_stock([ing_id])[ing_id][1]
+
+
+def test_preparacion_no_se_vende_sola(catalogo):
+    base = catalogo["menus"]["base"]
+    with pytest.raises(ValueError, match="preparaciones"):
+        crear_pedido(catalogo["cliente"], {base: 1})
+    with pytest.raises(ValueError, match="preparaciones"):
+        crear_pedido(catalogo["cliente"], {base: 1, catalogo["menus"]["completo"]: 1})
+    # el rechazo no descuenta stock
+    assert _stock(catalogo["ingredientes"]["carne"]) == 1000
+
+
+def test_menu_con_sub_receta_descuenta_la_preparacion(catalogo):
+    crear_pedido(catalogo["cliente"], {catalogo["menus"]["hamburguesa"]: 2})
+    ings = catalogo["ingredientes"]
+    assert _stock(ings["carne"]) == 1000 - 2 * 150
+    assert _stock(ings["pan"]) == 98
+    assert _stock(ings["queso"]) == 48
+
+
+def test_marcar_como_preparacion_lo_saca_de_la_venta(catalogo):
+    completo = catalogo["menus"]["completo"]
+    actualizar_menu(completo, "Completo", "", 1800, {catalogo["ingredientes"]["pan"]: 1}, es_preparacion=True)
+    assert completo not in {m.id for m in listar_menus_basico()}
+    assert completo in {m.id for m in listar_preparaciones()}
+    with pytest.raises(ValueError, match="preparaciones"):
+        crear_pedido(catalogo["cliente"], {completo: 1})
+
+
+def test_misma_clave_retorna_el_mismo_pedido(catalogo):
+    completo = catalogo["menus"]["completo"]
+    primero = crear_pedido(catalogo["cliente"], {completo: 2}, clave_idempotencia="carrito-1")
+    segundo = crear_pedido(catalogo["cliente"], {completo: 2}, clave_idempotencia="carrito-1")
+    assert segundo.id == primero.id
+    # el stock se descontó una sola vez
+    assert _stock(catalogo["ingredientes"]["pan"]) == 98
+    with get_session() as session:
+        assert session.scalar(select(func.count(Pedido.id))) == 1
+
+
+def test_clave_confirmada_por_otra_terminal_durante_el_insert(catalogo, monkeypatch):
+    """La consulta inicial no ve la clave; el INSERT choca con el índice único y se retorna el existente."""
+    completo = catalogo["menus"]["completo"]
+    original = pedido_crud._pedido_por_clave
+    otro = {}
+
+    def consulta_con_carrera(session, clave):
+        if not otro:
+            # otra terminal confirma la misma clave justo después de la consulta
+            with SessionLocal() as s2:
+                pedido = Pedido(cliente_id=catalogo["cliente"], total=1800, clave_idempotencia=clave)
+                s2.add(pedido)
+                s2.commit()
+                otro["id"] = pedido.id
+            return None
+        return original(session, clave)
+
+    monkeypatch.setattr(pedido_crud, "_pedido_por_clave", consulta_con_carrera)
+    pedido = crear_pedido(catalogo["cliente"], {completo: 1}, clave_idempotencia="carrito-2")
+    assert pedido.id == otro["id"]
+    # el descuento de este intento se revirtió
+    assert _stock(catalogo["ingredientes"]["pan"]) == 100
+    with get_session() as session:
+        assert session.scalar(select(func.count(Pedido.id))) == 1
@@ -0,0 +1,117 @@
+# tests/test_reservas.py
+"""
+Reservas de stock por carrito (crud/reserva_crud.py): cuentan contra el
+stock de los demás carritos, vencen y se liberan al confirmar el pedido.
+"""
+import logging
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, func
+from database import get_session
+from models import ReservaStock
+from crud.pedido_crud import crear_pedido
+from crud.ingrediente_crud import obtener_stock
+from crud import reserva_crud
+from crud.reserva_crud import (
+    reservar, liberar, liberar_expiradas, stock_disponible, ProgramadorExpiracion, LimpiezaReservas
+)
+
+
+def _reservas(carrito: str | None = None) -> int:
+    stmt = select(func.count(ReservaStock.id))
+    if carrito is not None:
+        stmt = stmt.where(ReservaStock.carrito == carrito)
+    with get_session() as session:
+        return session.scalar(stmt)
+
+
+def test_reserva_de_otro_carrito_descuenta_disponible(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    reservar("A", catalogo["menus"]["completo"], {pan: 1}, cantidad=30)
+
+    assert stock_disponible([pan], "B")[pan] == ("pan", 70)
+    assert stock_disponible([pan], "A")[pan] == ("pan", 100)  # las propias no cuentan
+    with pytest.raises(ValueError, match="reservado"):
+        reservar("B", catalogo["menus"]["completo"], {pan: 1}, cantidad=71)
+
+    assert liberar("A") == 1
+    assert stock_disponible([pan], "B")[pan] == ("pan", 100)
+
+
+def test_reserva_vencida_no_cuenta_y_se_purga(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    reservar("A", catalogo["menus"]["completo"], {pan: 1}, cantidad=30, ttl=60)
+    reservar("C", catalogo["menus"]["completo"], {pan: 1}, cantidad=10, ttl=3600)
+
+    despues = datetime.now() + timedelta(seconds=120)
+    assert liberar_expiradas(despues) == 1
+    assert _reservas("A") == 0
+    assert _reservas("C") == 1
+    assert stock_disponible([pan], "B")[pan] == ("pan", 90)
+
+
+def test_pedido_libera_las_reservas_propias(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    completo = catalogo["menus"]["completo"]
+    reservar("A", completo, {pan: 1}, cantidad=2)
+    reservar("B", completo, {pan: 1}, cantidad=5)
+
+    crear_pedido(catalogo["cliente"], {completo: 2}, carrito="A")
+    assert _reservas("A") == 0
+    assert _reservas("B") == 1
+    assert obtener_stock([pan])[pan][1] == 98
+
+
+def test_reservas_de_otro_carrito_bloquean_el_pedido(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    completo = catalogo["menus"]["completo"]
+    reservar("B", completo, {pan: 1}, cantidad=99)
+
+    with pytest.raises(ValueError, match="Stock insuficiente"):
+        crear_pedido(catalogo["cliente"], {completo: 2}, carrito="A")
+    assert obtener_stock([pan])[pan][1] == 100  # el descuento se revirtió
+    crear_pedido(catalogo["cliente"], {completo: 1}, carrito="A")
+    assert obtener_stock([pan])[pan][1] == 99
+
+
+def test_programador_borrado_perezoso_y_reprogramacion():
+    t0 = datetime(2024, 5, 2, 12, 0)
+    prog = ProgramadorExpiracion()
+    prog.programar("A", t0 + timedelta(minutes=1))
+    prog.programar("B", t0 + timedelta(minutes=2))
+    # renovar A deja su entrada vieja en el heap
+    prog.programar("A", t0 + timedelta(minutes=3))
+    assert prog.proxima() == t0 + timedelta(minutes=2)
+
+    assert prog.vencidos(t0 + timedelta(minutes=1, seconds=30)) == []
+    assert prog.vencidos(t0 + timedelta(minutes=2)) == ["B"]
+    assert prog.proxima() == t0 + timedelta(minutes=3)
+
+    prog.cancelar("A")
+    assert prog.proxima() is None
+    assert prog.vencidos(t0 + timedelta(hours=1)) == []
+
+    prog.programar("C", t0)
+    prog.programar("C", t0 + timedelta(minutes=5))
+    assert prog.vencidos(t0 + timedelta(minutes=5)) == ["C"]
+
+
+def test_limpieza_en_hilo_aparte(catalogo, monkeypatch, caplog):
+    pan = catalogo["ingredientes"]["pan"]
+    reservar("A", catalogo["menus"]["completo"], {pan: 1}, cantidad=3, ttl=-1)
+    reservar("B", catalogo["menus"]["completo"], {pan: 1}, cantidad=3)
+    reservar("C", catalogo["menus"]["completo"], {pan: 1}, cantidad=3)
+
+    limpieza = LimpiezaReservas()
+    assert limpieza.tick(["C"])
+    limpieza.esperar(10)
+    assert _reservas() == 1 and _reservas("B") == 1
+
+    def falla(ahora=None):
+        raise RuntimeError("BD caída")
+
+    monkeypatch.setattr(reserva_crud, "liberar_expiradas", falla)
+    with caplog.at_level(logging.ERROR, logger="crud.reserva_crud"):
+        assert limpieza.tick()
+        limpieza.esperar(10)
+    assert "BD caída" in caplog.text
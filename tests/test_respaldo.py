@@ -0,0 +1,55 @@
+# tests/test_respaldo.py
+"""
+Respaldo en línea: respaldar -> verificar_respaldo -> restaurar deja la BD
+como estaba al respaldar. Solo con la BD en un archivo SQLite.
+"""
+import pytest
+from sqlalchemy import select, func
+from database import get_session, DIALECTO, EN_MEMORIA
+from models import Pedido
+from crud.pedido_crud import crear_pedido
+from crud.ingrediente_crud import obtener_stock
+from respaldo import respaldar, verificar_respaldo, restaurar, listar_respaldos
+
+pytestmark = pytest.mark.skipif(
+    DIALECTO != "sqlite" or EN_MEMORIA, reason="el respaldo en línea copia el archivo SQLite"
+)
+
+
+def _pedidos() -> int:
+    with get_session() as session:
+        return session.scalar(select(func.count(Pedido.id)))
+
+
+def test_respaldar_verificar_restaurar(catalogo, tmp_path):
+    pan = catalogo["ingredientes"]["pan"]
+    completo = catalogo["menus"]["completo"]
+    crear_pedido(catalogo["cliente"], {completo: 2})
+
+    ruta = respaldar(str(tmp_path / "respaldos"), conservar=3)
+    assert listar_respaldos(str(tmp_path / "respaldos")) == [ruta]
+    assert verificar_respaldo(ruta) == "ok"
+
+    # cambios posteriores al respaldo
+    crear_pedido(catalogo["cliente"], {completo: 5})
+    assert _pedidos() == 2
+
+    restaurar(ruta)
+    assert _pedidos() == 1
+    assert obtener_stock([pan])[pan][1] == 98
+    # la BD restaurada sigue aceptando pedidos
+    crear_pedido(catalogo["cliente"], {completo: 1})
+    assert _pedidos() == 2
+
+
+def test_respaldo_danado_no_se_restaura(catalogo, tmp_path):
+    ruta = respaldar(str(tmp_path / "respaldos"))
+    with open(ruta, "r+b") as f:
+        f.seek(20)
+        f.write(b"\x00" * 16)
+
+    assert "hash" in verificar_respaldo(ruta)
+    crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 1})
+    with pytest.raises(ValueError, match="No se restaura"):
+        restaurar(ruta)
+    assert _pedidos() == 1
@@ -0,0 +1,77 @@
+# tests/test_transacciones.py
+"""
+@transaccion ante una BD bloqueada por otra terminal: reintentos, plazo
+agotado (BDOcupada) y métricas. El bloqueo lo toma una segunda conexión
+con BEGIN IMMEDIATE; solo aplica a SQLite.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+import config
+from database import engine, BDOcupada, metricas_transacciones, DIALECTO, EN_MEMORIA, NOMBRE_MEMORIA
+from crud.ingrediente_crud import crear_ingrediente, listar_ingredientes
+
+pytestmark = pytest.mark.skipif(DIALECTO != "sqlite", reason="bloqueos de archivo de SQLite")
+
+
+@pytest.fixture
+def sin_espera(bd):
+    """Sin busy_timeout: cada intento falla de inmediato con "database is locked"."""
+    def sin_busy_timeout(dbapi_conn, *_):
+        dbapi_conn.execute("PRAGMA busy_timeout=0")
+
+    event.listen(engine, "checkout", sin_busy_timeout)
+    metricas_transacciones.reiniciar()
+    yield
+    event.remove(engine, "checkout", sin_busy_timeout)
+    metricas_transacciones.reiniciar()
+
+
+@contextmanager
+def _otra_terminal_escribiendo():
+    if EN_MEMORIA:
+        conn = sqlite3.connect(NOMBRE_MEMORIA, uri=True, isolation_level=None, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(engine.url.database, isolation_level=None, check_same_thread=False)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+
+
+def test_reintenta_hasta_que_se_libera(sin_espera):
+    with _otra_terminal_escribiendo() as otra:
+        threading.Timer(0.3, otra.execute, ("ROLLBACK",)).start()
+        ing = crear_ingrediente("sal", "g", 10)
+
+    assert ing.id is not None
+    m = metricas_transacciones.resumen()["crear_ingrediente"]
+    assert m["llamadas"] == 1 and m["ok"] == 1
+    assert m["reintentos"] >= 1 and m["intentos"] == m["reintentos"] + 1
+    assert 0 < m["espera"] <= m["intentos"] * 0.5
+    assert m["espera_max"] == m["espera"]
+
+
+def test_plazo_agotado_lanza_bd_ocupada(sin_espera, monkeypatch):
+    monkeypatch.setattr(config, "TRANSACCION_PLAZO", 0.2)
+    with _otra_terminal_escribiendo():
+        with pytest.raises(BDOcupada):
+            crear_ingrediente("sal", "g", 10)
+
+    m = metricas_transacciones.resumen()["crear_ingrediente"]
+    assert m["agotadas"] == 1 and m["ok"] == 0
+    assert m["reintentos"] >= 1
+    assert m["espera"] <= 0.2 + 1e-6
+    assert [i.nombre for i in listar_ingredientes()] == []
+
+
+def test_error_que_no_es_bloqueo_no_se_reintenta(sin_espera):
+    with pytest.raises(ValueError, match="vacío"):
+        crear_ingrediente(" ", "g", 10)
+    m = metricas_transacciones.resumen()["crear_ingrediente"]
+    assert m["error"] == 1 and m["intentos"] == 1 and m["espera"] == 0
@@ -0,0 +1,55 @@
+# tests/test_unidad_de_trabajo.py
+"""
+unidad_de_trabajo(): varias llamadas al CRUD en una sola transacción, que
+se confirma al salir o se revierte completa (también si la falla ocurre en
+una unidad anidada).
+"""
+import pytest
+from sqlalchemy import select, func
+import database
+from database import get_session, unidad_de_trabajo
+from models import Pedido, MenuORM
+from crud.ingrediente_crud import crear_ingrediente, listar_ingredientes, obtener_stock
+from crud.menu_crud import crear_menu
+from crud.pedido_crud import crear_pedido
+
+
+def _contar(modelo) -> int:
+    with get_session() as session:
+        return session.scalar(select(func.count(modelo.id)))
+
+
+def test_falla_anidada_revierte_todo(catalogo):
+    pan = catalogo["ingredientes"]["pan"]
+    menus = _contar(MenuORM)
+
+    with pytest.raises(RuntimeError):
+        with unidad_de_trabajo() as externa:
+            sal = crear_ingrediente("sal", "g", 10)
+            with unidad_de_trabajo() as interna:
+                assert interna is externa
+                crear_menu("Papas", "", 900, {sal.id: 1})
+                crear_pedido(catalogo["cliente"], {catalogo["menus"]["completo"]: 3})
+                raise RuntimeError("falla en la unidad anidada")
+
+    assert database._unidad_actual.get() is None
+    assert "sal" not in [i.nombre for i in listar_ingredientes()]
+    assert _contar(MenuORM) == menus
+    assert _contar(Pedido) == 0
+    assert obtener_stock([pan])[pan][1] == 100
+
+
+def test_confirma_al_salir_y_libera_la_sesion(catalogo):
+    with unidad_de_trabajo() as session:
+        assert get_session().__enter__() is session
+        sal = crear_ingrediente("sal", "g", 10)
+        with unidad_de_trabajo():
+            crear_menu("Papas", "", 900, {sal.id: 1})
+        # la anidada no confirma: la sesión de la unidad sigue en su transacción
+        assert session.in_transaction()
+
+    assert database._unidad_actual.get() is None
+    assert get_session() is not session
+    assert sal.nombre == "sal"  # atributos cargados después del commit
+    with get_session() as otra:
+        assert otra.scalar(select(func.count(MenuORM.id)).where(MenuORM.nombre == "Papas")) == 1